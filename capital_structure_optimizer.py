@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Capital Structure Optimizer
+Vectorized search over leverage, debt terms and cash sweep to maximize sponsor IRR or MOIC
+
+The LBO blocks in SapphireDermEPVAnalysis.calculate_lbo_analysis and the HarborGlow /
+LumiDerm validators evaluate a handful of fixed structures (4.0-4.5x debt, 70-72% LTV,
+one rate, one sweep). This module searches the structure instead:
+
+    decision     leverage (debt / entry EBITDA), term option (rate, tenor, IO), sweep %
+    objective    sponsor IRR or MOIC over the hold
+    constraints  min DSCR ≥ base floor (base case) and ≥ downside floor (downside case),
+                 leverage ≤ max_leverage, positive equity check
+
+Cash model per year (base and downside scenarios evaluated together):
+    CFADS       = EBITDA - max(0, tax × (EBIT - interest)) - maintenance capex - ΔWC
+    DSCR        = CFADS / (interest + scheduled principal)
+    excess      = CFADS - debt service; sweep % of excess prepays debt, the rest is
+                  distributed to the sponsor (negative excess is an equity cure)
+    exit equity = exit multiple × final EBITDA - remaining debt
+Scheduled debt service comes from debt_schedule_engine (monthly amortization, IO,
+annual roll-up). A prepayment re-amortizes the remaining schedule pro rata, so a
+structure's service is its unit schedule scaled by balance / scheduled balance.
+
+Sweep trades deleveraging (earns the debt rate, raises MOIC) against earlier
+distributions (raise IRR when the IRR exceeds the debt rate), so the two objectives
+can pick different sweeps.
+
+Search: every case × structure on a coarse grid in one vectorized pass. DSCR and equity
+feasibility only tighten as leverage rises, so for every term option × sweep the largest
+feasible leverage is then bisected, and the objective is read on that boundary. Finally,
+for the best few options, sweep is refined along the boundary. Each candidate keeps its
+own step, which halves only after a round in which neither neighbour improves on it.
+Cases are batched along the leading axis.
+
+Usage:
+    python capital_structure_optimizer.py --objective irr --cases 100
+"""
+
+import io
+import time
+import argparse
+import contextlib
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from debt_schedule_engine import build_amortization_schedule, annualize_schedule
+
+OBJECTIVES = ("irr", "moic")
+
+# =============================================================================
+# INPUTS
+# =============================================================================
+
+@dataclass
+class LBOCase:
+    """Operating projection for one target over the hold (per-year arrays, years 1..hold)"""
+    name: str
+    entry_ebitda: float
+    entry_multiple: float
+    ebitda: Sequence[float]
+    da: float
+    maintenance_capex: Sequence[float]
+    tax_rate: float
+    exit_multiple: float
+    delta_wc: Sequence[float] = None
+    downside_ebitda_factor: float = 0.90
+
+    @property
+    def hold_years(self) -> int:
+        return len(self.ebitda)
+
+    @classmethod
+    def from_validator(cls, validator, ttm_metrics: Dict, entry_multiple: float = None,
+                       name: str = None, downside_ebitda_factor: float = 0.90) -> "LBOCase":
+        """Case from a HarborGlow/LumiDerm-style validator (uses its operating projection)"""
+        if entry_multiple is None:
+            sources_uses = validator.calculate_lbo_sources_uses(ttm_metrics)
+            entry_multiple = sources_uses['entry_ev'] / ttm_metrics['ttm_ebitda_adjusted']
+        else:
+            sources_uses = validator.calculate_lbo_sources_uses(ttm_metrics, entry_multiple)
+        schedule = validator.build_debt_schedule(ttm_metrics, sources_uses)
+        return cls(
+            name=name or type(validator).__name__.replace("Validator", ""),
+            entry_ebitda=ttm_metrics['ttm_ebitda_adjusted'],
+            entry_multiple=entry_multiple,
+            ebitda=[year['ebitda'] for year in schedule],
+            da=validator.da_annual,
+            maintenance_capex=[year['maint_capex'] for year in schedule],
+            tax_rate=validator.tax_rate,
+            exit_multiple=validator.exit_multiple,
+            delta_wc=[year['delta_wc'] for year in schedule],
+            downside_ebitda_factor=downside_ebitda_factor,
+        )
+
+@dataclass
+class TermMenu:
+    """Debt term options on offer; rate = base rate + tenor and IO premiums"""
+    rates: Sequence[float] = (0.08, 0.085, 0.09, 0.095, 0.10)
+    tenors: Sequence[float] = (5, 7, 10)
+    io_months: Sequence[float] = (0, 12, 24)
+    tenor_premium: float = 0.0025     # per year of tenor beyond the shortest
+    io_premium: float = 0.0025        # per year of interest-only
+
+    def options(self) -> Dict[str, np.ndarray]:
+        R, T, IO = (v.ravel() for v in np.meshgrid(np.asarray(self.rates, float), np.asarray(self.tenors, float),
+                                                   np.asarray(self.io_months, float), indexing="ij"))
+        rate = R + self.tenor_premium * (T - T.min()) + self.io_premium * IO / 12
+        return {"base_rate": R, "rate": rate, "tenor": T, "io_months": IO}
+
+@dataclass
+class StructureConstraints:
+    base_min_dscr: float = 1.70
+    downside_min_dscr: float = 1.50
+    max_leverage: float = 4.5
+    min_leverage: float = 0.0
+
+@dataclass
+class CapitalStructureResult:
+    """Optimal structure for one case"""
+    case: str
+    objective: str
+    feasible: bool
+    leverage: float = np.nan
+    debt: float = np.nan
+    rate: float = np.nan
+    tenor: float = np.nan
+    io_months: float = np.nan
+    sweep: float = np.nan
+    irr: float = np.nan
+    moic: float = np.nan
+    equity_check: float = np.nan
+    min_dscr_base: float = np.nan
+    min_dscr_downside: float = np.nan
+    binding_constraint: str = ""
+    evaluations: int = 0
+    debt_balance_by_year: List[float] = field(default_factory=list)
+    distributions_by_year: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+# =============================================================================
+# VECTORIZED STRUCTURE MODEL
+# =============================================================================
+
+def _unit_service_factors(menu: Dict[str, np.ndarray], hold_years: int) -> Dict[str, np.ndarray]:
+    """Interest and scheduled principal per unit of opening balance, (options × years)"""
+    annual = annualize_schedule(build_amortization_schedule(1.0, menu["rate"], menu["tenor"], menu["io_months"],
+                                                            horizon_years=hold_years))
+    opening = np.concatenate([np.ones((menu["rate"].size, 1)), annual["closing_balance"][:, :-1]], axis=1)
+    alive = opening > 1e-12
+    safe = np.where(alive, opening, 1.0)
+    return {"interest": np.where(alive, annual["interest"] / safe, 0.0),
+            "principal": np.where(alive, annual["principal"] / safe, 1.0)}
+
+def irr_batch(cashflows: np.ndarray, low: float = -0.99, high: float = 10.0, iterations: int = 60) -> np.ndarray:
+    """IRR of each row of annual cash flows (row 0 = entry) by vectorized bisection; NaN if not bracketed"""
+    years = np.arange(cashflows.shape[-1])
+    npv = lambda r: np.sum(cashflows / (1 + r[..., None]) ** years, axis=-1)
+    lo = np.full(cashflows.shape[:-1], low)
+    hi = np.full(cashflows.shape[:-1], high)
+    npv_lo = npv(lo)
+    bracketed = np.sign(npv_lo) * np.sign(npv(hi)) <= 0
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        npv_mid = npv(mid)
+        same = np.sign(npv_mid) == np.sign(npv_lo)
+        lo, npv_lo = np.where(same, mid, lo), np.where(same, npv_mid, npv_lo)
+        hi = np.where(same, hi, mid)
+    return np.where(bracketed, 0.5 * (lo + hi), np.nan)
+
+def _pack_cases(cases: Sequence[LBOCase]) -> Dict[str, np.ndarray]:
+    hold = {case.hold_years for case in cases}
+    if len(hold) != 1:
+        raise ValueError(f"All cases in a batch need the same hold period, got {sorted(hold)}")
+    hold_years = hold.pop()
+
+    def per_year(values):
+        return np.broadcast_to(np.asarray(0.0 if values is None else values, float), (hold_years,))
+
+    return {
+        "entry_ebitda": np.array([c.entry_ebitda for c in cases], float)[:, None],
+        "entry_ev": np.array([c.entry_ebitda * c.entry_multiple for c in cases], float)[:, None],
+        "ebitda": np.stack([per_year(c.ebitda) for c in cases]),
+        "da": np.array([c.da for c in cases], float)[:, None],
+        "capex": np.stack([per_year(c.maintenance_capex) for c in cases]),
+        "delta_wc": np.stack([per_year(c.delta_wc) for c in cases]),
+        "tax_rate": np.array([c.tax_rate for c in cases], float)[:, None],
+        "exit_multiple": np.array([c.exit_multiple for c in cases], float)[:, None],
+        "downside": np.array([c.downside_ebitda_factor for c in cases], float)[:, None],
+        "hold_years": hold_years,
+    }
+
+def evaluate_structures(packed: Dict[str, np.ndarray], factors: Dict[str, np.ndarray], option: np.ndarray,
+                        leverage: np.ndarray, sweep: np.ndarray, keep_paths: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Base and downside cash model for (cases × structures) arrays of term option index,
+    leverage and sweep. IRR is left to solve_irr so it can be restricted to feasible cells.
+    """
+    hold_years = packed["hold_years"]
+    debt0 = leverage * packed["entry_ebitda"]
+    equity = packed["entry_ev"] - debt0
+
+    min_dscr = {}
+    balance_paths, distribution_paths = [], []
+    for scenario, scale in (("base", 1.0), ("downside", packed["downside"])):
+        balance = debt0.copy()
+        worst = np.full(debt0.shape, np.inf)
+        distributions = []
+        for year in range(hold_years):
+            ebitda = packed["ebitda"][:, year:year + 1] * scale
+            interest = balance * factors["interest"][option, year]
+            principal = np.minimum(balance * factors["principal"][option, year], balance)
+            service = interest + principal
+            taxes = np.maximum(0.0, (ebitda - packed["da"] - interest) * packed["tax_rate"])
+            cfads = ebitda - taxes - packed["capex"][:, year:year + 1] - packed["delta_wc"][:, year:year + 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                dscr = np.where(service > 0, cfads / np.where(service > 0, service, 1.0), np.inf)
+            worst = np.minimum(worst, dscr)
+
+            excess = cfads - service
+            prepayment = np.clip(sweep * excess, 0.0, balance - principal)
+            balance = balance - principal - prepayment
+            distributions.append(excess - prepayment)
+            if scenario == "base":
+                balance_paths.append(balance)
+        min_dscr[scenario] = worst
+        if scenario == "base":
+            distribution_paths = distributions
+            exit_balance = balance
+
+    exit_equity = packed["exit_multiple"] * packed["ebitda"][:, -1:] - exit_balance
+    cash_in = np.stack(distribution_paths, axis=-1)
+    cash_in[..., -1] += exit_equity
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moic = np.where(equity > 0, cash_in.sum(axis=-1) / np.where(equity > 0, equity, 1.0), 0.0)
+
+    result = {"equity_check": equity, "debt": debt0, "min_dscr_base": min_dscr["base"],
+              "min_dscr_downside": min_dscr["downside"], "exit_equity": exit_equity, "moic": moic,
+              "cash_in": cash_in}
+    if keep_paths:
+        result["debt_balance_by_year"] = np.stack(balance_paths, axis=-1)
+        result["distributions_by_year"] = np.stack(distribution_paths, axis=-1)
+    return result
+
+def solve_irr(metrics: Dict[str, np.ndarray], mask: np.ndarray = None) -> np.ndarray:
+    """Sponsor IRR where mask is True (and the equity check is positive), NaN elsewhere"""
+    equity = metrics["equity_check"]
+    solve = (equity > 0) if mask is None else (mask & (equity > 0))
+    irr = np.full(equity.shape, np.nan)
+    if solve.any():
+        irr[solve] = irr_batch(np.concatenate([-equity[solve][:, None], metrics["cash_in"][solve]], axis=1))
+    metrics["irr"] = irr
+    return irr
+
+def _feasible(metrics: Dict[str, np.ndarray], leverage: np.ndarray, constraints: StructureConstraints) -> np.ndarray:
+    return ((metrics["min_dscr_base"] >= constraints.base_min_dscr)
+            & (metrics["min_dscr_downside"] >= constraints.downside_min_dscr)
+            & (leverage <= constraints.max_leverage + 1e-12)
+            & (metrics["equity_check"] > 0))
+
+# =============================================================================
+# OPTIMIZER
+# =============================================================================
+
+def optimize_capital_structure(cases: Sequence[LBOCase], objective: str = "irr", menu: TermMenu = None,
+                               constraints: StructureConstraints = None, leverage_points: int = 19,
+                               sweep_points: int = 5, boundary_sweep_points: int = 21, bisection_steps: int = 16,
+                               refine_options: int = 3, refine_rounds: int = 8) -> List[CapitalStructureResult]:
+    """
+    Best feasible structure for every case (coarse grid, leverage boundary, sweep refinement).
+
+    All cases must share a hold period; they are evaluated together in every pass.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    menu = menu or TermMenu()
+    constraints = constraints or StructureConstraints()
+    packed = _pack_cases(cases)
+    options = menu.options()
+    factors = _unit_service_factors(options, packed["hold_years"])
+    n_cases, n_options = len(cases), options["rate"].size
+    rows = np.arange(n_cases)
+
+    def run(option, leverage, sweep):
+        metrics = evaluate_structures(packed, factors, option, leverage, sweep)
+        feasible = _feasible(metrics, leverage, constraints)
+        if objective == "irr":
+            solve_irr(metrics, feasible)   # IRR only matters where the constraints pass
+        return metrics, np.where(feasible, metrics[objective], -np.inf)
+
+    def feasible_at(option, leverage, sweep):
+        return _feasible(evaluate_structures(packed, factors, option, leverage, sweep), leverage, constraints)
+
+    def max_feasible_leverage(option, sweep):
+        """Largest feasible leverage per structure (min_leverage where nothing is feasible)"""
+        lo = np.full(option.shape, float(constraints.min_leverage))
+        hi = np.full(option.shape, float(constraints.max_leverage))
+        lo = np.where(feasible_at(option, hi, sweep), hi, lo)
+        for _ in range(bisection_steps):
+            mid = 0.5 * (lo + hi)
+            ok = feasible_at(option, mid, sweep)
+            lo, hi = np.where(ok, mid, lo), np.where(ok, hi, mid)
+        return lo
+
+    best = {}
+
+    def keep_best(option, leverage, sweep, values):
+        index = values.argmax(axis=1)
+        value = values[rows, index]
+        better = value > best["value"] if best else np.ones(n_cases, bool)
+        for name, candidate in (("value", value), ("option", option[rows, index]),
+                                ("leverage", leverage[rows, index]), ("sweep", sweep[rows, index])):
+            best[name] = np.where(better, candidate, best[name]) if name in best else candidate
+
+    # Coarse grid: every option × leverage × sweep, identical for every case (catches interior optima)
+    leverage_grid = np.linspace(constraints.min_leverage, constraints.max_leverage, leverage_points)
+    sweep_grid = np.linspace(0.0, 1.0, sweep_points)
+    O, L, S = (np.broadcast_to(v.ravel(), (n_cases, v.size)) for v in
+               np.meshgrid(np.arange(n_options), leverage_grid, sweep_grid, indexing="ij"))
+    _, coarse = run(O, L, S)
+    keep_best(O, L, S, coarse)
+    evaluations = O.shape[1]
+
+    # Leverage boundary: bisect the largest feasible leverage for every option × sweep
+    boundary_sweeps = np.linspace(0.0, 1.0, boundary_sweep_points)
+    O, S = (np.broadcast_to(v.ravel(), (n_cases, v.size)) for v in
+            np.meshgrid(np.arange(n_options), boundary_sweeps, indexing="ij"))
+    L = max_feasible_leverage(O, S)
+    _, boundary = run(O, L, S)
+    keep_best(O, L, S, boundary)
+    evaluations += O.shape[1] * (bisection_steps + 2)
+
+    # Sweep refinement along the boundary for the best few options per case
+    per_option = boundary.reshape(n_cases, n_options, boundary_sweep_points)
+    top_options = np.argsort(-per_option.max(axis=2), axis=1)[:, :refine_options]
+    center_value = per_option.max(axis=2)[rows[:, None], top_options]
+    center_sweep = boundary_sweeps[per_option.argmax(axis=2)[rows[:, None], top_options]]
+    step = np.full(center_sweep.shape, 1.0 / max(boundary_sweep_points - 1, 1))
+    option = np.repeat(top_options, 2, axis=1)
+    for _ in range(refine_rounds):
+        sweep = np.clip(center_sweep[..., None] + step[..., None] * np.array([-1.0, 1.0]), 0.0, 1.0)
+        sweep = sweep.reshape(n_cases, -1)
+        leverage = max_feasible_leverage(option, sweep)
+        _, values = run(option, leverage, sweep)
+        keep_best(option, leverage, sweep, values)
+        evaluations += option.shape[1] * (bisection_steps + 2)
+
+        local = values.reshape(n_cases, refine_options, 2)
+        pick = local.argmax(axis=2)[..., None]
+        local_value = np.take_along_axis(local, pick, axis=2)[..., 0]
+        improved = local_value > center_value
+        center_sweep = np.where(improved, np.take_along_axis(sweep.reshape(local.shape), pick, axis=2)[..., 0],
+                                center_sweep)
+        center_value = np.where(improved, local_value, center_value)
+        step = np.where(improved, step, step / 2)
+
+    best_value, best_option, best_leverage, best_sweep = (best[k] for k in ("value", "option", "leverage", "sweep"))
+    final = evaluate_structures(packed, factors, best_option[:, None], best_leverage[:, None], best_sweep[:, None],
+                                keep_paths=True)
+    solve_irr(final)
+    results = []
+    for i, case in enumerate(cases):
+        if not np.isfinite(best_value[i]):
+            results.append(CapitalStructureResult(case=case.name, objective=objective, feasible=False,
+                                                  binding_constraint="no feasible structure", evaluations=evaluations))
+            continue
+        o = best_option[i]
+        slack = {
+            "base DSCR": final["min_dscr_base"][i, 0] / constraints.base_min_dscr - 1,
+            "downside DSCR": final["min_dscr_downside"][i, 0] / constraints.downside_min_dscr - 1,
+            "max leverage": 1 - best_leverage[i] / constraints.max_leverage if constraints.max_leverage > 0 else 0.0,
+        }
+        results.append(CapitalStructureResult(
+            case=case.name,
+            objective=objective,
+            feasible=True,
+            leverage=float(best_leverage[i]),
+            debt=float(final["debt"][i, 0]),
+            rate=float(options["rate"][o]),
+            tenor=float(options["tenor"][o]),
+            io_months=float(options["io_months"][o]),
+            sweep=float(best_sweep[i]),
+            irr=float(final["irr"][i, 0]),
+            moic=float(final["moic"][i, 0]),
+            equity_check=float(final["equity_check"][i, 0]),
+            min_dscr_base=float(final["min_dscr_base"][i, 0]),
+            min_dscr_downside=float(final["min_dscr_downside"][i, 0]),
+            binding_constraint=min(slack, key=slack.get),
+            evaluations=evaluations,
+            debt_balance_by_year=final["debt_balance_by_year"][i, 0].tolist(),
+            distributions_by_year=final["distributions_by_year"][i, 0].tolist(),
+        ))
+    return results
+
+def build_screening_cases(n_cases: int, seed: int = 7, hold_years: int = 5) -> List[LBOCase]:
+    """Synthetic single-site practices for screening benchmarks"""
+    rng = np.random.default_rng(seed)
+    cases = []
+    for i in range(n_cases):
+        ebitda0 = rng.uniform(0.8e6, 3.0e6)
+        growth = rng.uniform(0.0, 0.08)
+        ebitda = ebitda0 * (1 + growth) ** np.arange(1, hold_years + 1)
+        cases.append(LBOCase(
+            name=f"practice_{i:03d}",
+            entry_ebitda=ebitda0,
+            entry_multiple=rng.uniform(6.5, 9.5),
+            ebitda=ebitda,
+            da=ebitda0 * rng.uniform(0.06, 0.12),
+            maintenance_capex=ebitda * rng.uniform(0.06, 0.12),
+            tax_rate=0.26,
+            exit_multiple=rng.uniform(7.0, 9.0),
+            delta_wc=ebitda * 0.01,
+            downside_ebitda_factor=rng.uniform(0.80, 0.92),
+        ))
+    return cases
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Capital-structure optimizer (IRR / MOIC under DSCR floors)")
+    parser.add_argument('--objective', choices=OBJECTIVES, default="irr")
+    parser.add_argument('--cases', type=int, default=100, help="Synthetic cases to batch")
+    parser.add_argument('--base-dscr', type=float, default=1.70)
+    parser.add_argument('--downside-dscr', type=float, default=1.50)
+    parser.add_argument('--max-leverage', type=float, default=4.5)
+    args = parser.parse_args()
+
+    print("🏗️  CAPITAL STRUCTURE OPTIMIZER")
+    print("=" * 60)
+    constraints = StructureConstraints(args.base_dscr, args.downside_dscr, args.max_leverage)
+
+    from harborglow_aesthetic_simulation import HarborGlowValidator
+    from lumiderm_aesthetic_simulation import LumiDermValidator
+    named_cases = []
+    for validator in (HarborGlowValidator(), LumiDermValidator()):
+        with contextlib.redirect_stdout(io.StringIO()):   # TTM checks print their own banner
+            ttm_metrics = validator.calculate_ttm_metrics()
+        named_cases.append(LBOCase.from_validator(validator, ttm_metrics))
+
+    for objective in OBJECTIVES:
+        print(f"\nObjective: {objective.upper()}")
+        for r in optimize_capital_structure(named_cases, objective, constraints=constraints):
+            if not r.feasible:
+                print(f"   {r.case}: ❌ no feasible structure")
+                continue
+            print(f"   {r.case}: {r.leverage:.2f}x debt @ {r.rate:.2%}, {r.tenor:.0f}y, IO {r.io_months:.0f}m, "
+                  f"sweep {r.sweep:.0%} → IRR {r.irr:.1%}, MOIC {r.moic:.2f}x "
+                  f"(DSCR {r.min_dscr_base:.2f}x / {r.min_dscr_downside:.2f}x, binding: {r.binding_constraint})")
+
+    cases = build_screening_cases(args.cases)
+    start = time.perf_counter()
+    results = optimize_capital_structure(cases, args.objective, constraints=constraints)
+    elapsed = time.perf_counter() - start
+    feasible = [r for r in results if r.feasible]
+    print(f"\nBatch: {len(cases)} cases in {elapsed:.2f}s ({elapsed / len(cases) * 1000:.1f} ms/case, "
+          f"{results[0].evaluations:,} structures/case)")
+    print(f"   Feasible: {len(feasible)}/{len(cases)}   median {args.objective.upper()}: "
+          f"{np.median([getattr(r, args.objective) for r in feasible]):.3f}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
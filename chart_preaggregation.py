@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Chart Pre-Aggregation
+Fixed-size chart payloads (histograms, CDF knots, quantile bands) from large sample arrays
+
+Charts never need raw draws: a histogram, ~100 CDF knots and a handful of quantiles
+describe 10k or 10M samples equally well. This module reduces sample arrays before
+they reach Altair or the report-kit templates, so the browser payload is bounded by
+the number of bins and knots rather than the number of simulations.
+
+Binning is vectorized (one np.histogram / np.percentile per array) and every summary
+is cached under a content hash of the array plus the aggregation parameters.
+
+Usage:
+    python chart_preaggregation.py medispa_sensitivity_analysis.json -o report-kit/cases/medispa_mc.json
+    python chart_preaggregation.py report-kit/cases/vistabelle.json --monte-carlo 100000
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_BINS = 40
+DEFAULT_CDF_KNOTS = 101
+DEFAULT_QUANTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+DEFAULT_SCATTER_POINTS = 1000
+MIN_SAMPLES_TO_AGGREGATE = 200     # shorter numeric lists are left as-is
+PAYLOAD_LIMIT_BYTES = 100_000
+
+# =============================================================================
+# HASHING & CACHE
+# =============================================================================
+
+def dataset_hash(values: np.ndarray) -> str:
+    """Content hash of an array (dtype and shape included)"""
+    array = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{array.dtype.str}{array.shape}".encode("ascii"))
+    digest.update(array.data)
+    return digest.hexdigest()
+
+class AggregationCache:
+    """Thread-safe LRU of aggregation results keyed by (dataset hash, operation, params)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: tuple, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+AGGREGATION_CACHE = AggregationCache()
+
+def _as_finite_array(values: Sequence[float]) -> np.ndarray:
+    array = np.asarray(values, dtype=float).ravel()
+    return array[np.isfinite(array)]
+
+def _cached(operation: str, values: np.ndarray, params: tuple, compute, data_hash: Optional[str] = None):
+    key = (data_hash or dataset_hash(values), operation, params)
+    return AGGREGATION_CACHE.get_or_compute(key, compute)
+
+# =============================================================================
+# AGGREGATIONS
+# =============================================================================
+
+def histogram(values: Sequence[float], bins: int = DEFAULT_BINS, value_range: Optional[tuple] = None,
+              data_hash: Optional[str] = None) -> Dict[str, Any]:
+    """Fixed-bin histogram: bin edges, counts and densities"""
+    array = _as_finite_array(values)
+
+    def compute():
+        if array.size == 0:
+            return {"edges": [], "counts": [], "density": []}
+        counts, edges = np.histogram(array, bins=bins, range=value_range)
+        widths = np.diff(edges)
+        density = counts / (array.size * np.where(widths > 0, widths, 1.0))
+        return {"edges": edges.tolist(), "counts": counts.tolist(), "density": density.tolist()}
+
+    return _cached("histogram", array, (bins, value_range), compute, data_hash)
+
+def cdf_knots(values: Sequence[float], n_knots: int = DEFAULT_CDF_KNOTS,
+              data_hash: Optional[str] = None) -> Dict[str, Any]:
+    """Empirical CDF sampled at n_knots evenly spaced probabilities"""
+    array = _as_finite_array(values)
+
+    def compute():
+        probabilities = np.linspace(0.0, 1.0, n_knots)
+        if array.size == 0:
+            return {"probabilities": probabilities.tolist(), "values": []}
+        return {"probabilities": probabilities.tolist(), "values": np.quantile(array, probabilities).tolist()}
+
+    return _cached("cdf", array, (n_knots,), compute, data_hash)
+
+def quantile_summary(values: Sequence[float], quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                     data_hash: Optional[str] = None) -> Dict[str, float]:
+    """Count, moments and named percentiles (p5, p50, ...)"""
+    array = _as_finite_array(values)
+
+    def compute():
+        if array.size == 0:
+            return {"count": 0}
+        percentiles = np.percentile(array, quantiles)
+        return {
+            "count": int(array.size),
+            "mean": float(array.mean()),
+            "std": float(array.std()),
+            "min": float(array.min()),
+            "max": float(array.max()),
+            **{f"p{q:g}": float(v) for q, v in zip(quantiles, percentiles)},
+        }
+
+    return _cached("quantiles", array, tuple(quantiles), compute, data_hash)
+
+def quantile_bands(paths: np.ndarray, quantiles: Sequence[float] = (5, 25, 50, 75, 95),
+                   axis: int = 0) -> Dict[str, Any]:
+    """Per-step quantile bands for (draws × steps) arrays, e.g. yearly fan charts"""
+    array = np.asarray(paths, dtype=float)
+
+    def compute():
+        bands = np.nanpercentile(array, quantiles, axis=axis)
+        return {f"p{q:g}": band.tolist() for q, band in zip(quantiles, bands)}
+
+    return AGGREGATION_CACHE.get_or_compute((dataset_hash(array), "bands", (tuple(quantiles), axis)), compute)
+
+def scatter_sample(x: Sequence[float], y: Sequence[float], max_points: int = DEFAULT_SCATTER_POINTS,
+                   seed: int = 0) -> list:
+    """Fixed-size random subsample of (x, y) pairs for scatter plots"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.size > max_points:
+        index = np.sort(np.random.default_rng(seed).choice(x.size, max_points, replace=False))
+        x, y = x[index], y[index]
+    return np.column_stack([x, y]).round(6).tolist()
+
+def summarize_samples(values: Sequence[float], bins: int = DEFAULT_BINS,
+                      n_knots: int = DEFAULT_CDF_KNOTS) -> Dict[str, Any]:
+    """Everything a distribution chart needs, independent of sample count"""
+    array = _as_finite_array(values)
+    data_hash = dataset_hash(array)
+    return {
+        "_preaggregated": True,
+        "dataset_hash": data_hash,
+        "summary": quantile_summary(array, data_hash=data_hash),
+        "histogram": histogram(array, bins, data_hash=data_hash),
+        "cdf": cdf_knots(array, n_knots, data_hash=data_hash),
+    }
+
+def summarize_returns_simulation(irr: Sequence[float], moic: Sequence[float],
+                                 revenue_growth: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+    """`monte_carlo_summary` block for report-kit/templates/monte-carlo.html (rates as decimals)"""
+    irr_pct = np.asarray(irr, dtype=float) * 100
+    summary = {
+        "n_simulations": int(irr_pct.size),
+        "irr": summarize_samples(irr_pct),
+        "moic": summarize_samples(moic),
+    }
+    if revenue_growth is not None:
+        summary["scatter"] = scatter_sample(np.asarray(revenue_growth, dtype=float) * 100, irr_pct)
+    return summary
+
+def simulate_case_returns(case: Dict[str, Any], n_simulations: int = 10000, seed: int = 42) -> Dict[str, np.ndarray]:
+    """
+    Vectorized port of monte-carlo.html's in-browser runMonteCarloSimulation for a case JSON
+    (needs ttm_metrics, irr_analysis.exit_debt and sources_uses.sponsor_equity): 5-year exit
+    with growth ~ N(7%, 2.5%), margin ~ Beta(2, 2) on [15%, 25%], exit multiple ~
+    Triangular(6.5, 8.0, 9.5) and exit debt at 80-120% of the base case.
+    """
+    rng = np.random.default_rng(seed)
+    revenue_growth = rng.normal(0.07, 0.025, n_simulations)
+    ebitda_margin = 0.15 + 0.10 * rng.beta(2, 2, n_simulations)
+    exit_multiple = rng.triangular(6.5, 8.0, 9.5, n_simulations)
+    exit_debt = case["irr_analysis"]["exit_debt"] * rng.uniform(0.8, 1.2, n_simulations)
+
+    exit_ev = case["ttm_metrics"]["ttm_revenue"] * (1 + revenue_growth) ** 5 * ebitda_margin * exit_multiple
+    moic = (exit_ev - exit_debt) / case["sources_uses"]["sponsor_equity"]
+    irr = np.where(moic > 0, np.maximum(moic, 1e-12) ** (1 / 5) - 1, -1.0)   # equity wiped out → -100%
+    return {"irr": irr, "moic": moic, "revenue_growth": revenue_growth}
+
+def attach_monte_carlo_summary(case: Dict[str, Any], n_simulations: int = 10000, seed: int = 42) -> Dict[str, Any]:
+    """Case JSON with a `monte_carlo_summary` block, so monte-carlo.html skips its in-browser simulation"""
+    draws = simulate_case_returns(case, n_simulations, seed)
+    return {**case, "monte_carlo_summary": summarize_returns_simulation(draws["irr"], draws["moic"],
+                                                                        draws["revenue_growth"])}
+
+# =============================================================================
+# PAYLOAD REDUCTION
+# =============================================================================
+
+def _is_numeric_list(value: Any) -> bool:
+    return (isinstance(value, list) and len(value) >= MIN_SAMPLES_TO_AGGREGATE
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value))
+
+def preaggregate_payload(payload: Any, bins: int = DEFAULT_BINS, n_knots: int = DEFAULT_CDF_KNOTS) -> Any:
+    """
+    Recursively replace long numeric lists with summarize_samples() dicts.
+
+    A `samples` mapping (as produced by generate_monte_carlo_distributions) is
+    renamed `sample_summaries` so templates can tell raw from aggregated data.
+    """
+    if isinstance(payload, dict):
+        reduced = {}
+        for key, value in payload.items():
+            if key == "samples" and isinstance(value, dict):
+                reduced["sample_summaries"] = {
+                    name: summarize_samples(v, bins, n_knots) if _is_numeric_list(v) else v
+                    for name, v in value.items()
+                }
+            else:
+                reduced[key] = preaggregate_payload(value, bins, n_knots)
+        return reduced
+    if isinstance(payload, list):
+        if _is_numeric_list(payload):
+            return summarize_samples(payload, bins, n_knots)
+        return [preaggregate_payload(v, bins, n_knots) for v in payload]
+    if isinstance(payload, np.ndarray) and payload.size >= MIN_SAMPLES_TO_AGGREGATE:
+        return summarize_samples(payload, bins, n_knots)
+    return payload
+
+def payload_size_bytes(payload: Any) -> int:
+    """Size of the compact JSON encoding sent to the browser"""
+    return len(json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8"))
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Pre-aggregate sample arrays in a case/results JSON")
+    parser.add_argument('input', help="JSON file containing raw sample arrays")
+    parser.add_argument('-o', '--output', help="Output path (default: <input>_preaggregated.json)")
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS)
+    parser.add_argument('--knots', type=int, default=DEFAULT_CDF_KNOTS)
+    parser.add_argument('--monte-carlo', type=int, default=0, metavar='N',
+                        help="Add a monte_carlo_summary of N simulated exits (report-kit case JSON)")
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        payload = json.load(f)
+
+    if args.monte_carlo:
+        payload = attach_monte_carlo_summary(payload, args.monte_carlo)
+    reduced = preaggregate_payload(payload, args.bins, args.knots)
+    output = args.output or f"{os.path.splitext(args.input)[0]}_preaggregated.json"
+    with open(output, 'w') as f:
+        json.dump(reduced, f, separators=(",", ":"))
+
+    before, after = os.path.getsize(args.input), payload_size_bytes(reduced)
+    print(f"📉 {args.input}: {before / 1024:,.1f} KB → {output}: {after / 1024:,.1f} KB")
+    if after > PAYLOAD_LIMIT_BYTES:
+        print(f"⚠️ Payload still above {PAYLOAD_LIMIT_BYTES // 1000} KB; remaining size is not sample data")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -21,7 +21,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import EPV system components
 try:
-    from unified_epv_system import EPVInputs, ServiceLine, compute_unified_epv
+    from unified_epv_system import EPVInputs, ServiceLine, FrozenEPVInputs, compute_unified_epv
 except ImportError:
     print("Warning: Could not import EPV system. Running in standalone mode.")
 
@@ -397,32 +397,29 @@ def run_monte_carlo_analysis(case: CPPMedspaCase, base_inputs: EPVInputs) -> Dic
     
     print(f"Running Monte Carlo simulation with {case.monte_carlo_runs} iterations...")
     
+    frozen_base = FrozenEPVInputs.from_inputs(base_inputs)
+    
     for i in range(case.monte_carlo_runs):
-        # Create variation in key parameters
-        varied_inputs = EPVInputs(**asdict(base_inputs))
-        
+        # Create variation in key parameters (copy-on-write from the frozen base)
         # Revenue variance (±3%)
         revenue_factor = np.random.uniform(0.97, 1.03)
-        varied_inputs.service_lines = [
-            ServiceLine(
-                id=sl.id,
-                name=sl.name,
+        varied_lines = [
+            sl._replace(
                 price=sl.price * revenue_factor,
-                volume=sl.volume,
                 cogs_pct=sl.cogs_pct * np.random.uniform(0.95, 1.05),  # COGS variance
-                kind=sl.kind,
-                growth_rate=sl.growth_rate
-            ) for sl in base_inputs.service_lines
+                margin_adjustment=0.0
+            ) for sl in frozen_base.service_lines
         ]
         
-        # Cost structure variance (±2%)
-        varied_inputs.clinical_labor_pct *= np.random.uniform(0.98, 1.02)
-        varied_inputs.marketing_pct *= np.random.uniform(0.98, 1.02)
-        varied_inputs.admin_pct *= np.random.uniform(0.98, 1.02)
-        
-        # WACC variance (±0.5%)
-        varied_inputs.beta *= np.random.uniform(0.95, 1.05)
-        varied_inputs.size_premium *= np.random.uniform(0.9, 1.1)
+        # Cost structure variance (±2%) and WACC variance (±0.5%)
+        varied_inputs = frozen_base.replace(
+            service_lines=varied_lines,
+            clinical_labor_pct=frozen_base.clinical_labor_pct * np.random.uniform(0.98, 1.02),
+            marketing_pct=frozen_base.marketing_pct * np.random.uniform(0.98, 1.02),
+            admin_pct=frozen_base.admin_pct * np.random.uniform(0.98, 1.02),
+            beta=frozen_base.beta * np.random.uniform(0.95, 1.05),
+            size_premium=frozen_base.size_premium * np.random.uniform(0.9, 1.1),
+        )
         
         try:
             # Run EPV calculation
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Debt Schedule Engine
+Vectorized amortization schedules and per-year DSCR surfaces for arrays of loans
+
+Builds interest, principal, interest-only and balloon schedules (monthly or annual
+periods) for any number of loans in one pass. Balances use the closed-form annuity
+balance B_k = P(1+r)^k - A((1+r)^k - 1)/r, so there is no loop over periods or loans.
+
+Loan terms:
+    principal, rate      - annual nominal rate, compounded per period
+    tenor_years          - maturity; any balance left at maturity is a balloon
+    io_months            - interest-only months before amortization starts
+    amortization_years   - amortization profile length including the IO period
+                           (defaults to tenor_years = fully amortizing)
+
+DSCR follows the dual convention of the SapphireDerm engines:
+    CFADS pre-shield  = EBITDA - tax × EBIT - maintenance capex
+    CFADS post-shield = EBITDA - max(0, tax × (EBIT - interest_y)) - maintenance capex
+    DSCR_y            = CFADS_y / (interest_y + scheduled principal_y)
+Balloons are reported separately and excluded from DSCR (refinancing risk, not
+operating coverage).
+
+Usage:
+    python debt_schedule_engine.py --ebitda 1200000 --da 180000 --capex 150000
+    python debt_schedule_engine.py --verify     # closed form vs a month-by-month loop
+"""
+
+import time
+import argparse
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# =============================================================================
+# SCHEDULES
+# =============================================================================
+
+def _annuity_balance(principal: np.ndarray, period_rate: np.ndarray, payment: np.ndarray,
+                     k: np.ndarray) -> np.ndarray:
+    """Balance after k level payments (broadcasts over loans × periods)"""
+    growth = (1 + period_rate) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amortized = np.where(period_rate > 0, payment * (growth - 1) / np.where(period_rate > 0, period_rate, 1.0),
+                             payment * k)
+    return np.maximum(principal * growth - amortized, 0.0)
+
+def build_amortization_schedule(principal: ArrayLike, rate: ArrayLike, tenor_years: ArrayLike,
+                                io_months: ArrayLike = 0, amortization_years: ArrayLike = None,
+                                periods_per_year: int = 12, horizon_years: int = None) -> Dict[str, np.ndarray]:
+    """
+    Period-by-period schedules for every loan (inputs broadcast against each other).
+
+    Returns (loans × periods) arrays over horizon_years (default: longest tenor):
+    opening_balance, interest, principal, balloon, payment, closing_balance, is_io.
+    """
+    amortization_years = tenor_years if amortization_years is None else amortization_years
+    P, r, tenor, io, amort = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in
+                                                   (principal, rate, tenor_years, io_months, amortization_years)))
+    shape = P.shape
+    P, r, tenor, io, amort = (v.reshape(-1, 1) for v in (P, r, tenor, io, amort))
+
+    horizon_years = int(np.ceil(tenor.max())) if horizon_years is None else horizon_years
+    t = np.arange(1, horizon_years * periods_per_year + 1)[None, :]
+
+    period_rate = r / periods_per_year
+    io_periods = np.round(io * periods_per_year / 12)
+    maturity = np.round(tenor * periods_per_year)
+    amort_periods = np.maximum(np.round(amort * periods_per_year) - io_periods, 1)
+
+    growth = (1 + period_rate) ** amort_periods
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(period_rate > 0, P * period_rate * growth / (growth - 1), P / amort_periods)
+
+    opening = _annuity_balance(P, period_rate, payment, np.clip(t - 1 - io_periods, 0, amort_periods))
+    closing = _annuity_balance(P, period_rate, payment, np.clip(t - io_periods, 0, amort_periods))
+
+    alive = t <= maturity
+    opening = np.where(alive, opening, 0.0)
+    interest = opening * period_rate
+    scheduled_principal = np.where(alive, opening - closing, 0.0)
+    at_maturity = t == maturity
+    balloon = np.where(at_maturity & (closing > 1e-9 * P), closing, 0.0)
+    closing = np.where(alive & ~at_maturity, closing, 0.0)
+
+    out_shape = shape + (t.shape[1],)
+    schedule = {
+        "opening_balance": opening,
+        "interest": interest,
+        "principal": scheduled_principal,
+        "balloon": balloon,
+        "payment": interest + scheduled_principal + balloon,
+        "closing_balance": closing,
+        "is_io": alive & (t <= io_periods),
+    }
+    schedule = {name: values.reshape(out_shape) for name, values in schedule.items()}
+    schedule["periods_per_year"] = periods_per_year
+    return schedule
+
+def annualize_schedule(schedule: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Sum period flows into years: (loans × years) interest, principal, balloon, debt_service"""
+    periods_per_year = schedule["periods_per_year"]
+    n_periods = schedule["interest"].shape[-1]
+    years_shape = schedule["interest"].shape[:-1] + (n_periods // periods_per_year, periods_per_year)
+
+    def per_year(values: np.ndarray) -> np.ndarray:
+        return values.reshape(years_shape).sum(axis=-1)
+
+    interest = per_year(schedule["interest"])
+    principal = per_year(schedule["principal"])
+    return {
+        "interest": interest,
+        "principal": principal,
+        "balloon": per_year(schedule["balloon"]),
+        "debt_service": interest + principal,
+        "closing_balance": schedule["closing_balance"].reshape(years_shape)[..., -1],
+    }
+
+# =============================================================================
+# REFERENCE LOOP
+# =============================================================================
+
+# IO, balloon, maturity-before-horizon, zero-rate and fractional-tenor loans
+VERIFY_CASES = [
+    {"principal": 1e6, "rate": 0.09, "tenor_years": 7},
+    {"principal": 1e6, "rate": 0.09, "tenor_years": 7, "io_months": 12},
+    {"principal": 1e6, "rate": 0.10, "tenor_years": 5, "io_months": 24},
+    {"principal": 1e6, "rate": 0.08, "tenor_years": 5, "amortization_years": 20},
+    {"principal": 1e6, "rate": 0.08, "tenor_years": 5, "io_months": 12, "amortization_years": 25},
+    {"principal": 1e6, "rate": 0.11, "tenor_years": 2, "io_months": 24},
+    {"principal": 1e6, "rate": 0.11, "tenor_years": 2, "io_months": 36},
+    {"principal": 1e6, "rate": 0.07, "tenor_years": 3.5},
+    {"principal": 1e6, "rate": 0.0, "tenor_years": 5, "io_months": 6},
+    {"principal": 2.5e6, "rate": 0.095, "tenor_years": 10, "io_months": 18, "periods_per_year": 4},
+    {"principal": 2.5e6, "rate": 0.095, "tenor_years": 10, "periods_per_year": 1, "amortization_years": 15},
+]
+
+def period_loop_schedule(principal: float, rate: float, tenor_years: float, io_months: float = 0,
+                         amortization_years: float = None, periods_per_year: int = 12,
+                         horizon_years: int = None) -> Dict[str, np.ndarray]:
+    """One loan, period by period (reference for build_amortization_schedule)"""
+    amortization_years = tenor_years if amortization_years is None else amortization_years
+    horizon_years = int(np.ceil(tenor_years)) if horizon_years is None else horizon_years
+    period_rate = rate / periods_per_year
+    io_periods = round(io_months * periods_per_year / 12)
+    maturity = round(tenor_years * periods_per_year)
+    amort_periods = max(round(amortization_years * periods_per_year) - io_periods, 1)
+    payment = (principal * period_rate / (1 - (1 + period_rate) ** -amort_periods) if period_rate > 0
+               else principal / amort_periods)
+
+    names = ("opening_balance", "interest", "principal", "balloon", "payment", "closing_balance", "is_io")
+    schedule = {name: np.zeros(horizon_years * periods_per_year) for name in names}
+    balance = principal
+    for k in range(min(maturity, horizon_years * periods_per_year)):
+        interest = balance * period_rate
+        scheduled = 0.0 if k < io_periods else min(payment - interest, balance)
+        closing = balance - scheduled
+        balloon = closing if k + 1 == maturity and closing > 1e-9 * principal else 0.0
+        for name, value in zip(names, (balance, interest, scheduled, balloon, interest + scheduled + balloon,
+                                       0.0 if k + 1 == maturity else closing, k < io_periods)):
+            schedule[name][k] = value
+        balance = closing
+    return schedule
+
+def verify_schedules(cases: Sequence[Dict] = None, horizon_years: int = 12) -> float:
+    """Largest |closed form - period loop| across cases and fields, relative to principal"""
+    worst = 0.0
+    for case in VERIFY_CASES if cases is None else cases:
+        vector = build_amortization_schedule(horizon_years=horizon_years, **case)
+        loop = period_loop_schedule(horizon_years=horizon_years, **case)
+        for name, values in loop.items():
+            worst = max(worst, np.max(np.abs(vector[name] - values)) / case["principal"])
+    return worst
+
+# =============================================================================
+# DSCR
+# =============================================================================
+
+def dual_dscr_by_year(annual: Dict[str, np.ndarray], ebitda: ArrayLike, da: float, maintenance_capex: float,
+                      tax_rate: float) -> Dict[str, np.ndarray]:
+    """Pre- and post-shield DSCR per year; ebitda broadcasts against (..., years)"""
+    ebitda = np.asarray(ebitda, dtype=float)
+    ebit = ebitda - da
+    cfads_pre = ebitda - ebit * tax_rate - maintenance_capex
+    cfads_post = ebitda - np.maximum(0.0, (ebit - annual["interest"]) * tax_rate) - maintenance_capex
+    debt_service = annual["debt_service"]
+    serviced = debt_service > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dscr_pre = np.where(serviced, cfads_pre / np.where(serviced, debt_service, 1.0), np.inf)
+        dscr_post = np.where(serviced, cfads_post / np.where(serviced, debt_service, 1.0), np.inf)
+    return {"dscr_pre": dscr_pre, "dscr_post": dscr_post,
+            "cfads_pre": np.broadcast_to(cfads_pre, dscr_pre.shape), "cfads_post": cfads_post}
+
+def dscr_surface(ebitda: float, leverage: ArrayLike, rates: ArrayLike, tenors: ArrayLike, io_months: ArrayLike,
+                 da: float, maintenance_capex: float, tax_rate: float, debt_basis_ebitda: float = None,
+                 n_years: int = 3, ebitda_growth: float = 0.0, periods_per_year: int = 12) -> Dict[str, np.ndarray]:
+    """
+    Per-year and minimum DSCR over the full leverage × rate × tenor × IO grid.
+
+    Debt = leverage × debt_basis_ebitda (default: ebitda). EBITDA grows at ebitda_growth
+    per year. Arrays are shaped (leverage, rate, tenor, io[, year]).
+    """
+    leverage, rates, tenors, io_months = (np.atleast_1d(np.asarray(v, dtype=float))
+                                          for v in (leverage, rates, tenors, io_months))
+    basis = ebitda if debt_basis_ebitda is None else debt_basis_ebitda
+    L, R, T, IO = np.meshgrid(leverage, rates, tenors, io_months, indexing="ij")
+
+    schedule = build_amortization_schedule(L * basis, R, T, IO, periods_per_year=periods_per_year,
+                                           horizon_years=max(n_years, 1))
+    annual = annualize_schedule(schedule)
+    annual = {name: values[..., :n_years] for name, values in annual.items()}
+    ebitda_by_year = ebitda * (1 + ebitda_growth) ** np.arange(n_years)
+    dscr = dual_dscr_by_year(annual, ebitda_by_year, da, maintenance_capex, tax_rate)
+
+    return {
+        "axes": {"leverage": leverage, "rate": rates, "tenor": tenors, "io_months": io_months,
+                 "year": np.arange(1, n_years + 1)},
+        "debt_amount": L * basis,
+        "interest": annual["interest"],
+        "principal": annual["principal"],
+        "debt_service": annual["debt_service"],
+        "balloon": annual["balloon"],
+        "dscr_pre": dscr["dscr_pre"],
+        "dscr_post": dscr["dscr_post"],
+        "min_dscr_pre": dscr["dscr_pre"].min(axis=-1),
+        "min_dscr_post": dscr["dscr_post"].min(axis=-1),
+    }
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Vectorized debt schedules and DSCR surfaces")
+    parser.add_argument('--ebitda', type=float, help="Year-1 EBITDA (required unless --verify)")
+    parser.add_argument('--da', type=float, default=0.0, help="D&A")
+    parser.add_argument('--capex', type=float, default=0.0, help="Maintenance capex")
+    parser.add_argument('--tax-rate', type=float, default=0.26)
+    parser.add_argument('--years', type=int, default=5, help="Projection years")
+    parser.add_argument('--min-dscr', type=float, default=1.50, help="Threshold to report max leverage")
+    parser.add_argument('--verify', action='store_true',
+                        help="Check the closed-form schedules against a period-by-period loop and exit")
+    args = parser.parse_args()
+
+    if args.verify:
+        worst = verify_schedules()
+        passed = worst < 1e-8
+        print(f"{'✅' if passed else '❌'} {len(VERIFY_CASES)} loans (IO, balloon, maturity, zero rate, "
+              f"quarterly/annual): max |closed form - loop| = {worst:.2e} × principal")
+        return 0 if passed else 1
+    if args.ebitda is None:
+        parser.error("--ebitda is required unless --verify is given")
+
+    print("🏦 DEBT SCHEDULE & DSCR SURFACE")
+    print("=" * 60)
+
+    leverage = np.arange(1.0, 5.01, 0.05)
+    rates = np.arange(0.07, 0.1301, 0.0025)
+    tenors = np.arange(5, 11)
+    io_months = np.array([0, 6, 12, 18, 24])
+    start = time.perf_counter()
+    surface = dscr_surface(args.ebitda, leverage, rates, tenors, io_months, args.da, args.capex,
+                           args.tax_rate, n_years=args.years)
+    elapsed = time.perf_counter() - start
+    n_loans = surface["debt_amount"].size
+    print(f"Loans: {n_loans:,} × {args.years} years of monthly schedules in {elapsed * 1000:.0f} ms")
+
+    viable = surface["min_dscr_post"] >= args.min_dscr
+    max_leverage = np.where(viable, leverage[:, None, None, None], np.nan)
+    with np.errstate(all="ignore"):
+        max_leverage = np.nanmax(max_leverage, axis=0)
+    print(f"\nMax leverage with min post-shield DSCR ≥ {args.min_dscr:.2f}x (IO 0 / 12 / 24 months):")
+    for rate_index in range(0, len(rates), 8):
+        for tenor_index in (0, len(tenors) - 1):
+            values = [max_leverage[rate_index, tenor_index, io_index] for io_index in (0, 2, 4)]
+            labels = " / ".join("  n/a" if np.isnan(v) else f"{v:.2f}x" for v in values)
+            print(f"   rate {rates[rate_index]:.2%}, tenor {tenors[tenor_index]}y: {labels}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
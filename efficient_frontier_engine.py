@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Efficient Frontier Engine
+Batched long-only mean-variance frontiers for service-line portfolios
+
+Every practice in the book contributes one (lines × lines) covariance and one mean
+return vector; every frontier point is one quadratic program
+
+    min ½ wᵀΣw   s.t.   Σw_i = 1,   μᵀw = target,   w ≥ 0
+
+All of them are solved together by a primal active-set method: each iteration solves
+one masked KKT system per problem with a single batched pseudo-inverse, then either
+steps to the equality-constrained optimum (stopping at the first weight that would go
+negative) or releases the fixed weight with the most negative multiplier. Frontier
+points are warm-started from the minimum-variance portfolio blended toward the
+highest-return line, which is feasible and already close to optimal, so few
+iterations are needed.
+
+With two or three annual returns per line the sample covariance is singular, so it is
+shrunk toward a structured target:
+    identity              - average variance on the diagonal
+    constant_correlation  - own variances, average pairwise correlation (floored at zero)
+The intensity is the Ledoit-Wolf estimate, floored at the share of dimensions the
+sample cannot span (1 - (observations - 1) / lines): with two observations the
+Ledoit-Wolf dispersion term is identically zero and would keep the singular sample.
+
+Usage:
+    python efficient_frontier_engine.py --practices 50 --lines 6 --verify
+"""
+
+import time
+import argparse
+from typing import Dict, Optional
+
+import numpy as np
+
+# =============================================================================
+# COVARIANCE
+# =============================================================================
+
+def shrink_covariance(returns: np.ndarray, target: str = "constant_correlation",
+                      intensity: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Shrunk covariance for returns shaped (observations × lines) or (practices × observations × lines).
+
+    intensity=None estimates the Ledoit-Wolf intensity per practice (with the rank floor);
+    target="sample" returns the plain sample covariance (ddof=1, as np.cov).
+    """
+    returns = np.asarray(returns, dtype=float)
+    single = returns.ndim == 2
+    if single:
+        returns = returns[None]
+    n_obs = returns.shape[1]
+    if n_obs < 2:
+        raise ValueError("need at least two return observations per line")
+
+    centred = returns - returns.mean(axis=1, keepdims=True)
+    sample = np.einsum('pti,ptj->pij', centred, centred) / n_obs
+    variances = np.einsum('pii->pi', sample)
+    n_lines = sample.shape[-1]
+
+    if target == "sample":
+        prior = sample
+    elif target == "identity":
+        prior = variances.mean(axis=1)[:, None, None] * np.eye(n_lines)
+    elif target == "constant_correlation":
+        vol = np.sqrt(variances)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.nan_to_num(sample / (vol[:, :, None] * vol[:, None, :]))
+        off_diagonal = ~np.eye(n_lines, dtype=bool)
+        mean_correlation = correlation[:, off_diagonal].mean(axis=1) if n_lines > 1 else np.zeros(len(sample))
+        # A negative average correlation is floored at zero: from a handful of observations it
+        # is mostly noise, and the diagonal prior keeps the target positive definite
+        mean_correlation = np.maximum(mean_correlation, 0.0)
+        prior = mean_correlation[:, None, None] * vol[:, :, None] * vol[:, None, :]
+        prior[:, np.arange(n_lines), np.arange(n_lines)] = variances
+    else:
+        raise ValueError(f"unknown shrinkage target {target!r}")
+
+    if target == "sample":
+        shrinkage = np.zeros(len(sample))
+    elif intensity is not None:
+        shrinkage = np.full(len(sample), float(np.clip(intensity, 0.0, 1.0)))
+    else:
+        # δ = min(b², d²) / d²: dispersion of the per-observation outer products against
+        # the distance from sample to target
+        distance = ((sample - prior) ** 2).sum(axis=(1, 2))
+        outer = np.einsum('pti,ptj->ptij', centred, centred)
+        dispersion = ((outer - sample[:, None]) ** 2).sum(axis=(1, 2, 3)) / n_obs ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shrinkage = np.where(distance > 0, np.minimum(dispersion, distance) / distance, 0.0)
+        shrinkage = np.maximum(shrinkage, max(0.0, 1 - (n_obs - 1) / n_lines))
+
+    covariance = (shrinkage[:, None, None] * prior + (1 - shrinkage[:, None, None]) * sample) * n_obs / (n_obs - 1)
+    if single:
+        return {"covariance": covariance[0], "intensity": float(shrinkage[0])}
+    return {"covariance": covariance, "intensity": shrinkage}
+
+# =============================================================================
+# ACTIVE-SET QP
+# =============================================================================
+
+def solve_long_only_qp(cov: np.ndarray, mu: np.ndarray, target: np.ndarray, start: np.ndarray,
+                       max_iter: int = 100, tol: float = 1e-10, ridge: float = 1e-10) -> Dict[str, np.ndarray]:
+    """
+    Batched min ½wᵀΣw s.t. Σw = 1, μᵀw = target (skipped where target is NaN), w ≥ 0.
+
+    cov (B × n × n), mu (B × n), target (B,), start (B × n) feasible weights.
+    Returns weights, iterations and a converged flag per problem.
+    """
+    cov = np.asarray(cov, dtype=float)
+    n_problems, n = mu.shape
+    use_target = ~np.isnan(target)
+    rhs_target = np.where(use_target, target, 0.0)
+    scale = np.einsum('bii->b', cov) / n
+    cov = cov + (ridge * np.maximum(scale, 1e-300))[:, None, None] * np.eye(n)
+
+    weights = np.array(start, dtype=float)
+    fixed = weights <= 0
+    weights[fixed] = 0.0
+    active = np.ones(n_problems, dtype=bool)
+    iterations = np.zeros(n_problems, dtype=int)
+    constraints = np.stack([np.ones_like(mu), mu], axis=1)  # B × 2 × n
+    constraints[:, 1] *= use_target[:, None]
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.nonzero(active)[0]
+        free = ~fixed[idx]
+        A = constraints[idx] * free[:, None, :]
+
+        # Masked KKT: fixed weights pinned to zero, unused return constraint pinned to ν = 0
+        kkt = np.zeros((len(idx), n + 2, n + 2))
+        kkt[:, :n, :n] = cov[idx] * free[:, :, None] * free[:, None, :]
+        kkt[:, np.arange(n), np.arange(n)] += ~free
+        kkt[:, :n, n:] = np.swapaxes(A, 1, 2)
+        kkt[:, n:, :n] = A
+        kkt[:, n + 1, n + 1] = ~use_target[idx]
+        rhs = np.zeros((len(idx), n + 2))
+        rhs[:, n] = 1.0
+        rhs[:, n + 1] = rhs_target[idx]
+        # Pseudo-inverse: a vertex can leave the budget and return rows dependent on the free set
+        solution = np.einsum('bij,bj->bi', np.linalg.pinv(kkt, hermitian=True), rhs)
+        candidate, multipliers = solution[:, :n], solution[:, n:]
+
+        current = weights[idx]
+        step = candidate - current
+        moving = np.abs(step).max(axis=1) > tol
+
+        # Blocking weights: largest feasible step toward the equality-constrained optimum
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(free & (step < -tol), -current / step, np.inf)
+        blocking = np.argmin(ratios, axis=1)
+        alpha = np.minimum(1.0, ratios[np.arange(len(idx)), blocking])
+        new_weights = np.where(moving[:, None], current + alpha[:, None] * step, current)
+        blocked = moving & (alpha < 1.0)
+        new_weights[blocked, blocking[blocked]] = 0.0
+        new_fixed = fixed[idx].copy()
+        new_fixed[blocked, blocking[blocked]] = True
+
+        # At the optimum for the working set: release the most negative multiplier
+        gradient = np.einsum('bij,bj->bi', cov[idx], candidate) + np.einsum('bki,bk->bi', constraints[idx], multipliers)
+        release_score = np.where(new_fixed, gradient, np.inf)
+        release = np.argmin(release_score, axis=1)
+        releasable = ~moving & (release_score[np.arange(len(idx)), release] < -tol * np.maximum(scale[idx], 1.0))
+        new_fixed[releasable, release[releasable]] = False
+
+        weights[idx] = np.maximum(new_weights, 0.0)
+        fixed[idx] = new_fixed
+        iterations[idx] += 1
+        active[idx] = moving | releasable
+
+    return {"weights": weights, "iterations": iterations, "converged": ~active}
+
+# =============================================================================
+# FRONTIER
+# =============================================================================
+
+def efficient_frontier(mu: np.ndarray, cov: np.ndarray, n_points: int = 25,
+                       risk_free_rate: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Long-only efficient frontier for every practice at once.
+
+    mu (P × n) or (n,), cov (P × n × n) or (n × n). Frontier targets run from the
+    minimum-variance return to the highest line return. The max-Sharpe point is picked
+    from the frontier grid.
+    """
+    mu = np.asarray(mu, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    single = mu.ndim == 1
+    if single:
+        mu, cov = mu[None], cov[None]
+    n_practices, n = mu.shape
+
+    # Minimum-variance portfolio from equal weights
+    min_var = solve_long_only_qp(cov, mu, np.full(n_practices, np.nan), np.full((n_practices, n), 1.0 / n))
+    mv_weights = min_var["weights"]
+    mv_return = np.einsum('pi,pi->p', mv_weights, mu)
+
+    # Targets between the min-variance return and the best line; warm start on the segment
+    # from the min-variance portfolio to that line
+    top = np.argmax(mu, axis=1)
+    top_return = mu[np.arange(n_practices), top]
+    fractions = np.linspace(0.0, 1.0, n_points)
+    targets = mv_return[:, None] + fractions * (top_return - mv_return)[:, None]
+    corner = np.zeros((n_practices, n))
+    corner[np.arange(n_practices), top] = 1.0
+    start = (1 - fractions)[None, :, None] * mv_weights[:, None] + fractions[None, :, None] * corner[:, None]
+
+    # The last point is the best line itself (the only portfolio reaching that return)
+    frontier = solve_long_only_qp(np.repeat(cov, n_points - 1, axis=0), np.repeat(mu, n_points - 1, axis=0),
+                                  targets[:, :-1].ravel(), start[:, :-1].reshape(-1, n))
+    weights = np.concatenate([frontier["weights"].reshape(n_practices, n_points - 1, n), corner[:, None]], axis=1)
+    returns = np.einsum('pki,pi->pk', weights, mu)
+    volatility = np.sqrt(np.maximum(np.einsum('pki,pij,pkj->pk', weights, cov, weights), 0.0))
+    mv_volatility = np.sqrt(np.maximum(np.einsum('pi,pij,pj->p', mv_weights, cov, mv_weights), 0.0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, (returns - risk_free_rate) / volatility, -np.inf)
+    best = np.argmax(sharpe, axis=1)
+
+    result = {
+        "min_variance_weights": mv_weights,
+        "min_variance_return": mv_return,
+        "min_variance_volatility": mv_volatility,
+        "frontier_weights": weights,
+        "frontier_returns": returns,
+        "frontier_volatility": volatility,
+        "max_sharpe_weights": weights[np.arange(n_practices), best],
+        "max_sharpe_ratio": sharpe[np.arange(n_practices), best],
+        "iterations": int(max(min_var["iterations"].max(), frontier["iterations"].max())),
+        "converged": bool(min_var["converged"].all() and frontier["converged"].all()),
+    }
+    if single:
+        return {k: (v[0] if isinstance(v, np.ndarray) else v) for k, v in result.items()}
+    return result
+
+def service_line_frontier(revenues: np.ndarray, n_points: int = 25, shrinkage_target: str = "constant_correlation",
+                          risk_free_rate: float = 0.0) -> Dict[str, np.ndarray]:
+    """Frontier from revenue histories shaped (years × lines) or (practices × years × lines)"""
+    revenues = np.asarray(revenues, dtype=float)
+    returns = np.diff(revenues, axis=-2) / revenues[..., :-1, :]
+    shrunk = shrink_covariance(returns, target=shrinkage_target)
+    frontier = efficient_frontier(returns.mean(axis=-2), shrunk["covariance"], n_points, risk_free_rate)
+    frontier["covariance"] = shrunk["covariance"]
+    frontier["shrinkage_intensity"] = shrunk["intensity"]
+    frontier["mean_returns"] = returns.mean(axis=-2)
+    return frontier
+
+def build_service_line_book(n_practices: int = 50, n_lines: int = 6, n_years: int = 3, seed: int = 42) -> np.ndarray:
+    """Synthetic revenue histories (practices × years × lines) around the case's service-line mix"""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(250, 1200, (n_practices, 1, n_lines))
+    drift = rng.normal(0.04, 0.06, (n_practices, 1, n_lines))
+    shocks = rng.normal(0.0, 0.08, (n_practices, n_years - 1, n_lines))
+    growth = np.concatenate([np.ones((n_practices, 1, n_lines)), np.cumprod(1 + drift + shocks, axis=1)], axis=1)
+    return base * growth
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Batched long-only efficient frontiers")
+    parser.add_argument('--practices', type=int, default=50)
+    parser.add_argument('--lines', type=int, default=6)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--points', type=int, default=25, help="Frontier points per practice")
+    parser.add_argument('--verify', action='store_true', help="Cross-check against scipy SLSQP")
+    args = parser.parse_args()
+
+    print("📈 EFFICIENT FRONTIER ENGINE")
+    print("=" * 60)
+
+    revenues = build_service_line_book(args.practices, args.lines, args.years)
+    start = time.perf_counter()
+    frontier = service_line_frontier(revenues, n_points=args.points)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.practices} practices × {args.lines} lines × {args.points} frontier points: "
+          f"{elapsed * 1000:.0f} ms ({frontier['iterations']} active-set iterations, "
+          f"converged: {'✅' if frontier['converged'] else '❌'})")
+    print(f"   Mean shrinkage intensity: {frontier['shrinkage_intensity'].mean():.2f}")
+    print(f"   Min-variance volatility (median): {np.median(frontier['min_variance_volatility']):.2%}")
+    print(f"   Max Sharpe ratio (median): {np.median(frontier['max_sharpe_ratio']):.2f}")
+
+    if args.verify:
+        from scipy.optimize import minimize
+
+        worst = 0.0
+        for p in range(min(args.practices, 10)):
+            cov, mu = frontier["covariance"][p], frontier["mean_returns"][p]
+            for k in range(0, args.points, max(args.points // 5, 1)):
+                target = frontier["frontier_returns"][p, k]
+                constraints = [{'type': 'eq', 'fun': lambda w: np.sum(w) - 1},
+                               {'type': 'eq', 'fun': lambda w, t=target, m=mu: w @ m - t}]
+                reference = minimize(lambda w, c=cov: w @ c @ w, np.full(args.lines, 1 / args.lines),
+                                     method='SLSQP', bounds=[(0, 1)] * args.lines, constraints=constraints,
+                                     options={'ftol': 1e-14, 'maxiter': 500})
+                worst = max(worst, frontier["frontier_volatility"][p, k] - np.sqrt(max(reference.fun, 0.0)))
+        print(f"\n🔍 Frontier volatility minus SLSQP (worst, 10 practices): {worst:+.2e} "
+              f"{'✅' if worst <= 1e-6 else '❌'}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
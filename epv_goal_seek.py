@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+EPV Goal Seek
+Batched breakeven solver: which input value makes an EPV output hit a target?
+
+Answers questions such as "what marketing_pct makes equity EPV equal the asking
+price?" or "what WACC justifies 8.5× EBITDA?" for a whole batch of base cases at once.
+Every function evaluation is one call to the vectorized engine
+(unified_epv_system.compute_unified_epv_arrays) over all cases:
+
+    1. Bracketing - the free input is swept over a grid inside its bounds for every
+       case in one batched call; sign changes of (output - target) bracket roots and
+       the grid also reveals non-monotone responses and cases with no solution.
+    2. Brent's method - inverse quadratic / secant steps with bisection fallback,
+       run elementwise on arrays so all cases converge together.
+
+With one free field the solved variable is that field's value. With several free
+fields the solved variable is a common scale factor applied to all of them (e.g.
+marketing_pct + admin_pct + other_opex_pct scaled together). Service-line columns
+(price, volume, cogs_pct) are always solved as a scale factor across every line.
+
+Usage:
+    python epv_goal_seek.py --output equity_epv --target 3000000 --free marketing_pct --bounds 0 0.4
+    python epv_goal_seek.py --output ev_to_ebitda --target 8.5 --free wacc_override --bounds 0.05 0.35
+"""
+
+import json
+import argparse
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from unified_epv_system import (
+    EPVInputs, EPV_OUTPUT_FIELDS, pack_epv_inputs, compute_unified_epv_arrays
+)
+
+SERVICE_LINE_COLUMNS = ("price", "volume", "cogs_pct")
+DEFAULT_GRID_POINTS = 64
+DEFAULT_XTOL = 1e-10
+DEFAULT_RTOL = 4 * np.finfo(float).eps
+DEFAULT_MAX_ITER = 100
+
+@dataclass
+class GoalSeekResult:
+    """Per-case solution arrays (length n_cases) plus a status label for each case"""
+    output: str
+    free_fields: List[str]
+    mode: str
+    solution: np.ndarray          # solved field value ("value") or scale factor ("scale"); NaN if unsolved
+    field_values: Dict[str, np.ndarray]
+    achieved: np.ndarray          # output at the solution
+    target: np.ndarray
+    status: np.ndarray            # solved | solved_non_monotone | no_solution
+    n_roots: np.ndarray           # sign changes found on the bracketing grid
+    iterations: int
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame({
+            "solution": self.solution,
+            "target": self.target,
+            "achieved": self.achieved,
+            "status": self.status,
+            "n_roots": self.n_roots,
+        })
+        for name, values in self.field_values.items():
+            frame[name] = values
+        return frame
+
+# =============================================================================
+# BATCHED OBJECTIVE
+# =============================================================================
+
+def _tile_packed(packed: Dict[str, np.ndarray], repeats: int) -> Dict[str, np.ndarray]:
+    """Repeat every case `repeats` times (case-major) so a grid can be evaluated in one call"""
+    return {name: np.repeat(values, repeats, axis=0) for name, values in packed.items()}
+
+def _apply_free_values(packed: Dict[str, np.ndarray], base: Dict[str, np.ndarray], free_fields: Sequence[str],
+                       x: np.ndarray, mode: str) -> Dict[str, np.ndarray]:
+    """Copy of `packed` with the free fields set from x (one value per row)"""
+    updated = dict(packed)
+    for name in free_fields:
+        if mode == "value":
+            updated[name] = x.astype(float)
+        elif name in SERVICE_LINE_COLUMNS:
+            updated[name] = base[name] * x[:, None]
+        else:
+            updated[name] = base[name] * x
+    return updated
+
+def _validate_fields(packed: Dict[str, np.ndarray], output: str, free_fields: Sequence[str], mode: str):
+    if output not in EPV_OUTPUT_FIELDS:
+        raise ValueError(f"Unknown output '{output}'; choose from {', '.join(EPV_OUTPUT_FIELDS)}")
+    if not free_fields:
+        raise ValueError("At least one free field is required")
+    for name in free_fields:
+        if name not in packed or packed[name].dtype == bool:
+            raise ValueError(f"'{name}' is not a numeric EPVInputs / service-line field of the batch engine")
+        if mode == "value" and name in SERVICE_LINE_COLUMNS:
+            raise ValueError(f"Service-line column '{name}' can only be solved in 'scale' mode")
+
+# =============================================================================
+# VECTORIZED BRENT
+# =============================================================================
+
+def brent_batch(objective, a: np.ndarray, b: np.ndarray, fa: np.ndarray, fb: np.ndarray,
+                xtol: float = DEFAULT_XTOL, rtol: float = DEFAULT_RTOL,
+                max_iter: int = DEFAULT_MAX_ITER) -> Tuple[np.ndarray, int]:
+    """
+    Brent's method on arrays of brackets [a, b] with fa * fb <= 0.
+
+    objective(x) must evaluate all rows at once; rows that have converged keep
+    their value. Returns (roots, iterations).
+    """
+    a, b, fa, fb = (np.array(v, dtype=float) for v in (a, b, fa, fb))
+    c, fc = a.copy(), fa.copy()
+    d = e = b - a
+    active = np.ones(b.shape, dtype=bool)
+
+    iterations = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for iterations in range(1, max_iter + 1):
+            # Keep the root between b and c
+            same_side = np.sign(fb) == np.sign(fc)
+            c = np.where(same_side, a, c)
+            fc = np.where(same_side, fa, fc)
+            d = np.where(same_side, b - a, d)
+            e = np.where(same_side, b - a, e)
+
+            # b is the best estimate: swap if c is closer to a root
+            swap = np.abs(fc) < np.abs(fb)
+            a = np.where(swap, b, a)
+            fa = np.where(swap, fb, fa)
+            b, c = np.where(swap, c, b), np.where(swap, b, c)
+            fb, fc = np.where(swap, fc, fb), np.where(swap, fb, fc)
+
+            tol = 2 * rtol * np.abs(b) + 0.5 * xtol
+            xm = 0.5 * (c - b)
+            active &= ~((np.abs(xm) <= tol) | (fb == 0))
+            if not active.any():
+                break
+
+            # Interpolation step (secant when a == c, else inverse quadratic)
+            s = fb / fa
+            secant = a == c
+            q_iq, r_iq = fa / fc, fb / fc
+            p = np.where(secant, 2 * xm * s, s * (2 * xm * q_iq * (q_iq - r_iq) - (b - a) * (r_iq - 1)))
+            q = np.where(secant, 1 - s, (q_iq - 1) * (r_iq - 1) * (s - 1))
+            q = np.where(p > 0, -q, q)
+            p = np.abs(p)
+
+            try_interp = (np.abs(e) >= tol) & (np.abs(fa) > np.abs(fb))
+            accept = try_interp & (2 * p < np.minimum(3 * xm * q - np.abs(tol * q), np.abs(e * q)))
+            accept &= np.isfinite(p / q)
+            e = np.where(accept, d, xm)
+            d = np.where(accept, p / q, xm)
+
+            a, fa = np.where(active, b, a), np.where(active, fb, fa)
+            step = np.where(np.abs(d) > tol, d, np.copysign(tol, xm))
+            b = np.where(active, b + step, b)
+            fb = np.where(active, objective(b), fb)
+
+    return b, iterations
+
+# =============================================================================
+# GOAL SEEK
+# =============================================================================
+
+def goal_seek(cases: Union[List[EPVInputs], Dict[str, np.ndarray]], output: str,
+              target: Union[float, Sequence[float]], free_fields: Union[str, Sequence[str]],
+              bounds: Tuple[float, float], mode: Optional[str] = None,
+              grid_points: int = DEFAULT_GRID_POINTS, xtol: float = DEFAULT_XTOL,
+              max_iter: int = DEFAULT_MAX_ITER) -> GoalSeekResult:
+    """
+    Solve output(case, x) = target for every case.
+
+    cases: EPVInputs list or an already packed batch (pack_epv_inputs)
+    free_fields: field name(s) of the batch engine to vary
+    bounds: search interval for the field value ("value" mode) or scale factor ("scale")
+    mode: "value" (default for one field) or "scale" (default for several)
+    """
+    free_fields = [free_fields] if isinstance(free_fields, str) else list(free_fields)
+    if mode is None:
+        mode = "value" if len(free_fields) == 1 and free_fields[0] not in SERVICE_LINE_COLUMNS else "scale"
+    if mode not in ("value", "scale"):
+        raise ValueError("mode must be 'value' or 'scale'")
+
+    base = cases if isinstance(cases, dict) else pack_epv_inputs(cases)
+    _validate_fields(base, output, free_fields, mode)
+    n = len(base["tax_rate"])
+    target = np.broadcast_to(np.asarray(target, dtype=float), (n,)).copy()
+    lower, upper = float(bounds[0]), float(bounds[1])
+    if not lower < upper:
+        raise ValueError("bounds must satisfy lower < upper")
+
+    # 1. Bracketing grid: (cases × grid_points) in one engine call
+    grid = np.linspace(lower, upper, grid_points)
+    tiled = _tile_packed(base, grid_points)
+    x_grid = np.tile(grid, n)
+    values = compute_unified_epv_arrays(_apply_free_values(tiled, tiled, free_fields, x_grid, mode))[output]
+    residual = values.reshape(n, grid_points) - target[:, None]
+
+    steps = np.diff(residual, axis=1)
+    scale = np.maximum(np.abs(residual).max(axis=1, initial=0.0), 1.0)[:, None]
+    rising = (steps > 1e-12 * scale).any(axis=1)
+    falling = (steps < -1e-12 * scale).any(axis=1)
+    non_monotone = rising & falling
+
+    sign = np.sign(residual)
+    crossings = (sign[:, :-1] * sign[:, 1:] < 0) | ((sign[:, :-1] == 0) & (sign[:, 1:] != 0))
+    crossings[:, -1] |= sign[:, -1] == 0
+    n_roots = crossings.sum(axis=1)
+    has_root = n_roots > 0
+
+    # First bracket per case (lowest x); unsolvable cases get a dummy bracket and are masked later
+    first = np.argmax(crossings, axis=1)
+    rows = np.arange(n)
+    a, b = grid[first], grid[first + 1]
+    fa, fb = residual[rows, first], residual[rows, first + 1]
+
+    # 2. Brent on all brackets at once
+    def objective(x: np.ndarray) -> np.ndarray:
+        return compute_unified_epv_arrays(_apply_free_values(base, base, free_fields, x, mode))[output] - target
+
+    roots, iterations = np.full(n, np.nan), 0
+    if has_root.any():
+        safe_fb = np.where(has_root, fb, -fa)  # unsolvable rows get a valid dummy bracket
+        roots, iterations = brent_batch(objective, a, b, fa, safe_fb, xtol=xtol, max_iter=max_iter)
+        roots = np.where(has_root, roots, np.nan)
+
+    solved_values = compute_unified_epv_arrays(
+        _apply_free_values(base, base, free_fields, np.where(has_root, roots, grid[0]), mode))[output]
+    achieved = np.where(has_root, solved_values, np.nan)
+
+    status = np.where(~has_root, "no_solution", np.where(non_monotone, "solved_non_monotone", "solved"))
+
+    field_values = {}
+    for name in free_fields:
+        if mode == "value":
+            field_values[name] = roots
+        elif name not in SERVICE_LINE_COLUMNS:
+            field_values[name] = base[name] * roots
+
+    return GoalSeekResult(
+        output=output,
+        free_fields=free_fields,
+        mode=mode,
+        solution=roots,
+        field_values=field_values,
+        achieved=achieved,
+        target=target,
+        status=status,
+        n_roots=n_roots,
+        iterations=iterations,
+    )
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def build_case_batch(n_cases: int, seed: int = 42) -> List[EPVInputs]:
+    """CPP case plus price/volume-perturbed variants (the same cases the load test uses)"""
+    from dataclasses import replace
+    from cpp_medispa_simulation_2025 import create_cpp_medispa_case, calculate_epv_inputs_from_case
+
+    base = calculate_epv_inputs_from_case(create_cpp_medispa_case())
+    rng = np.random.default_rng(seed)
+    cases = [base]
+    for _ in range(n_cases - 1):
+        lines = [replace(line, price=line.price * rng.uniform(0.9, 1.1), volume=line.volume * rng.uniform(0.9, 1.1))
+                 for line in base.service_lines]
+        cases.append(replace(base, service_lines=lines))
+    return cases
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Batched EPV goal seek (breakeven) solver")
+    parser.add_argument('--output', default="equity_epv", help="EPVOutputs field to hit")
+    parser.add_argument('--target', type=float, required=True, help="Target output value")
+    parser.add_argument('--free', nargs='+', required=True, help="Free input field(s)")
+    parser.add_argument('--bounds', nargs=2, type=float, required=True, metavar=("LOWER", "UPPER"))
+    parser.add_argument('--mode', choices=["value", "scale"], help="Solve for a field value or a common scale factor")
+    parser.add_argument('--cases', type=int, default=100, help="Number of cases (CPP case + perturbed variants)")
+    parser.add_argument('--save', help="Write per-case results to CSV")
+    args = parser.parse_args()
+
+    print("🎯 EPV GOAL SEEK")
+    print("=" * 60)
+
+    import time
+    cases = build_case_batch(args.cases)
+    start = time.perf_counter()
+    result = goal_seek(cases, args.output, args.target, args.free, tuple(args.bounds), mode=args.mode)
+    elapsed = time.perf_counter() - start
+
+    frame = result.to_frame()
+    counts = frame["status"].value_counts().to_dict()
+    print(f"Solve {args.output} = {args.target:,.4g} over {' + '.join(result.free_fields)} ({result.mode} mode)")
+    print(f"Cases: {len(frame):,}  solved in {elapsed * 1000:.1f} ms ({result.iterations} Brent iterations)")
+    print(f"Status: {json.dumps(counts)}")
+    solved = frame[frame["status"] != "no_solution"]
+    if len(solved):
+        print(f"Solution: median {solved['solution'].median():.6g}, "
+              f"range {solved['solution'].min():.6g} - {solved['solution'].max():.6g}")
+        print(f"Max |achieved - target|: {np.abs(solved['achieved'] - solved['target']).max():.3g}")
+    if counts.get("solved_non_monotone"):
+        print("⚠️ Non-monotone response within bounds; the lowest root is reported")
+    if counts.get("no_solution"):
+        print("⚠️ Some cases cannot reach the target within bounds")
+
+    if args.save:
+        frame.to_csv(args.save, index=False)
+        print(f"📄 Results written to {args.save}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
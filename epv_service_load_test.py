@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+EPV Valuation Service Load Test
+Open-loop load generator for epv_valuation_server.py reporting p50/p99 latency
+
+Requests are scheduled at a fixed rate regardless of how fast responses come back,
+and latency is measured from each request's scheduled send time, so queueing delay
+is not hidden when the server falls behind. Payloads are the CPP case inputs with
+small per-request price/volume perturbations so every request is a distinct valuation.
+
+Usage:
+    python epv_service_load_test.py --spawn-server --rate 200 --duration 20
+    python epv_service_load_test.py --url http://127.0.0.1:8765 --rate 100
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def build_payloads(n_variants: int = 500, seed: int = 42) -> List[bytes]:
+    """CPP case EPVInputs as JSON bodies, each with perturbed service lines"""
+    from cpp_medispa_simulation_2025 import create_cpp_medispa_case, calculate_epv_inputs_from_case
+
+    base = asdict(calculate_epv_inputs_from_case(create_cpp_medispa_case()))
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(n_variants):
+        variant = dict(base)
+        variant["service_lines"] = [
+            {**line, "price": line["price"] * rng.uniform(0.9, 1.1), "volume": line["volume"] * rng.uniform(0.9, 1.1)}
+            for line in base["service_lines"]
+        ]
+        payloads.append(json.dumps(variant).encode('utf-8'))
+    return payloads
+
+async def send_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+                       body: bytes) -> int:
+    """POST /valuate on a keep-alive connection; returns the HTTP status"""
+    writer.write(
+        f"POST /valuate HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value.strip())
+    await reader.readexactly(length)
+    return status
+
+async def run_load(host: str, port: int, rate: float, duration: float, connections: int,
+                   payloads: List[bytes]) -> Dict[str, Any]:
+    """Fire requests at `rate`/s for `duration` seconds over a pool of keep-alive connections"""
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(await asyncio.open_connection(host, port))
+
+    n_requests = int(rate * duration)
+    latencies = np.full(n_requests, np.nan)
+    statuses = np.zeros(n_requests, dtype=int)
+    start = time.perf_counter() + 0.1
+
+    async def fire(i: int):
+        scheduled = start + i / rate
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        reader, writer = await pool.get()
+        try:
+            statuses[i] = await send_request(reader, writer, host, payloads[i % len(payloads)])
+            latencies[i] = (time.perf_counter() - scheduled) * 1000
+        finally:
+            pool.put_nowait((reader, writer))
+
+    await asyncio.gather(*(fire(i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    while not pool.empty():
+        _, writer = pool.get_nowait()
+        writer.close()
+
+    ok = statuses == 200
+    ok_latencies = latencies[ok] if ok.any() else np.zeros(1)
+    return {
+        "target_rps": rate,
+        "duration_seconds": elapsed,
+        "requests": n_requests,
+        "ok": int(ok.sum()),
+        "rejected_503": int((statuses == 503).sum()),
+        "errors": int((~ok & (statuses != 503)).sum()),
+        "achieved_rps": float(ok.sum() / elapsed) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": float(np.percentile(ok_latencies, 50)),
+            "p90": float(np.percentile(ok_latencies, 90)),
+            "p99": float(np.percentile(ok_latencies, 99)),
+            "max": float(ok_latencies.max()),
+        },
+    }
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def spawn_server(port: int, extra_args: List[str]) -> subprocess.Popen:
+    """Start the server in a separate process and wait until /health answers"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, "epv_valuation_server.py"), "--port", str(port), *extra_args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=REPO_DIR,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("Valuation server exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Valuation server did not become healthy within 60s")
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Load test for the EPV valuation server")
+    parser.add_argument('--url', default="http://127.0.0.1:8765", help="Server base URL")
+    parser.add_argument('--spawn-server', action='store_true', help="Start a server subprocess on a free port")
+    parser.add_argument('--rate', type=float, default=100.0, help="Target requests per second")
+    parser.add_argument('--duration', type=float, default=20.0, help="Test length in seconds")
+    parser.add_argument('--connections', type=int, default=64, help="Keep-alive connections in the pool")
+    parser.add_argument('--max-batch', type=int, help="Forwarded to a spawned server")
+    parser.add_argument('--max-wait-ms', type=float, help="Forwarded to a spawned server")
+    parser.add_argument('--queue-size', type=int, help="Forwarded to a spawned server")
+    parser.add_argument('--output', help="Write the report to a JSON file")
+    args = parser.parse_args()
+
+    print("🚦 EPV VALUATION SERVICE LOAD TEST")
+    print("=" * 60)
+
+    process: Optional[subprocess.Popen] = None
+    if args.spawn_server:
+        host, port = "127.0.0.1", free_port()
+        server_args = []
+        if args.max_batch:
+            server_args += ["--max-batch", str(args.max_batch)]
+        if args.max_wait_ms is not None:
+            server_args += ["--max-wait-ms", str(args.max_wait_ms)]
+        if args.queue_size:
+            server_args += ["--queue-size", str(args.queue_size)]
+        process = spawn_server(port, server_args)
+    else:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+
+    try:
+        payloads = build_payloads()
+        print(f"Target: {args.rate:,.0f} req/s ({args.rate * 60:,.0f}/min) for {args.duration:.0f}s "
+              f"over {args.connections} connections")
+        report = asyncio.run(run_load(host, port, args.rate, args.duration, args.connections, payloads))
+        with urlopen(f"http://{host}:{port}/stats", timeout=5) as response:
+            report["server_stats"] = json.loads(response.read())
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    latency = report["latency_ms"]
+    print(f"\nRequests: {report['requests']:,}  OK: {report['ok']:,}  "
+          f"503: {report['rejected_503']:,}  Errors: {report['errors']:,}")
+    print(f"Achieved throughput: {report['achieved_rps']:,.1f} req/s")
+    print(f"Latency p50: {latency['p50']:.2f} ms   p90: {latency['p90']:.2f} ms   "
+          f"p99: {latency['p99']:.2f} ms   max: {latency['max']:.2f} ms")
+    print(f"Server mean batch size: {report['server_stats']['mean_batch_size']:.1f} "
+          f"(max {report['server_stats']['max_batch_size']})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+    return 0 if report["errors"] == 0 else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+EPV Valuation Server
+Local HTTP service for compute_unified_epv with request micro-batching
+
+Pure asyncio + stdlib (no web framework). Concurrent POST /valuate requests are
+queued, coalesced into micro-batches (up to --max-batch requests or --max-wait-ms)
+and valued in one compute_unified_epv_batch call on a worker thread. The queue is
+bounded: when it is full the server answers 503 with Retry-After instead of
+buffering without limit.
+
+Endpoints:
+    POST /valuate   body: EPVInputs JSON (service_lines as a list of objects)
+                    -> {"outputs": {...EPVOutputs...}, "batch_size": n}
+    GET  /stats     latency percentiles, throughput, queue depth, batch sizes
+    GET  /health    {"status": "ok"}
+
+Usage:
+    python epv_valuation_server.py --port 8765
+    python epv_service_load_test.py --url http://127.0.0.1:8765 --rate 200
+"""
+
+import asyncio
+import json
+import math
+import time
+import typing
+import argparse
+from collections import deque
+from dataclasses import fields
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from unified_epv_system import (
+    EPVInputs, ServiceLine, EPV_OUTPUT_FIELDS, compute_unified_epv_batch,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+DEFAULT_QUEUE_SIZE = 4096
+LATENCY_WINDOW = 10000
+
+EPV_INPUT_FIELDS = {f.name for f in fields(EPVInputs)}
+SERVICE_LINE_FIELDS = {f.name for f in fields(ServiceLine)}
+EPV_INPUT_TYPES = typing.get_type_hints(EPVInputs)
+SERVICE_LINE_TYPES = typing.get_type_hints(ServiceLine)
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class RequestError(Exception):
+    """Client error carrying an HTTP status"""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _coerce_value(owner: str, name: str, value: Any, annotation: Any) -> Any:
+    """Check one JSON value against its dataclass annotation; numbers may arrive as numeric strings"""
+    if typing.get_origin(annotation) is typing.Union:
+        if value is None and type(None) in typing.get_args(annotation):
+            return None
+        annotation = next(a for a in typing.get_args(annotation) if a is not type(None))
+
+    if annotation is bool:
+        if isinstance(value, bool):
+            return value
+    elif annotation is str:
+        if isinstance(value, str):
+            return value
+    elif annotation in (float, int) and not isinstance(value, bool):
+        try:
+            number = float(value) if isinstance(value, (int, float, str)) else None
+        except ValueError:
+            number = None
+        if number is not None and math.isfinite(number):
+            if annotation is float:
+                return number
+            if number.is_integer():
+                return int(number)
+    expected = getattr(annotation, "__name__", str(annotation))
+    raise RequestError(400, f"{owner}.{name} must be {expected}, got {json.dumps(value)}")
+
+def epv_inputs_from_dict(payload: Dict[str, Any]) -> EPVInputs:
+    """Build EPVInputs from a JSON object, rejecting unknown fields and ill-typed values"""
+    if not isinstance(payload, dict):
+        raise RequestError(400, "Body must be a JSON object of EPVInputs fields")
+    unknown = set(payload) - EPV_INPUT_FIELDS
+    if unknown:
+        raise RequestError(400, f"Unknown EPVInputs fields: {', '.join(sorted(unknown))}")
+    if "service_lines" not in payload:
+        raise RequestError(400, "service_lines is required")
+    if not isinstance(payload["service_lines"], list):
+        raise RequestError(400, "service_lines must be a list of objects")
+    if payload.get("use_real_data"):
+        raise RequestError(400, "use_real_data is not supported by the batch service")
+
+    service_lines = []
+    for line in payload["service_lines"]:
+        if not isinstance(line, dict):
+            raise RequestError(400, "service_lines must be a list of objects")
+        unknown = set(line) - SERVICE_LINE_FIELDS
+        if unknown:
+            raise RequestError(400, f"Unknown ServiceLine fields: {', '.join(sorted(unknown))}")
+        values = {name: _coerce_value("ServiceLine", name, value, SERVICE_LINE_TYPES[name])
+                  for name, value in line.items()}
+        try:
+            service_lines.append(ServiceLine(**values))
+        except TypeError as e:
+            raise RequestError(400, f"Invalid service line: {e}")
+
+    values = {name: _coerce_value("EPVInputs", name, value, EPV_INPUT_TYPES[name])
+              for name, value in payload.items() if name != "service_lines"}
+    return EPVInputs(**values, service_lines=service_lines)
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+class ServiceMetrics:
+    """Latency/throughput counters (latencies kept in a rolling window)"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.requests_total = 0
+        self.requests_ok = 0
+        self.requests_rejected = 0
+        self.requests_failed = 0
+        self.batches_total = 0
+        self.batched_requests_total = 0
+        self.max_batch_size = 0
+        self.latencies_ms = deque(maxlen=window)
+        self.completions = deque(maxlen=window)
+
+    def record_batch(self, size: int):
+        self.batches_total += 1
+        self.batched_requests_total += size
+        self.max_batch_size = max(self.max_batch_size, size)
+
+    def record_success(self, latency_s: float):
+        self.requests_ok += 1
+        self.latencies_ms.append(latency_s * 1000)
+        self.completions.append(time.perf_counter())
+
+    def snapshot(self, queue_depth: int) -> Dict[str, Any]:
+        now = time.perf_counter()
+        uptime = now - self.started
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        recent = [t for t in self.completions if now - t <= 10.0]
+        return {
+            "uptime_seconds": uptime,
+            "requests_total": self.requests_total,
+            "requests_ok": self.requests_ok,
+            "requests_rejected": self.requests_rejected,
+            "requests_failed": self.requests_failed,
+            "queue_depth": queue_depth,
+            "batches_total": self.batches_total,
+            "mean_batch_size": self.batched_requests_total / self.batches_total if self.batches_total else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "throughput_rps_lifetime": self.requests_ok / uptime if uptime > 0 else 0.0,
+            "throughput_rps_last_10s": len(recent) / min(10.0, uptime) if uptime > 0 else 0.0,
+            "latency_ms": {
+                "window": len(self.latencies_ms),
+                "p50": float(np.percentile(latencies, 50)),
+                "p90": float(np.percentile(latencies, 90)),
+                "p99": float(np.percentile(latencies, 99)),
+                "max": float(latencies.max()),
+            },
+        }
+
+# =============================================================================
+# MICRO-BATCHER
+# =============================================================================
+
+class MicroBatcher:
+    """Coalesce queued valuation requests into compute_unified_epv_batch calls"""
+
+    def __init__(self, metrics: ServiceMetrics, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def submit(self, inputs: EPVInputs) -> "asyncio.Future":
+        """Enqueue without waiting; raises RequestError(503) when the queue is full"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((inputs, future))
+        except asyncio.QueueFull:
+            raise RequestError(503, "Valuation queue full, retry later")
+        return future
+
+    async def _collect(self) -> List[Tuple[EPVInputs, asyncio.Future]]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            # Drain whatever is already queued, then wait briefly for stragglers
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            inputs_list = [inputs for inputs, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, compute_unified_epv_batch, inputs_list)
+            except Exception:
+                # Isolate the failure: value each request on its own so one bad payload
+                # cannot fail the rest of its batch
+                for inputs, future in batch:
+                    try:
+                        single = await loop.run_in_executor(None, compute_unified_epv_batch, [inputs])
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                        continue
+                    self.metrics.record_batch(1)
+                    if not future.done():
+                        future.set_result(({name: float(single[name][0]) for name in EPV_OUTPUT_FIELDS}, 1))
+                continue
+            self.metrics.record_batch(len(batch))
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(({name: float(results[name][i]) for name in EPV_OUTPUT_FIELDS}, len(batch)))
+
+# =============================================================================
+# HTTP SERVER
+# =============================================================================
+
+class EPVValuationServer:
+    """Minimal HTTP/1.1 keep-alive server in front of the micro-batcher"""
+
+    MAX_BODY_BYTES = 1_000_000
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.metrics = ServiceMetrics()
+        self.batcher_options = dict(max_batch=max_batch, max_wait_ms=max_wait_ms, queue_size=queue_size)
+        self.batcher: Optional[MicroBatcher] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.batcher = MicroBatcher(self.metrics, **self.batcher_options)
+        self.batcher.start()
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.batcher:
+            await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"💹 EPV valuation server listening on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise RequestError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise RequestError(400, "Content-Length must be an integer")
+        if length < 0:
+            raise RequestError(400, "Content-Length must not be negative")
+        if length > self.MAX_BODY_BYTES:
+            raise RequestError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), path.split('?', 1)[0], headers, body
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, self.metrics.snapshot(self.batcher.queue.qsize())
+        if path != "/valuate":
+            raise RequestError(404, f"No route for {path}")
+        if method != "POST":
+            raise RequestError(405, "Use POST /valuate")
+
+        start = time.perf_counter()
+        self.metrics.requests_total += 1
+        try:
+            payload = json.loads(body or b'null')
+        except json.JSONDecodeError as e:
+            raise RequestError(400, f"Invalid JSON: {e}")
+        inputs = epv_inputs_from_dict(payload)
+        outputs, batch_size = await self.batcher.submit(inputs)
+        self.metrics.record_success(time.perf_counter() - start)
+        return 200, {"outputs": outputs, "batch_size": batch_size}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                keep_alive = True
+                path = None
+                extra_headers = {}
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    status, payload = await self._dispatch(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    if e.status == 503:
+                        self.metrics.requests_rejected += 1
+                        extra_headers["Retry-After"] = "1"
+                    elif path == "/valuate":
+                        self.metrics.requests_failed += 1
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    self.metrics.requests_failed += 1
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                await self._write_response(writer, status, payload, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                              keep_alive: bool, extra_headers: Dict[str, str]):
+        body = json.dumps(payload).encode('utf-8')
+        headers = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **extra_headers,
+        }
+        head = f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}\r\n" + \
+               "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Local EPV valuation server with micro-batching")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help="Max requests per batch")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Max time to hold a batch open for more requests")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Bounded queue length; beyond it requests get 503")
+    args = parser.parse_args()
+
+    server = EPVValuationServer(args.host, args.port, args.max_batch, args.max_wait_ms, args.queue_size)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
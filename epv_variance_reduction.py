@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+EPV Monte Carlo Variance Reduction
+Antithetic pairs, control variates and common random numbers for valuation MC
+
+Uses the same perturbation model as the UI Monte Carlo (unified_epv_system
+MC_PRICE_FACTOR / MC_COGS_FACTOR / MC_SCALAR_FACTORS: uniform multiplicative factors
+on price, COGS, cost ratios, beta and size premium). Draws are generated as uniforms
+in [0, 1] and mapped to factors, which makes the three techniques straightforward:
+
+    Antithetic pairs      - every draw U is paired with 1 - U. The input distributions
+                            are symmetric, so the pair mean cancels all odd-order error.
+    Control variate       - the first-order expansion of the deterministic EPV around
+                            the base case, C = Σ_k dEPV/df_k × (f_k - E[f_k]). Its mean is
+                            exactly 0 in closed form, so Y - β·C stays unbiased.
+    Common random numbers - compared scenarios (Base vs Bear, deal structures) are
+                            valued on the same draws, so their difference only carries
+                            the noise the scenarios do not share.
+
+Every estimate reports its standard error and effective sample size: the number of
+independent plain-MC draws that would give the same standard error.
+
+Note: the control is linear in the factors and antithetic pairs cancel linear terms
+exactly, so combining both adds nothing; the control is dropped automatically when
+its pair-averaged variance is zero.
+"""
+
+import argparse
+from dataclasses import replace
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from unified_epv_system import (
+    EPVInputs, FrozenEPVInputs, MC_PRICE_FACTOR, MC_COGS_FACTOR, MC_SCALAR_FACTORS,
+    pack_epv_inputs, compute_unified_epv_arrays, apply_epv_factors, _repeat_packed
+)
+
+FACTOR_BOUNDS = {"price": MC_PRICE_FACTOR, "cogs_pct": MC_COGS_FACTOR, **MC_SCALAR_FACTORS}
+FD_STEP = 1e-4
+
+# =============================================================================
+# DRAWS
+# =============================================================================
+
+def draw_uniforms(rng: np.random.Generator, n_draws: int, n_lines: int,
+                  antithetic: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Uniform(0, 1) draws per factor column.
+
+    With antithetic=True the second half of the rows mirrors the first (row i and
+    row i + n/2 form a pair), so n_draws must be even.
+    """
+    if antithetic and n_draws % 2:
+        raise ValueError("Antithetic sampling needs an even number of draws")
+    n_base = n_draws // 2 if antithetic else n_draws
+    uniforms = {
+        "price": rng.random((n_base, 1)),
+        "cogs_pct": rng.random((n_base, n_lines)),
+        **{name: rng.random(n_base) for name in MC_SCALAR_FACTORS},
+    }
+    if antithetic:
+        uniforms = {name: np.concatenate([u, 1 - u]) for name, u in uniforms.items()}
+    return uniforms
+
+def uniforms_to_factors(uniforms: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {name: low + (high - low) * uniforms[name] for name, (low, high) in FACTOR_BOUNDS.items()}
+
+def _packed_case(inputs: Union[EPVInputs, FrozenEPVInputs], n_lines: int) -> Dict[str, np.ndarray]:
+    """Packed single case with service-line columns padded to n_lines"""
+    p = pack_epv_inputs([inputs])
+    pad = n_lines - p["price"].shape[1]
+    if pad > 0:
+        for name in ("price", "volume", "cogs_pct", "is_retail"):
+            p[name] = np.pad(p[name], ((0, 0), (0, pad)))
+    return p
+
+# =============================================================================
+# CONTROL VARIATE
+# =============================================================================
+
+def factor_sensitivities(packed: Dict[str, np.ndarray], output: str) -> Dict[str, np.ndarray]:
+    """
+    dOutput/dFactor at the mean factors, for every factor component (one batched call).
+
+    Central differences on the deterministic engine; each COGS line is its own component.
+    """
+    n_lines = packed["cogs_pct"].shape[1]
+    means = {name: np.full((1, 1) if name == "price" else (1, n_lines) if name == "cogs_pct" else 1,
+                           (low + high) / 2) for name, (low, high) in FACTOR_BOUNDS.items()}
+    components = ([("price", None)] + [("cogs_pct", j) for j in range(n_lines)] +
+                  [(name, None) for name in MC_SCALAR_FACTORS])
+
+    n_rows = 2 * len(components)
+    factors = {name: np.repeat(mean, n_rows, axis=0) for name, mean in means.items()}
+    for k, (name, column) in enumerate(components):
+        for row, sign in ((2 * k, 1), (2 * k + 1, -1)):
+            if column is None:
+                factors[name][row] = factors[name][row] + sign * FD_STEP
+            else:
+                factors[name][row, column] += sign * FD_STEP
+    values = compute_unified_epv_arrays(apply_epv_factors(_repeat_packed(packed, n_rows), factors))[output]
+    slopes = (values[0::2] - values[1::2]) / (2 * FD_STEP)
+
+    sensitivities = {name: np.zeros_like(mean, dtype=float).ravel() for name, mean in means.items()}
+    for slope, (name, column) in zip(slopes, components):
+        sensitivities[name][0 if column is None else column] = slope
+    return sensitivities
+
+def linear_control(uniforms: Dict[str, np.ndarray], sensitivities: Dict[str, np.ndarray]) -> np.ndarray:
+    """C = Σ_k dOutput/df_k × (f_k - E[f_k]); E[C] = 0 exactly"""
+    control = 0.0
+    for name, (low, high) in FACTOR_BOUNDS.items():
+        centred = (high - low) * (uniforms[name] - 0.5)
+        if centred.ndim == 2:
+            control = control + centred @ sensitivities[name]
+        else:
+            control = control + centred * sensitivities[name][0]
+    return control
+
+# =============================================================================
+# ESTIMATORS
+# =============================================================================
+
+def estimate_mean(values: np.ndarray, control: Optional[np.ndarray] = None,
+                  antithetic: bool = False) -> Dict[str, float]:
+    """
+    Mean estimate with standard error and effective sample size.
+
+    values/control are per-draw; with antithetic=True rows i and i + n/2 are pairs.
+    ESS = Var(single draw) / SE² - the plain-MC draw count with the same precision.
+    """
+    values = np.asarray(values, dtype=float)
+    n_evaluations = values.size
+    single_draw_variance = values.var(ddof=1)
+
+    units, control_units = values, control
+    if antithetic:
+        half = n_evaluations // 2
+        units = 0.5 * (values[:half] + values[half:])
+        if control is not None:
+            control_units = 0.5 * (control[:half] + control[half:])
+
+    beta = 0.0
+    if control_units is not None:
+        control_variance = control_units.var(ddof=1)
+        if control_variance > 1e-12 * max(units.var(ddof=1), 1e-300):
+            beta = np.cov(units, control_units)[0, 1] / control_variance
+            units = units - beta * control_units
+
+    estimate = float(units.mean())
+    std_error = float(units.std(ddof=1) / np.sqrt(units.size))
+    effective_sample_size = single_draw_variance / std_error ** 2 if std_error > 0 else np.inf
+    return {
+        "estimate": estimate,
+        "std_error": std_error,
+        "ci_95": (estimate - 1.96 * std_error, estimate + 1.96 * std_error),
+        "n_evaluations": int(n_evaluations),
+        "plain_std_error": float(np.sqrt(single_draw_variance / n_evaluations)),
+        "effective_sample_size": float(effective_sample_size),
+        "variance_reduction_factor": float(effective_sample_size / n_evaluations),
+        "control_beta": float(beta),
+    }
+
+def simulate_with_variance_reduction(inputs: Union[EPVInputs, FrozenEPVInputs], n_draws: int,
+                                     output: str = "enterprise_epv", antithetic: bool = True,
+                                     control_variate: bool = True, seed: int = 42) -> Dict[str, float]:
+    """Expected `output` of one case under the UI Monte Carlo perturbations"""
+    return compare_scenarios({"case": inputs}, n_draws, output, antithetic=antithetic,
+                             control_variate=control_variate, seed=seed)["scenarios"]["case"]
+
+def compare_scenarios(scenarios: Dict[str, Union[EPVInputs, FrozenEPVInputs]], n_draws: int,
+                      output: str = "enterprise_epv", common_random_numbers: bool = True,
+                      antithetic: bool = True, control_variate: bool = True,
+                      seed: int = 42) -> Dict[str, Dict]:
+    """
+    Expected `output` per scenario plus each scenario's difference to the first one.
+
+    With common_random_numbers every scenario is valued on the same uniform draws;
+    otherwise each scenario gets an independent stream.
+    """
+    n_lines = max(len(inputs.service_lines) for inputs in scenarios.values())
+    streams = np.random.SeedSequence(seed).spawn(len(scenarios))
+    shared = draw_uniforms(np.random.default_rng(streams[0]), n_draws, n_lines, antithetic)
+
+    values, controls = {}, {}
+    for stream, (name, inputs) in zip(streams, scenarios.items()):
+        uniforms = shared if common_random_numbers else draw_uniforms(np.random.default_rng(stream), n_draws,
+                                                                       n_lines, antithetic)
+        packed = _packed_case(inputs, n_lines)
+        draws = compute_unified_epv_arrays(
+            apply_epv_factors(_repeat_packed(packed, n_draws), uniforms_to_factors(uniforms)))
+        values[name] = draws[output]
+        controls[name] = linear_control(uniforms, factor_sensitivities(packed, output)) if control_variate else None
+
+    results = {name: estimate_mean(values[name], controls[name], antithetic) for name in scenarios}
+
+    reference = next(iter(scenarios))
+    differences = {}
+    for name in list(scenarios)[1:]:
+        if common_random_numbers:
+            control = controls[name] - controls[reference] if control_variate else None
+            difference = estimate_mean(values[name] - values[reference], control, antithetic)
+        else:
+            a, b = results[name], results[reference]
+            std_error = float(np.hypot(a["std_error"], b["std_error"]))
+            estimate = a["estimate"] - b["estimate"]
+            difference = {"estimate": estimate, "std_error": std_error,
+                          "ci_95": (estimate - 1.96 * std_error, estimate + 1.96 * std_error),
+                          "n_evaluations": a["n_evaluations"] + b["n_evaluations"]}
+        # Plain independent MC of a difference: Var = Var(Y_s) + Var(Y_ref) per draw pair
+        independent_variance = values[name].var(ddof=1) + values[reference].var(ddof=1)
+        difference["effective_sample_size"] = (float(independent_variance / difference["std_error"] ** 2)
+                                               if difference["std_error"] > 0 else np.inf)
+        differences[f"{name} - {reference}"] = difference
+
+    return {
+        "output": output,
+        "n_draws": n_draws,
+        "settings": {"antithetic": antithetic, "control_variate": control_variate,
+                     "common_random_numbers": common_random_numbers, "seed": seed},
+        "scenarios": results,
+        "differences": differences,
+    }
+
+def _summary_frame(comparison: Dict[str, Dict]) -> pd.DataFrame:
+    rows = []
+    for kind in ("scenarios", "differences"):
+        for name, result in comparison[kind].items():
+            rows.append({"quantity": name, "estimate": result["estimate"], "std_error": result["std_error"],
+                         "effective_sample_size": result["effective_sample_size"]})
+    return pd.DataFrame(rows)
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Variance-reduced EPV Monte Carlo scenario comparison")
+    parser.add_argument('--draws', type=int, default=2000, help="Valuations per scenario (even)")
+    parser.add_argument('--output', default="scenario_epv", help="EPVOutputs field to estimate")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from cpp_medispa_simulation_2025 import create_cpp_medispa_case, calculate_epv_inputs_from_case
+
+    print("🎲 EPV MONTE CARLO VARIANCE REDUCTION")
+    print("=" * 60)
+
+    base = calculate_epv_inputs_from_case(create_cpp_medispa_case())
+    scenarios = {
+        "Base": base,
+        "Bear": replace(base, scenario="Bear"),
+        "Higher leverage": replace(base, target_debt_weight=base.target_debt_weight + 0.20,
+                                   debt_interest_bearing=base.debt_interest_bearing + 500000),
+    }
+
+    settings = [
+        ("Plain MC (independent)", dict(common_random_numbers=False, antithetic=False, control_variate=False)),
+        ("Common random numbers", dict(common_random_numbers=True, antithetic=False, control_variate=False)),
+        ("CRN + antithetic", dict(common_random_numbers=True, antithetic=True, control_variate=False)),
+        ("CRN + control variate", dict(common_random_numbers=True, antithetic=False, control_variate=True)),
+    ]
+    for label, options in settings:
+        comparison = compare_scenarios(scenarios, args.draws, args.output, seed=args.seed, **options)
+        print(f"\n{label} - {args.draws:,} draws per scenario, output: {args.output}")
+        for _, row in _summary_frame(comparison).iterrows():
+            print(f"   {row['quantity']:<26} {row['estimate']:>14,.0f} ± {row['std_error']:>10,.0f}   "
+                  f"ESS {row['effective_sample_size']:>14,.0f}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
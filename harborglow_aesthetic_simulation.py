@@ -11,6 +11,9 @@ import numpy as np
 from datetime import datetime
 import json
 
+from capital_structure_optimizer import LBOCase, optimize_capital_structure
+from ttm_time_series_store import store_from_validator
+
 class HarborGlowValidator:
     def __init__(self):
         # TTM Quarterly Data (Q3-2024 through Q2-2025)
@@ -91,18 +94,21 @@ class HarborGlowValidator:
         self.total_cogs_pct = 0.265   # ~26.5% total COGS (product + provider)
         self.maint_capex_pct = 0.02   # 2.0% of revenue
 
+    def build_ttm_store(self):
+        """Quarterly history with add-backs keyed by quarter (one-time items where booked)"""
+        return store_from_validator(self, 'HarborGlow', per_quarter_overlays={
+            'owner_addback': self.ttm_owner_addback,
+            'rent_normalization': self.ttm_rent_normalization
+        })
+
     def calculate_ttm_metrics(self):
         """Calculate TTM financial metrics"""
-        ttm_revenue = sum(q['revenue'] for q in self.ttm_quarters)
-        ttm_ebitda_reported = sum(q['ebitda_reported'] for q in self.ttm_quarters)
-        
-        # TTM adjusted EBITDA (per broker guidance)
-        ttm_ebitda_adjusted = (ttm_ebitda_reported + 
-                             self.ttm_owner_addback + 
-                             self.ttm_onetime_addback + 
-                             self.ttm_rent_normalization)
-        
-        ttm_margin = ttm_ebitda_adjusted / ttm_revenue
+        # Rolling TTM (per broker guidance); window ends at the last TTM quarter
+        ttm = self.build_ttm_store().window('HarborGlow', self.ttm_quarters[-1]['quarter'])
+        ttm_revenue = ttm['ttm_revenue']
+        ttm_ebitda_reported = ttm['ttm_ebitda_reported']
+        ttm_ebitda_adjusted = ttm['ttm_ebitda_adjusted']
+        ttm_margin = ttm['ttm_margin']
         
         # Validation checks
         expected_ttm_revenue = 7610000  # Per broker check
@@ -402,6 +408,21 @@ class HarborGlowValidator:
         print(f"MOIC: {irr_results['moic']:.1f}x")
         print(f"IRR: {irr_results['irr']:.1%}")
         
+        # 6b. Optimized Capital Structure
+        print("\n6b. OPTIMIZED CAPITAL STRUCTURE")
+        print("🏗️  SEARCH: Leverage × Rate/Tenor/IO × Cash Sweep | DSCR ≥ 1.70x base, ≥ 1.50x downside")
+        print("-" * 60)
+        lbo_case = LBOCase.from_validator(self, ttm_metrics)
+        capital_structure = {objective: optimize_capital_structure([lbo_case], objective)[0].to_dict()
+                             for objective in ('irr', 'moic')}
+        for objective, best in capital_structure.items():
+            if best['feasible']:
+                print(f"Max {objective.upper()}: {best['leverage']:.2f}x debt @ {best['rate']:.2%}, "
+                      f"{best['tenor']:.0f}y, IO {best['io_months']:.0f}m, sweep {best['sweep']:.0%} → "
+                      f"IRR {best['irr']:.1%}, MOIC {best['moic']:.2f}x (binding: {best['binding_constraint']})")
+            else:
+                print(f"Max {objective.upper()}: ❌ no structure meets the DSCR floors")
+        
         # 7. EPV Analysis
         print("\n7. EPV ANALYSIS & ASSUMPTIONS")
         print("🔬 CONSERVATIVE VALUATION FLOOR (Earnings Power Value)")
@@ -444,6 +465,7 @@ class HarborGlowValidator:
             'sources_uses': sources_uses,
             'debt_schedule': debt_schedule,
             'irr_analysis': irr_results,
+            'capital_structure_optimization': capital_structure,
             'epv_analysis': epv_results,
             'epv_sensitivity': sensitivity,
             'operating_kpis': self.operating_kpis,
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Historical EPV Panel
+Normalized margins and EPV per ticker per as-of year for a whole universe at once
+
+Real-data mode in unified_epv_system values one ticker per call: get_line probes alias
+names against each statement and safe_avg reduces one series at a time. This engine
+takes every ticker's statements as one (ticker, year) × line-item MultiIndex frame:
+
+    1. Alias resolution - raw line-item columns are matched once against a precompiled
+       index (normalized name → canonical item, priority), and each canonical item is
+       the first non-null alias column, for every row in one pass.
+    2. Dense panel - canonical items unstack to tickers × years arrays.
+    3. Normalization windows - for each as-of year the window is the last `years`
+       non-null observations up to that year (the safe_avg rule), expressed as a
+       tickers × as-of × years mask; mean, median and 20% trimmed mean (5+ points)
+       are masked reductions over all tickers at once.
+    4. EPV - normalized revenue × normalized EBIT margin → NOPAT / owner earnings,
+       capitalized at the CAPM WACC of EPVInputs (per-ticker beta optional); equity
+       adds as-of-year cash and subtracts debt.
+
+A scalar reference built from get_line/safe_avg checks the panel on sampled rows.
+
+Usage:
+    python historical_epv_panel.py --tickers 1000 --years 12
+"""
+
+from __future__ import annotations
+
+import time
+import argparse
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Module import (not from-import): unified_epv_system imports this module at load time
+import unified_epv_system as epv
+
+MARGIN_METHODS = ("mean", "median", "trimmed")
+
+# Canonical item → aliases in priority order (yfinance and common statement names)
+LINE_ITEM_ALIASES: Dict[str, List[str]] = {
+    "revenue": ["Total Revenue", "Revenue", "TotalRevenue", "Operating Revenue", "Net Sales"],
+    "ebit": ["EBIT", "Operating Income", "OperatingIncome", "Total Operating Income As Reported"],
+    "da": ["Depreciation And Amortization", "Depreciation Amortization Depletion",
+           "Reconciled Depreciation", "Depreciation"],
+    "capex": ["Capital Expenditure", "Capital Expenditures", "Purchase Of PPE"],
+    "cash": ["Cash And Cash Equivalents", "Cash", "Cash Cash Equivalents And Short Term Investments"],
+    "debt": ["Total Debt", "Long Term Debt", "Short Long Term Debt"],
+}
+
+# =============================================================================
+# PANEL CONSTRUCTION & ALIAS RESOLUTION
+# =============================================================================
+
+def _normalize_name(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+def compile_alias_index(aliases: Dict[str, List[str]] = None) -> Dict[str, tuple]:
+    """Normalized line-item name → (canonical item, priority)"""
+    aliases = LINE_ITEM_ALIASES if aliases is None else aliases
+    index = {}
+    for item, names in aliases.items():
+        for priority, name in enumerate(names):
+            index.setdefault(_normalize_name(name), (item, priority))
+    return index
+
+ALIAS_INDEX = compile_alias_index()
+
+def statements_to_panel(statements: Dict[str, Dict[str, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    yfinance-style statements {ticker: {"income"|"balance"|"cashflow": items × dates}}
+    → one frame indexed (ticker, year) with a column per raw line item.
+    """
+    frames = {}
+    for ticker, data in statements.items():
+        parts = [data[name] for name in ("income", "balance", "cashflow")
+                 if isinstance(data.get(name), pd.DataFrame) and not data[name].empty]
+        if not parts:
+            continue
+        wide = pd.concat(parts)
+        wide = wide[~wide.index.duplicated()]
+        rows = wide.T
+        rows.index = pd.DatetimeIndex(rows.index).year
+        frames[ticker] = rows[~rows.index.duplicated(keep="last")]
+    if not frames:   # no ticker has any statement
+        return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=["ticker", "year"]), dtype=float)
+    panel = pd.concat(frames, names=["ticker", "year"])
+    return panel.apply(pd.to_numeric, errors="coerce")
+
+def resolve_line_items(panel: pd.DataFrame, alias_index: Dict[str, tuple] = None) -> pd.DataFrame:
+    """Canonical columns: first non-null alias column per row, aliases matched once"""
+    alias_index = ALIAS_INDEX if alias_index is None else alias_index
+    matches: Dict[str, List[tuple]] = {}
+    for column in panel.columns:
+        hit = alias_index.get(_normalize_name(column))
+        if hit is not None:
+            matches.setdefault(hit[0], []).append((hit[1], column))
+
+    resolved = pd.DataFrame(index=panel.index)
+    for item in dict.fromkeys(item for item, _ in alias_index.values()):
+        columns = [column for _, column in sorted(matches.get(item, []), key=lambda m: m[0])]
+        if not columns:
+            resolved[item] = np.nan
+            continue
+        values = panel[columns].to_numpy(dtype=float)
+        first = np.argmax(~np.isnan(values), axis=1)
+        resolved[item] = values[np.arange(len(values)), first]
+    return resolved
+
+# =============================================================================
+# WINDOWED NORMALIZATION
+# =============================================================================
+
+def window_mask(valid: np.ndarray, years: int) -> np.ndarray:
+    """
+    (tickers, as_of, year) mask of the last `years` valid observations at or before
+    each as-of year - the safe_avg window (dropna().tail(years)) for every as-of at once.
+    """
+    counts = np.cumsum(valid, axis=1)
+    n_years = valid.shape[1]
+    at_or_before = np.tril(np.ones((n_years, n_years), dtype=bool))[None, :, :]
+    recent = (counts[:, :, None] - counts[:, None, :]) < years
+    return valid[:, None, :] & at_or_before & recent
+
+def masked_average(values: np.ndarray, mask: np.ndarray, method: str = "median") -> np.ndarray:
+    """
+    Mean / median / trimmed mean of values (tickers, year) over mask (tickers, as_of, year).
+
+    Trimmed drops int(0.2 n) points from each tail when n ≥ 5, like safe_avg; empty
+    windows are NaN.
+    """
+    windows = np.where(mask, values[:, None, :], np.nan)
+    n = mask.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "mean":
+            return np.nansum(windows, axis=-1) / np.where(n > 0, n, np.nan)
+        ordered = np.sort(windows, axis=-1)  # NaN sorts last
+        if method == "median":
+            low = np.take_along_axis(ordered, np.maximum((n - 1) // 2, 0)[..., None], axis=-1)[..., 0]
+            high = np.take_along_axis(ordered, np.maximum(n // 2, 0)[..., None], axis=-1)[..., 0]
+            return np.where(n > 0, (low + high) / 2, np.nan)
+        if method == "trimmed":
+            trim = np.where(n >= 5, (n * 0.2).astype(int), 0)
+            position = np.arange(ordered.shape[-1])
+            keep = (position >= trim[..., None]) & (position < (n - trim)[..., None])
+            kept = keep.sum(axis=-1)
+            return np.where(kept > 0, np.where(keep, ordered, 0.0).sum(axis=-1) / np.where(kept > 0, kept, 1), np.nan)
+    raise ValueError(f"Unknown margin method: {method}")
+
+# =============================================================================
+# PANEL EPV
+# =============================================================================
+
+def _panel_wacc(inputs: epv.EPVInputs, beta: np.ndarray) -> np.ndarray:
+    if inputs.wacc_override is not None:
+        return np.full_like(beta, inputs.wacc_override)
+    cost_equity = inputs.rf_rate + beta * inputs.mrp + inputs.size_premium + inputs.specific_premium
+    after_tax_cost_debt = inputs.cost_debt * (1 - inputs.tax_rate)
+    return np.clip(inputs.target_debt_weight * after_tax_cost_debt +
+                   (1 - inputs.target_debt_weight) * cost_equity, 0.03, 0.35)
+
+def compute_historical_epv_panel(resolved: pd.DataFrame, inputs: epv.EPVInputs = None,
+                                 betas: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    EPV per (ticker, as_of year) from a resolved (ticker, year) frame.
+
+    inputs supplies years, margin_method, tax and WACC settings, epv_method and the
+    maintenance capex rule (depr_factor × D&A, otherwise normalized reported capex).
+    Mean, median and trimmed margins are all reported; EPV follows inputs.margin_method
+    and enterprise_epv_<method> is given for each.
+    """
+    inputs = epv.EPVInputs(service_lines=[], use_real_data=True) if inputs is None else inputs
+    dense = {item: resolved[item].unstack("year") for item in ("revenue", "ebit", "da", "capex", "cash", "debt")}
+    tickers, years = dense["revenue"].index, dense["revenue"].columns
+    arrays = {item: frame.reindex(index=tickers, columns=years).to_numpy(dtype=float) for item, frame in dense.items()}
+
+    revenue, ebit = arrays["revenue"], arrays["ebit"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        margin = np.where(revenue > 0, ebit / revenue, np.nan)
+    capex = np.abs(arrays["capex"])
+
+    margin_window = window_mask(~np.isnan(margin), inputs.years)
+    revenue_window = window_mask(~np.isnan(revenue), inputs.years)
+    margins = {method: masked_average(margin, margin_window, method) for method in MARGIN_METHODS}
+    normalized_revenue = masked_average(revenue, revenue_window, inputs.margin_method)
+    da = np.nan_to_num(masked_average(arrays["da"], window_mask(~np.isnan(arrays["da"]), inputs.years),
+                                      inputs.margin_method))
+    reported_capex = np.nan_to_num(masked_average(capex, window_mask(~np.isnan(capex), inputs.years),
+                                                  inputs.margin_method))
+    maintenance_capex = da * inputs.maint_factor if inputs.maintenance_method == "depr_factor" else reported_capex
+
+    beta = np.full(len(tickers), inputs.beta) if betas is None else \
+        betas.reindex(tickers).fillna(inputs.beta).to_numpy(dtype=float)
+    wacc = _panel_wacc(inputs, beta)[:, None]
+
+    def epv_for(normalized_margin):
+        ebit_normalized = normalized_revenue * normalized_margin
+        nopat = ebit_normalized * (1 - inputs.tax_rate)
+        owner_earnings = nopat + da - maintenance_capex
+        adjusted = owner_earnings if inputs.epv_method == "Owner Earnings" else nopat
+        return ebit_normalized, nopat, owner_earnings, adjusted / wacc
+
+    ebit_normalized, nopat, owner_earnings, enterprise_epv = epv_for(margins[inputs.margin_method])
+    cash, debt = np.nan_to_num(arrays["cash"]), np.nan_to_num(arrays["debt"])
+
+    columns = {
+        "n_years": margin_window.sum(axis=-1),
+        "normalized_revenue": normalized_revenue,
+        **{f"margin_{method}": margins[method] for method in MARGIN_METHODS},
+        "ebit_normalized": ebit_normalized,
+        "da": da,
+        "maintenance_capex": maintenance_capex,
+        "nopat": nopat,
+        "owner_earnings": owner_earnings,
+        "wacc": np.broadcast_to(wacc, normalized_revenue.shape),
+        "enterprise_epv": enterprise_epv,
+        "equity_epv": enterprise_epv + cash - debt,
+        **{f"enterprise_epv_{method}": epv_for(margins[method])[3] for method in MARGIN_METHODS},
+    }
+    index = pd.MultiIndex.from_product([tickers, years], names=["ticker", "as_of"])
+    result = pd.DataFrame({name: np.asarray(values).reshape(-1) for name, values in columns.items()}, index=index)
+    return result[(result["n_years"] > 0) & result["normalized_revenue"].notna()]
+
+def historical_epv_for_statements(statements: Dict[str, Dict[str, pd.DataFrame]], inputs: epv.EPVInputs = None,
+                                  betas: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Statements dict → resolved panel → EPV per ticker per as-of year"""
+    return compute_historical_epv_panel(resolve_line_items(statements_to_panel(statements)), inputs, betas)
+
+# =============================================================================
+# SCALAR REFERENCE & SYNTHETIC UNIVERSE
+# =============================================================================
+
+def reference_epv(data: Dict[str, pd.DataFrame], as_of: int, inputs: epv.EPVInputs, beta: float = None) -> Dict[str, float]:
+    """One ticker / as-of year the per-call way (get_line + safe_avg), for checking the panel"""
+    def series(statement, item):
+        frame = data.get(statement, pd.DataFrame())
+        line = epv.get_line(frame, LINE_ITEM_ALIASES[item])
+        if line is None:
+            return None
+        line = line.copy()
+        line.index = pd.DatetimeIndex(line.index).year
+        return line[line.index <= as_of].astype(float)
+
+    revenue, ebit = series("income", "revenue"), series("income", "ebit")
+    margin = (ebit / revenue.where(revenue > 0)).dropna()
+    normalized_revenue = epv.safe_avg(revenue, inputs.years, inputs.margin_method)
+    normalized_margin = epv.safe_avg(margin, inputs.years, inputs.margin_method)
+    da_series = series("cashflow", "da")
+    da = epv.safe_avg(da_series, inputs.years, inputs.margin_method) if da_series is not None else 0.0
+    ebit_normalized = normalized_revenue * normalized_margin
+    nopat = ebit_normalized * (1 - inputs.tax_rate)
+    owner_earnings = nopat + da - da * inputs.maint_factor
+    adjusted = owner_earnings if inputs.epv_method == "Owner Earnings" else nopat
+    wacc = float(_panel_wacc(inputs, np.array([inputs.beta if beta is None else beta]))[0])
+    return {"normalized_revenue": normalized_revenue, "margin": normalized_margin, "enterprise_epv": adjusted / wacc}
+
+def build_synthetic_universe(n_tickers: int, n_years: int = 10, seed: int = 42,
+                             first_year: int = 2014) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """yfinance-shaped statements with mixed alias names and missing observations"""
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime([f"{first_year + i}-12-31" for i in range(n_years)])
+    revenue_names = ["Total Revenue", "Revenue", "TotalRevenue", "Operating Revenue"]
+    ebit_names = ["EBIT", "Operating Income", "OperatingIncome"]
+    da_names = ["Depreciation And Amortization", "Reconciled Depreciation"]
+
+    universe = {}
+    for i in range(n_tickers):
+        base = rng.lognormal(np.log(2e8), 1.5)
+        growth = rng.normal(0.05, 0.04) + rng.normal(0, 0.08, n_years)
+        revenue = base * np.cumprod(1 + growth)
+        margin = np.clip(rng.normal(0.12, 0.06) + rng.normal(0, 0.03, n_years), -0.2, 0.5)
+        ebit = revenue * margin
+        revenue[rng.random(n_years) < 0.05] = np.nan
+        ebit[rng.random(n_years) < 0.05] = np.nan
+
+        income = pd.DataFrame([revenue, ebit], index=[revenue_names[i % 4], ebit_names[i % 3]], columns=dates)
+        cashflow = pd.DataFrame([revenue * rng.uniform(0.02, 0.06), -revenue * rng.uniform(0.03, 0.08)],
+                                index=[da_names[i % 2], "Capital Expenditure"], columns=dates)
+        balance = pd.DataFrame([revenue * rng.uniform(0.05, 0.2), revenue * rng.uniform(0.0, 0.6)],
+                               index=["Cash And Cash Equivalents", "Total Debt"], columns=dates)
+        universe[f"T{i:04d}"] = {"income": income, "balance": balance, "cashflow": cashflow}
+    return universe
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Panel-wide historical EPV backtest")
+    parser.add_argument('--tickers', type=int, default=1000, help="Synthetic universe size")
+    parser.add_argument('--years', type=int, default=12, help="Statement years per ticker")
+    parser.add_argument('--window', type=int, default=5, help="Normalization window (years)")
+    parser.add_argument('--method', choices=MARGIN_METHODS, default="median")
+    parser.add_argument('--check', type=int, default=200, help="Rows checked against the scalar reference")
+    args = parser.parse_args()
+
+    print("📈 HISTORICAL EPV PANEL")
+    print("=" * 60)
+
+    universe = build_synthetic_universe(args.tickers, args.years)
+    inputs = epv.EPVInputs(service_lines=[], use_real_data=True, years=args.window, margin_method=args.method)
+
+    start = time.perf_counter()
+    panel = statements_to_panel(universe)
+    built = time.perf_counter()
+    resolved = resolve_line_items(panel)
+    result = compute_historical_epv_panel(resolved, inputs)
+    finished = time.perf_counter()
+
+    print(f"Universe: {args.tickers:,} tickers × {args.years} years, {panel.shape[1]} raw line items")
+    print(f"   Panel build: {(built - start) * 1000:.0f} ms | resolve + EPV: {(finished - built) * 1000:.0f} ms")
+    print(f"   Output: {len(result):,} ticker × as-of rows")
+
+    latest = result.xs(result.index.get_level_values("as_of").max(), level="as_of")
+    print(f"\nLatest as-of year, {args.method} normalization:")
+    for method in MARGIN_METHODS:
+        print(f"   Median EBIT margin ({method:>7}): {latest[f'margin_{method}'].median():.2%}")
+    print(f"   Median EV/normalized revenue: {(latest['enterprise_epv'] / latest['normalized_revenue']).median():.2f}x")
+
+    rng = np.random.default_rng(7)
+    sample = result.index[rng.choice(len(result), size=min(args.check, len(result)), replace=False)]
+    worst = 0.0
+    for ticker, as_of in sample:
+        reference = reference_epv(universe[ticker], as_of, inputs)
+        row = result.loc[(ticker, as_of)]
+        worst = max(worst, abs(row["enterprise_epv"] - reference["enterprise_epv"]) /
+                    max(abs(reference["enterprise_epv"]), 1.0))
+    print(f"\n🔍 Scalar get_line/safe_avg check on {len(sample)} rows: max relative error {worst:.1e} "
+          f"{'✅' if worst < 1e-9 else '❌'}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
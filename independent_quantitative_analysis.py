@@ -17,19 +17,26 @@ Analyst: Independent Quantitative Finance Team
 import numpy as np
 import pandas as pd
 import scipy.stats as stats
-from scipy.optimize import minimize
 from scipy.interpolate import interp1d
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import json
+import argparse
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Tuple, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
+from vectorized_dcf_engine import vectorized_dcf
+from real_options_engine import black_scholes, deferral_option
+from efficient_frontier_engine import service_line_frontier
+from multi_year_monte_carlo import MultiYearSimulationConfig, run_multi_year_simulation
+from tail_probability_estimator import ValuationRiskModel, estimate_valuation_tail_risks
+from stress_test_engine import StressCases, run_stress_battery, scenario_set
+
 # Set random seed for reproducibility
 np.random.seed(42)
 
@@ -97,8 +104,10 @@ class IndependentQuantitativeAnalyzer:
         self.data = financial_data
         self.results = None
         
-    def run_comprehensive_analysis(self) -> Dict:
-        """Execute comprehensive quantitative analysis"""
+    def run_comprehensive_analysis(self, multi_year_monte_carlo: bool = False, checkpoint_dir: str = None,
+                                   tail_risk_sampling: bool = False) -> Dict:
+        """Execute comprehensive quantitative analysis (optionally with path-dependent multi-year MC
+        and importance-sampled tail risks)"""
         
         print("🔬 INDEPENDENT QUANTITATIVE ANALYSIS")
         print("=" * 60)
@@ -120,7 +129,9 @@ class IndependentQuantitativeAnalyzer:
         
         # 4. Monte Carlo Simulation
         print("\n4️⃣  MONTE CARLO SIMULATION FRAMEWORK")
-        monte_carlo_results = self._perform_monte_carlo_analysis()
+        monte_carlo_results = self._perform_monte_carlo_analysis(tail_risk_sampling=tail_risk_sampling)
+        multi_year_results = (self._perform_multi_year_monte_carlo_analysis(checkpoint_dir=checkpoint_dir)
+                              if multi_year_monte_carlo else None)
         
         # 5. Portfolio Theory Application
         print("\n5️⃣  PORTFOLIO THEORY & CAPITAL ALLOCATION")
@@ -142,6 +153,7 @@ class IndependentQuantitativeAnalyzer:
             "risk_analysis": risk_results,
             "valuation_analysis": valuation_results,
             "monte_carlo_analysis": monte_carlo_results,
+            **({"multi_year_monte_carlo_analysis": multi_year_results} if multi_year_results else {}),
             "portfolio_analysis": portfolio_results,
             "sensitivity_analysis": sensitivity_results,
             "executive_summary": self._generate_executive_summary(
@@ -297,43 +309,41 @@ class IndependentQuantitativeAnalyzer:
         print(f"   ✓ Monte Carlo VaR (95%): {mc_var_95:.2%}")
         print(f"   ✓ Monte Carlo CVaR (95%): {mc_cvar_95:.2%}")
         
-        # Stress Testing Scenarios
-        stress_scenarios = {
-            "recession": {
-                "revenue_impact": -0.25,  # 25% revenue decline
-                "margin_compression": -0.05,  # 5pp margin compression
-                "description": "Economic recession scenario"
-            },
-            "competition": {
-                "revenue_impact": -0.15,  # 15% revenue decline
-                "margin_compression": -0.03,  # 3pp margin compression  
-                "description": "Increased competition scenario"
-            },
-            "marketing_normalization": {
-                "revenue_impact": -0.08,  # 8% revenue decline
-                "margin_compression": -0.08,  # 8pp margin compression from marketing increase
-                "description": "Marketing expense normalization"
-            }
-        }
-        
-        stress_results = {}
+        # Stress Testing Scenarios (declarative library, 10% EBITDA margin floor)
+        stress_scenarios = scenario_set(["recession", "competition", "marketing_normalization", "rate_up_200bps"])
         base_revenue_2024 = revenues[-1]
         base_ebitda_2024 = ebitda[-1]
+        operating_income_2024 = self.data.operating_income[-1]
+        stress_case = StressCases.from_records([{
+            "name": "medispa_2024",
+            "revenue": base_revenue_2024,
+            "ebitda": base_ebitda_2024,
+            "da": base_ebitda_2024 - operating_income_2024,
+            "maintenance_capex": operating_income_2024 * (1 - self.data.tax_rate) - self.data.free_cash_flow[-1],
+            "tax_rate": self.data.tax_rate,
+            "debt": self.data.debt_outstanding,
+            "rate": self.data.interest_rate,
+            "tenor": 10,
+            "multiple": 6.0,
+        }])
+        battery = run_stress_battery(stress_case, stress_scenarios)
         
-        for scenario_name, scenario in stress_scenarios.items():
-            stressed_revenue = base_revenue_2024 * (1 + scenario["revenue_impact"])
-            stressed_margin = (base_ebitda_2024 / base_revenue_2024) + scenario["margin_compression"]
-            stressed_ebitda = stressed_revenue * max(stressed_margin, 0.1)  # Floor at 10% margin
-            
-            stress_results[scenario_name] = {
-                "stressed_revenue": float(stressed_revenue),
-                "stressed_ebitda": float(stressed_ebitda),
-                "revenue_change": scenario["revenue_impact"],
-                "ebitda_change": float((stressed_ebitda - base_ebitda_2024) / base_ebitda_2024),
-                "description": scenario["description"]
+        stress_results = {}
+        for scenario in stress_scenarios:
+            stressed = battery.scenario(scenario.name)
+            stress_results[scenario.name] = {
+                "stressed_revenue": stressed["revenue"],
+                "stressed_ebitda": stressed["ebitda"],
+                "revenue_change": scenario.revenue_shock,
+                "ebitda_change": float((stressed["ebitda"] - base_ebitda_2024) / base_ebitda_2024),
+                "stressed_enterprise_value": stressed["enterprise_value"],
+                "stressed_equity_value": stressed["equity_value"],
+                "stressed_dscr": stressed["dscr_post"],
+                "description": scenario.description
             }
         
         print(f"   ✓ Stress scenarios calculated: {len(stress_scenarios)} cases")
+        print(f"   ✓ Worst stressed DSCR: {min(s['stressed_dscr'] for s in stress_results.values()):.2f}x")
         
         # Risk-adjusted return calculations
         current_ebitda_margin = base_ebitda_2024 / base_revenue_2024
@@ -360,7 +370,8 @@ class IndependentQuantitativeAnalyzer:
             "stress_testing": {
                 "scenarios": stress_results,
                 "worst_case_revenue": min([s["stressed_revenue"] for s in stress_results.values()]),
-                "worst_case_ebitda": min([s["stressed_ebitda"] for s in stress_results.values()])
+                "worst_case_ebitda": min([s["stressed_ebitda"] for s in stress_results.values()]),
+                "worst_case_dscr": min([s["stressed_dscr"] for s in stress_results.values()])
             },
             "risk_adjusted_metrics": {
                 "risk_adjusted_ebitda": float(risk_adjusted_ebitda),
@@ -390,69 +401,49 @@ class IndependentQuantitativeAnalyzer:
             "optimistic": {"growth_rates": [0.08, 0.07, 0.06, 0.05, 0.045]}
         }
         
-        dcf_valuations = {}
+        # Project EBITDA (assuming gradual margin normalization)
+        base_margin = base_ebitda_2024 / base_revenue_2024
+        normalized_margin = 0.22  # Target normalized margin after marketing adjustment
+        margin_path = base_margin + (normalized_margin - base_margin) * (np.arange(1, forecast_years + 1) / forecast_years)
+        
+        # Project Free Cash Flow (EBITDA ≈ EBIT, 3% revenue capex, 1% of revenue change from year 2)
+        tax_rate = self.data.tax_rate
+        scenario_names = list(revenue_scenarios)
+        growth_matrix = np.array([revenue_scenarios[name]["growth_rates"] for name in scenario_names])
+        
+        dcf = vectorized_dcf(
+            base_revenue=base_revenue_2024,
+            growth=growth_matrix,
+            margin=margin_path,
+            wacc=wacc,
+            terminal_growth=terminal_growth,
+            tax_rate=tax_rate,
+            capex_pct_revenue=0.03,
+            wc_pct_revenue_change=0.01,
+            wc_from_year=2,
+        )
         
-        for scenario_name, scenario in revenue_scenarios.items():
-            # Project revenues
-            projected_revenues = [base_revenue_2024]
-            for growth_rate in scenario["growth_rates"]:
-                projected_revenues.append(projected_revenues[-1] * (1 + growth_rate))
-            
-            # Project EBITDA (assuming gradual margin normalization)
-            base_margin = base_ebitda_2024 / base_revenue_2024
-            normalized_margin = 0.22  # Target normalized margin after marketing adjustment
-            
-            projected_ebitda = []
-            for i, revenue in enumerate(projected_revenues[1:], 1):
-                # Gradual margin convergence
-                margin_convergence = base_margin + (normalized_margin - base_margin) * (i / forecast_years)
-                projected_ebitda.append(revenue * margin_convergence)
-            
-            # Project Free Cash Flow
-            tax_rate = self.data.tax_rate
-            capex_pct_revenue = 0.03  # 3% of revenue for maintenance capex
-            working_capital_change = 0.01  # 1% of revenue change
-            
-            projected_fcf = []
-            for i, (revenue, ebitda) in enumerate(zip(projected_revenues[1:], projected_ebitda)):
-                nopat = ebitda * (1 - tax_rate)  # Simplified (EBITDA ≈ EBIT for this analysis)
-                capex = revenue * capex_pct_revenue
-                wc_change = (revenue - projected_revenues[i]) * working_capital_change if i > 0 else 0
-                fcf = nopat - capex - wc_change
-                projected_fcf.append(fcf)
-            
-            # Terminal Value
-            terminal_fcf = projected_fcf[-1] * (1 + terminal_growth)
-            terminal_value = terminal_fcf / (wacc - terminal_growth)
-            
-            # Discount to present value
-            discount_factors = [(1 + wacc) ** -i for i in range(1, forecast_years + 1)]
-            terminal_discount_factor = (1 + wacc) ** -forecast_years
-            
-            pv_fcf = sum(fcf * df for fcf, df in zip(projected_fcf, discount_factors))
-            pv_terminal = terminal_value * terminal_discount_factor
-            
-            enterprise_value = pv_fcf + pv_terminal
-            equity_value = enterprise_value - self.data.debt_outstanding
-            
+        dcf_valuations = {}
+        for i, scenario_name in enumerate(scenario_names):
             dcf_valuations[scenario_name] = {
-                "projected_revenues": projected_revenues[1:],
-                "projected_ebitda": projected_ebitda,
-                "projected_fcf": projected_fcf,
-                "terminal_value": float(terminal_value),
-                "enterprise_value": float(enterprise_value),
-                "equity_value": float(equity_value),
-                "pv_fcf": float(pv_fcf),
-                "pv_terminal": float(pv_terminal)
+                "projected_revenues": dcf["revenue"][i].tolist(),
+                "projected_ebitda": dcf["ebitda"][i].tolist(),
+                "projected_fcf": dcf["fcf"][i].tolist(),
+                "terminal_value": float(dcf["terminal_value"][i]),
+                "enterprise_value": float(dcf["enterprise_value"][i]),
+                "equity_value": float(dcf["enterprise_value"][i] - self.data.debt_outstanding),
+                "pv_fcf": float(dcf["pv_fcf_total"][i]),
+                "pv_terminal": float(dcf["pv_terminal"][i])
             }
         
         print(f"   ✓ DCF Scenarios calculated: {len(dcf_valuations)}")
         
         # Real Options Valuation (Expansion Option)
         # Model the option to expand into adjacent markets
-        expansion_option = self._calculate_expansion_option_value(base_revenue_2024, wacc)
+        # (Black-Scholes, plus the same opportunity with early exercise on a binomial lattice)
+        expansion_option, expansion_option_american = self._calculate_expansion_option_value(base_revenue_2024, wacc)
         
-        print(f"   ✓ Expansion Option Value: ${expansion_option:.0f}K")
+        print(f"   ✓ Expansion Option Value: ${expansion_option:.0f}K (lattice: ${expansion_option_american:.0f}K)")
         
         # Weighted average valuation
         scenario_weights = {"conservative": 0.25, "base_case": 0.50, "optimistic": 0.25}
@@ -469,7 +460,8 @@ class IndependentQuantitativeAnalyzer:
             "dcf_scenarios": dcf_valuations,
             "real_options": {
                 "expansion_option_value": float(expansion_option),
-                "option_methodology": "Black-Scholes adaptation for growth options"
+                "expansion_option_american": expansion_option_american,
+                "option_methodology": "Black-Scholes adaptation for growth options, binomial lattice cross-check"
             },
             "weighted_valuation": {
                 "enterprise_value": float(weighted_enterprise_value),
@@ -489,26 +481,25 @@ class IndependentQuantitativeAnalyzer:
             }
         }
     
-    def _calculate_expansion_option_value(self, base_revenue: float, wacc: float) -> float:
-        """Calculate real option value for expansion opportunity using Black-Scholes framework"""
+    def _calculate_expansion_option_value(self, base_revenue: float, wacc: float, sigma: float = 0.35,
+                                          horizon_years: float = 3.0, investment: float = 800.0,
+                                          n_steps: int = 400) -> Tuple[float, float]:
+        """Expansion option value: Black-Scholes and the early-exercise binomial lattice on the same inputs
+        (the two agree absent value leakage)"""
         
         # Option parameters
         S = base_revenue * 0.3  # Current "asset value" - estimated expansion potential
-        K = 800  # "Strike price" - estimated expansion investment required
-        T = 3    # Time to expiration (3 years to decide on expansion)
+        K = investment          # "Strike price" - estimated expansion investment required
+        T = horizon_years       # Time to expiration (years to decide on expansion)
         r = self.data.risk_free_rate
-        sigma = 0.35  # Volatility of expansion opportunity
-        
-        # Black-Scholes calculation adapted for real options
-        d1 = (np.log(S/K) + (r + 0.5*sigma**2)*T) / (sigma*np.sqrt(T))
-        d2 = d1 - sigma*np.sqrt(T)
         
-        call_value = S*stats.norm.cdf(d1) - K*np.exp(-r*T)*stats.norm.cdf(d2)
-        
-        return max(call_value, 0)  # Option value cannot be negative
+        # Black-Scholes calculation adapted for real options (vectorized kernel, scalar inputs)
+        european = float(black_scholes(S, K, T, r, sigma))
+        american = float(deferral_option(S, K, T, r, sigma, n_steps=n_steps))
+        return european, american
     
-    def _perform_monte_carlo_analysis(self) -> Dict:
-        """Monte Carlo simulation for valuation uncertainty"""
+    def _perform_monte_carlo_analysis(self, tail_risk_sampling: bool = False) -> Dict:
+        """Monte Carlo simulation for valuation uncertainty (optionally importance-sampled tail risks)"""
         
         n_simulations = 10000
         base_revenue = self.data.revenues[-1]
@@ -584,6 +575,23 @@ class IndependentQuantitativeAnalyzer:
         probability_positive_equity = np.mean(equity_values > 0)
         probability_ev_above_debt = np.mean(enterprise_values > debt_mean)
         
+        # Rare events: importance sampling on the same model (plain MC above is too noisy at <1%).
+        # Opt-in: it roughly doubles the cost of this section.
+        tail_risks = None
+        if tail_risk_sampling:
+            risk_model = ValuationRiskModel(
+                base_revenue=base_revenue, growth_mean=float(growth_mean), growth_std=float(growth_std),
+                debt_mean=debt_mean, debt_std=debt_std, margin_alpha=margin_alpha, margin_beta=margin_beta,
+                multiple_mean=multiple_mean, multiple_std=multiple_std, interest_rate=self.data.interest_rate
+            )
+            tail_risks = estimate_valuation_tail_risks(risk_model)
+            negative_equity = tail_risks["probability_negative_equity"]
+            dscr_breach = tail_risks["probability_dscr_below_1.25x"]
+            print(f"   ✓ P(negative equity), importance sampled: {negative_equity['probability']:.3%} "
+                  f"± {negative_equity['std_error']:.3%} (≈ {negative_equity['equivalent_plain_mc_samples']:,.0f} plain draws)")
+            print(f"   ✓ P(DSCR < 1.25x), importance sampled: {dscr_breach['probability']:.3%} "
+                  f"± {dscr_breach['std_error']:.3%}")
+        
         return {
             "simulation_parameters": {
                 "n_simulations": n_simulations,
@@ -620,6 +628,7 @@ class IndependentQuantitativeAnalyzer:
                 "probability_ev_exceeds_debt": float(probability_ev_above_debt),
                 "probability_ev_below_4000": float(np.mean(enterprise_values < 4000))
             },
+            **({"tail_risk_importance_sampling": tail_risks} if tail_risks else {}),
             "scenario_analysis": {
                 "bear_case_p10": {
                     "enterprise_value": float(ev_percentiles['p10']),
@@ -636,6 +645,45 @@ class IndependentQuantitativeAnalyzer:
             }
         }
     
+    def _perform_multi_year_monte_carlo_analysis(self, n_paths: int = 100000, n_years: int = 5,
+                                                 mean_reversion: bool = True, checkpoint_dir: str = None) -> Dict:
+        """Path-dependent Monte Carlo: yearly shocks to growth, margin and multiple with debt paydown"""
+        
+        base_revenue = self.data.revenues[-1]
+        historical_growth_rates = np.diff(self.data.revenues) / np.array(self.data.revenues[:-1])
+        historical_margins = np.array(self.data.ebitda) / np.array(self.data.revenues)
+        
+        config = MultiYearSimulationConfig(
+            base_revenue=base_revenue,
+            initial_debt=self.data.debt_outstanding,
+            n_paths=n_paths,
+            n_years=n_years,
+            growth_mean=float(np.mean(historical_growth_rates)),
+            growth_std=float(np.std(historical_growth_rates)),
+            growth_phi=0.5 if mean_reversion else 0.0,
+            margin_mean=float(historical_margins[-1]),
+            margin_std=float(max(np.std(historical_margins), 0.02)),
+            margin_phi=0.7 if mean_reversion else 0.0,
+            margin_bounds=(0.15, 0.45),
+            multiple_mean=6.0,
+            multiple_std=1.2,
+            multiple_phi=0.8 if mean_reversion else 0.0,
+            tax_rate=self.data.tax_rate,
+            interest_rate=self.data.interest_rate,
+        )
+        
+        print(f"   ✓ Running {n_paths:,} paths × {n_years} years (AR(1) mean reversion: {'on' if mean_reversion else 'off'})...")
+        if checkpoint_dir:
+            print(f"   ✓ Checkpointing to {checkpoint_dir} (re-run to resume after an interruption)")
+        results = run_multi_year_simulation(config, checkpoint_dir=checkpoint_dir)
+        
+        exit_equity = results["per_year"]["exit_equity"]["percentiles"]
+        print(f"   ✓ Year {n_years} exit equity P10/P50/P90: ${exit_equity['p10'][-1]:,.0f}K / "
+              f"${exit_equity['p50'][-1]:,.0f}K / ${exit_equity['p90'][-1]:,.0f}K")
+        print(f"   ✓ Cumulative debt paydown (mean): ${sum(results['per_year']['debt_paydown']['mean']):,.0f}K")
+        
+        return results
+    
     def _perform_portfolio_analysis(self) -> Dict:
         """Portfolio theory application and capital allocation analysis"""
         
@@ -673,38 +721,27 @@ class IndependentQuantitativeAnalyzer:
         print(f"   ✓ Portfolio Volatility: {portfolio_volatility:.2%}")
         print(f"   ✓ Sharpe Ratio: {sharpe_ratio:.3f}")
         
-        # Efficient frontier analysis (simplified)
-        # Find minimum variance portfolio
-        n_assets = len(service_lines)
-        constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-        bounds = tuple((0, 1) for _ in range(n_assets))
-        
-        def portfolio_variance_objective(weights):
-            return np.dot(weights, np.dot(cov_matrix, weights))
-        
-        # Optimize for minimum variance
-        min_var_result = minimize(
-            portfolio_variance_objective,
-            weights,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints
-        )
-        
-        if min_var_result.success:
-            optimal_weights = min_var_result.x
-            optimal_variance = min_var_result.fun
-            optimal_volatility = np.sqrt(optimal_variance)
+        # Long-only efficient frontier (batched active-set solver) on a shrunk covariance:
+        # two annual returns per line leave the sample covariance singular
+        revenue_history = np.array([self.data.service_line_revenues[sl] for sl in service_lines]).T
+        # (same monthly risk-free approximation as the current-portfolio Sharpe ratio)
+        frontier = service_line_frontier(revenue_history, n_points=25, risk_free_rate=self.data.risk_free_rate/12)
+        
+        # Current and minimum-variance risk compared on the same (shrunk) covariance
+        current_volatility_shrunk = float(np.sqrt(weights @ frontier["covariance"] @ weights))
+        if frontier["converged"]:
+            optimal_weights = frontier["min_variance_weights"]
+            optimal_volatility = frontier["min_variance_volatility"]
             optimal_return = np.sum(optimal_weights * np.mean(returns_matrix, axis=1))
-            
-            print(f"   ✓ Minimum Variance Portfolio Volatility: {optimal_volatility:.2%}")
-            print(f"   ✓ Minimum Variance Portfolio Return: {optimal_return:.2%}")
         else:
             optimal_weights = weights
-            optimal_variance = portfolio_variance
-            optimal_volatility = portfolio_volatility
+            optimal_volatility = current_volatility_shrunk
             optimal_return = portfolio_return
         
+        print(f"   ✓ Minimum Variance Portfolio Volatility: {optimal_volatility:.2%} vs current "
+              f"{current_volatility_shrunk:.2%} (shrunk covariance, intensity {frontier['shrinkage_intensity']:.2f})")
+        print(f"   ✓ Minimum Variance Portfolio Return: {optimal_return:.2%}")
+        
         # Diversification benefit
         weighted_avg_volatility = np.sum(weights * np.sqrt(np.diag(cov_matrix)))
         diversification_ratio = portfolio_volatility / weighted_avg_volatility
@@ -720,13 +757,21 @@ class IndependentQuantitativeAnalyzer:
                 "weights": {sl: float(w) for sl, w in zip(service_lines, weights)},
                 "expected_return": float(portfolio_return),
                 "volatility": float(portfolio_volatility),
+                "volatility_shrunk_covariance": current_volatility_shrunk,
                 "sharpe_ratio": float(sharpe_ratio)
             },
             "optimal_portfolio": {
                 "weights": {sl: float(w) for sl, w in zip(service_lines, optimal_weights)},
                 "expected_return": float(optimal_return),
                 "volatility": float(optimal_volatility),
-                "optimization_success": min_var_result.success
+                "optimization_success": bool(frontier["converged"])
+            },
+            "efficient_frontier": {
+                "expected_returns": frontier["frontier_returns"].tolist(),
+                "volatilities": frontier["frontier_volatility"].tolist(),
+                "max_sharpe_weights": {sl: float(w) for sl, w in zip(service_lines, frontier["max_sharpe_weights"])},
+                "max_sharpe_ratio": float(frontier["max_sharpe_ratio"]),
+                "covariance_shrinkage_intensity": float(frontier["shrinkage_intensity"])
             },
             "risk_analysis": {
                 "diversification_ratio": float(diversification_ratio),
@@ -1024,6 +1069,16 @@ def create_medispa_financial_data() -> QuantitativeFinancialData:
 
 def main():
     """Execute comprehensive independent quantitative analysis"""
+    parser = argparse.ArgumentParser(description="Independent quantitative analysis of the medispa case")
+    parser.add_argument('--multi-year', action='store_true',
+                        help="Add the path-dependent multi-year Monte Carlo")
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help="Checkpoint directory for the multi-year Monte Carlo (resumes if present)")
+    parser.add_argument('--tail-risk', action='store_true',
+                        help="Add importance-sampled rare-event probabilities (negative equity, DSCR breach)")
+    args = parser.parse_args()
+    if args.checkpoint_dir and not args.multi_year:
+        parser.error("--checkpoint-dir requires --multi-year")
     
     print("🎯 INDEPENDENT QUANTITATIVE ANALYSIS")
     print("Multi-Service Medispa Case - Advanced Financial Modeling")
@@ -1036,7 +1091,9 @@ def main():
     analyzer = IndependentQuantitativeAnalyzer(financial_data)
     
     # Run comprehensive analysis
-    results = analyzer.run_comprehensive_analysis()
+    results = analyzer.run_comprehensive_analysis(multi_year_monte_carlo=args.multi_year,
+                                                  checkpoint_dir=args.checkpoint_dir,
+                                                  tail_risk_sampling=args.tail_risk)
     
     # Save results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
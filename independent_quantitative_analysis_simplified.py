@@ -15,12 +15,14 @@ Financial Data: Revenue $3.7M, EBITDA Margin 29.1%, 6 Service Lines
 import numpy as np
 import pandas as pd
 import scipy.stats as stats
-from scipy.optimize import minimize
 import json
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from real_options_engine import black_scholes
+from efficient_frontier_engine import service_line_frontier
+
 # Set random seed for reproducibility
 np.random.seed(42)
 
@@ -306,12 +308,7 @@ class SimplifiedQuantitativeAnalyzer:
     
     def _black_scholes_option(self, S, K, T, r, sigma):
         """Black-Scholes option valuation for real options"""
-        
-        d1 = (np.log(S/K) + (r + 0.5*sigma**2)*T) / (sigma*np.sqrt(T))
-        d2 = d1 - sigma*np.sqrt(T)
-        
-        call_value = S*stats.norm.cdf(d1) - K*np.exp(-r*T)*stats.norm.cdf(d2)
-        return max(call_value, 0)
+        return float(black_scholes(S, K, T, r, sigma))
     
     def _monte_carlo_analysis(self):
         """Monte Carlo simulation for valuation uncertainty"""
@@ -445,25 +442,20 @@ class SimplifiedQuantitativeAnalyzer:
         excess_return = portfolio_return - self.risk_free_rate/12  # Monthly approximation
         sharpe_ratio = excess_return / portfolio_volatility if portfolio_volatility > 0 else 0
         
-        # Optimization for minimum variance portfolio
-        n_assets = len(self.service_lines)
-        constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-        bounds = tuple((0, 1) for _ in range(n_assets))
-        
-        def portfolio_variance_obj(w):
-            return np.dot(w, np.dot(cov_matrix, w))
-        
-        result = minimize(portfolio_variance_obj, weights, method='SLSQP',
-                         bounds=bounds, constraints=constraints)
+        # Minimum variance portfolio: long-only active-set solver on a shrunk covariance
+        # (same monthly risk-free approximation as the current-portfolio Sharpe ratio)
+        frontier = service_line_frontier(service_data.values, n_points=25, risk_free_rate=self.risk_free_rate/12)
         
-        if result.success:
-            optimal_weights = result.x
+        # Current and minimum-variance risk compared on the same (shrunk) covariance
+        current_volatility_shrunk = float(np.sqrt(weights @ frontier["covariance"] @ weights))
+        if frontier["converged"]:
+            optimal_weights = frontier["min_variance_weights"]
             optimal_return = np.dot(optimal_weights, mean_returns)
-            optimal_volatility = np.sqrt(result.fun)
+            optimal_volatility = frontier["min_variance_volatility"]
         else:
             optimal_weights = weights
             optimal_return = portfolio_return
-            optimal_volatility = portfolio_volatility
+            optimal_volatility = current_volatility_shrunk
         
         # Diversification metrics
         weighted_avg_vol = np.sqrt(np.dot(weights**2, np.diag(cov_matrix)))
@@ -471,7 +463,9 @@ class SimplifiedQuantitativeAnalyzer:
         effective_assets = 1 / np.sum(weights**2)
         
         print(f"   ✓ Current Portfolio Return: {portfolio_return:.2%}")
-        print(f"   ✓ Current Portfolio Volatility: {portfolio_volatility:.2%}")
+        print(f"   ✓ Current Portfolio Volatility: {portfolio_volatility:.2%} "
+              f"({current_volatility_shrunk:.2%} on the shrunk covariance)")
+        print(f"   ✓ Minimum Variance Portfolio Volatility: {optimal_volatility:.2%} (shrunk covariance)")
         print(f"   ✓ Sharpe Ratio: {sharpe_ratio:.3f}")
         print(f"   ✓ Diversification Ratio: {diversification_ratio:.3f}")
         print(f"   ✓ Effective Number of Assets: {effective_assets:.1f}")
@@ -482,13 +476,15 @@ class SimplifiedQuantitativeAnalyzer:
                            for i, w in enumerate(weights)},
                 "return": float(portfolio_return),
                 "volatility": float(portfolio_volatility),
+                "volatility_shrunk_covariance": current_volatility_shrunk,
                 "sharpe_ratio": float(sharpe_ratio)
             },
             "optimal_portfolio": {
                 "weights": {list(self.service_lines.keys())[i]: float(w) 
                            for i, w in enumerate(optimal_weights)},
                 "return": float(optimal_return),
-                "volatility": float(optimal_volatility)
+                "volatility": float(optimal_volatility),
+                "covariance_shrinkage_intensity": float(frontier["shrinkage_intensity"])
             },
             "diversification_metrics": {
                 "diversification_ratio": float(diversification_ratio),
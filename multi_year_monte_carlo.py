@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Path-Dependent Multi-Year Monte Carlo
+Vectorized (paths × years) simulation of revenue growth, EBITDA margin and exit multiple
+
+Every year draws its own shock, optionally with AR(1) mean reversion. Shocks are turned
+into paths with matrix filters (AR(1) recursion and debt roll-forward are linear, so
+they reduce to one lower-triangular matrix product) and revenue is compounded with a
+cumulative product - there is no Python loop over years or paths. Paths are processed
+in chunks and stored as float32 by default, so 1M paths × 10 years fits in a few GB.
+
+With a checkpoint_dir the chunks run through simulation_checkpoint: paths are kept in
+memory-mapped files and the RNG state is snapshotted between chunks, so a preempted run
+resumes where it stopped and produces a bit-identical summary.
+
+Debt roll-forward (net debt, negative = cash build-up):
+    D_t = D_t-1 × (1 + sweep × r × (1 - tax)) - sweep × FCF_t
+"""
+
+import numpy as np
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+from simulation_checkpoint import run_chunked
+
+DEFAULT_PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+
+@dataclass
+class MultiYearSimulationConfig:
+    """Inputs for a multi-year path simulation (currency units follow base_revenue)"""
+    base_revenue: float
+    initial_debt: float
+    n_paths: int = 10000
+    n_years: int = 5
+
+    # Revenue growth: N(mean, std) shocks, AR(1) around the mean
+    growth_mean: float = 0.04
+    growth_std: float = 0.05
+    growth_phi: float = 0.0
+    growth_bounds: tuple = (-0.15, 0.20)
+
+    # EBITDA margin
+    margin_mean: float = 0.22
+    margin_std: float = 0.03
+    margin_phi: float = 0.0
+    margin_bounds: tuple = (0.05, 0.45)
+
+    # Exit EV/EBITDA multiple
+    multiple_mean: float = 6.0
+    multiple_std: float = 0.8
+    multiple_phi: float = 0.0
+    multiple_bounds: tuple = (3.5, 10.0)
+
+    # Cash flow conversion and debt
+    tax_rate: float = 0.25
+    da_pct_revenue: float = 0.04
+    capex_pct_revenue: float = 0.03
+    nwc_pct_revenue_change: float = 0.01
+    interest_rate: float = 0.085
+    cash_sweep_pct: float = 0.75
+
+    # Execution
+    seed: int = 42
+    chunk_size: int = 250000
+    dtype: str = "float32"
+    percentiles: List[int] = field(default_factory=lambda: list(DEFAULT_PERCENTILES))
+
+def ar1_filter_matrix(phi: float, n_years: int) -> np.ndarray:
+    """Lower-triangular L with L[t, k] = phi^(t-k) for k <= t (so x = eps @ L.T is AR(1))"""
+    lags = np.subtract.outer(np.arange(n_years), np.arange(n_years))
+    return np.where(lags >= 0, float(phi) ** np.maximum(lags, 0), 0.0)
+
+def simulate_ar1_paths(rng: np.random.Generator, n_paths: int, n_years: int, mean: float, std: float,
+                       phi: float, bounds: tuple, dtype) -> np.ndarray:
+    """Draw (paths × years) shocks and evolve them as AR(1) deviations around `mean`"""
+    shocks = rng.standard_normal((n_paths, n_years), dtype=np.float64) * std
+    deviations = shocks if phi == 0 else shocks @ ar1_filter_matrix(phi, n_years).T
+    return np.clip(mean + deviations, bounds[0], bounds[1]).astype(dtype, copy=False)
+
+def simulate_chunk(config: MultiYearSimulationConfig, rng: np.random.Generator, n_paths: int) -> Dict[str, np.ndarray]:
+    """Simulate one chunk of paths; returns (paths × years) arrays"""
+    dtype = np.dtype(config.dtype)
+    n_years = config.n_years
+
+    growth = simulate_ar1_paths(rng, n_paths, n_years, config.growth_mean, config.growth_std,
+                                config.growth_phi, config.growth_bounds, dtype)
+    margin = simulate_ar1_paths(rng, n_paths, n_years, config.margin_mean, config.margin_std,
+                                config.margin_phi, config.margin_bounds, dtype)
+    multiple = simulate_ar1_paths(rng, n_paths, n_years, config.multiple_mean, config.multiple_std,
+                                  config.multiple_phi, config.multiple_bounds, dtype)
+
+    # Operating paths
+    revenue = config.base_revenue * np.cumprod(1 + growth, axis=1, dtype=dtype)
+    prior_revenue = np.empty_like(revenue)
+    prior_revenue[:, 0] = config.base_revenue
+    prior_revenue[:, 1:] = revenue[:, :-1]
+    ebitda = revenue * margin
+    del growth, margin
+
+    ebit = ebitda - revenue * config.da_pct_revenue
+    fcf = (ebit * (1 - config.tax_rate) + revenue * (config.da_pct_revenue - config.capex_pct_revenue)
+           - (revenue - prior_revenue) * config.nwc_pct_revenue_change)
+    del ebit, prior_revenue
+
+    # Debt roll-forward: D_t = a × D_t-1 - sweep × FCF_t  =>  D = a^t D_0 - (sweep × FCF) @ L(a).T
+    growth_factor = 1 + config.cash_sweep_pct * config.interest_rate * (1 - config.tax_rate)
+    debt_filter = ar1_filter_matrix(growth_factor, n_years).astype(dtype)
+    opening_factor = (growth_factor ** np.arange(1, n_years + 1)).astype(dtype)
+    net_debt = config.initial_debt * opening_factor - (config.cash_sweep_pct * fcf) @ debt_filter.T
+    prior_debt = np.empty_like(net_debt)
+    prior_debt[:, 0] = config.initial_debt
+    prior_debt[:, 1:] = net_debt[:, :-1]
+    debt_paydown = prior_debt - net_debt
+    del prior_debt
+
+    exit_equity = ebitda * multiple - net_debt
+
+    return {
+        "revenue": revenue,
+        "ebitda": ebitda,
+        "fcf": fcf,
+        "debt_paydown": debt_paydown,
+        "net_debt": net_debt,
+        "exit_equity": exit_equity,
+    }
+
+def run_multi_year_simulation(config: MultiYearSimulationConfig, keep_paths: bool = False,
+                              checkpoint_dir: Optional[str] = None, max_chunks: Optional[int] = None) -> Optional[Dict]:
+    """
+    Run all chunks and summarise per-year distributions.
+
+    checkpoint_dir makes the run resumable; max_chunks stops after that many chunks in
+    this call (returns None until the run is complete).
+    """
+    dtype = np.dtype(config.dtype)
+    metrics = ["revenue", "ebitda", "fcf", "debt_paydown", "net_debt", "exit_equity"]
+
+    run = run_chunked(lambda rng, start, stop: simulate_chunk(config, rng, stop - start),
+                      config.n_paths, config.chunk_size, config.seed,
+                      row_specs={name: ((config.n_years,), dtype) for name in metrics},
+                      checkpoint_dir=checkpoint_dir, run_key=asdict(config), max_chunks=max_chunks)
+    if not run.complete:
+        return None
+    paths = run.rows
+
+    years = list(range(1, config.n_years + 1))
+    per_year = {}
+    for name in metrics:
+        values = paths[name]
+        quantiles = np.percentile(values, config.percentiles, axis=0)
+        per_year[name] = {
+            "mean": values.mean(axis=0, dtype=np.float64).tolist(),
+            "std": values.std(axis=0, dtype=np.float64).tolist(),
+            "percentiles": {f"p{p}": quantiles[i].astype(float).tolist() for i, p in enumerate(config.percentiles)},
+        }
+
+    results = {
+        "simulation_parameters": {
+            "n_paths": config.n_paths,
+            "n_years": config.n_years,
+            "growth": {"mean": config.growth_mean, "std": config.growth_std, "ar1_phi": config.growth_phi},
+            "margin": {"mean": config.margin_mean, "std": config.margin_std, "ar1_phi": config.margin_phi},
+            "multiple": {"mean": config.multiple_mean, "std": config.multiple_std, "ar1_phi": config.multiple_phi},
+            "cash_sweep_pct": config.cash_sweep_pct,
+            "interest_rate": config.interest_rate,
+            "seed": config.seed,
+            "dtype": config.dtype,
+        },
+        "years": years,
+        "per_year": per_year,
+        "risk_probabilities": {
+            "probability_negative_equity_by_year": np.mean(paths["exit_equity"] < 0, axis=0).tolist(),
+            "probability_debt_free_by_year": np.mean(paths["net_debt"] <= 0, axis=0).tolist(),
+        },
+    }
+    if keep_paths:
+        results["paths"] = paths
+    return results
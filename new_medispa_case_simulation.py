@@ -27,6 +27,8 @@ try:
 except ImportError:
     print("Warning: Could not import EPV system. Running in standalone mode.")
 
+from chart_preaggregation import preaggregate_payload
+
 @dataclass
 class NewMedspaCase:
     """Complete case study data structure for the new medispa case"""
@@ -1294,7 +1296,8 @@ if __name__ == "__main__":
             "marketing_sensitivity": sensitivity_results["marketing_sensitivity"],
             "multiple_sensitivity": sensitivity_results["multiple_sensitivity"],
             "debt_sensitivity": sensitivity_results["debt_sensitivity"],
-            "monte_carlo_inputs": sensitivity_results["monte_carlo_inputs"],
+            # Raw draws become fixed-size histograms/CDF knots so the file stays chart-ready
+            "monte_carlo_inputs": preaggregate_payload(sensitivity_results["monte_carlo_inputs"]),
             "tornado_analysis": sensitivity_results["tornado_analysis"],
             "summary_statistics": sensitivity_results["summary_statistics"]
         }
@@ -12,11 +12,25 @@ import time
 import hashlib
 import os
 import sys
+import ast
+import inspect
+import shutil
+import textwrap
+import argparse
+import cProfile
+import pstats
+import tracemalloc
+import functools
 from datetime import datetime
 from typing import Dict, List, Tuple, Any, Optional
 import traceback
 import random
 
+ENGINE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ENGINE_DIR)
+from stress_test_engine import StressCases, run_stress_battery, scenario_set
+from viability_boundary_refinement import refine_term_map
+
 # Fix random seed for determinism
 random.seed(42)
 np.random.seed(42)
@@ -40,12 +54,114 @@ def safe_json_dump(data, file_handle, **kwargs):
     
     json.dump(convert_types(data), file_handle, **kwargs)
 
+def normalized_source_hash(source: str) -> str:
+    """MD5 of the source AST with comments, docstrings and formatting stripped"""
+    tree = ast.parse(textwrap.dedent(source))
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], 'value', None), ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return hashlib.md5(ast.dump(tree).encode()).hexdigest()
+
+def engine_source_hashes(module_names: List[str]) -> Dict[str, str]:
+    """Normalized source hash of each engine module and every engine module it imports"""
+    hashes = {}
+    pending = list(module_names)
+    while pending:
+        name = pending.pop()
+        path = os.path.join(ENGINE_DIR, f"{name}.py")
+        if name in hashes or not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            source = f.read()
+        hashes[name] = normalized_source_hash(source)
+        for node in ast.walk(ast.parse(source)):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module)
+    return hashes
+
+def diff_perf_profiles(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare two perf_profile.json payloads module-by-module and method-by-method"""
+    def compare(old: Dict[str, Any], new: Dict[str, Any], key: str) -> Dict[str, Any]:
+        rows = {}
+        for name in sorted(set(old) | set(new)):
+            old_ns = old.get(name, {}).get(key)
+            new_ns = new.get(name, {}).get(key)
+            rows[name] = {
+                f'baseline_{key}': old_ns,
+                f'current_{key}': new_ns,
+                'delta_ns': new_ns - old_ns if old_ns is not None and new_ns is not None else None,
+                'ratio': new_ns / old_ns if old_ns and new_ns is not None else None
+            }
+        return rows
+    
+    return {
+        'schema_version': current.get('schema_version'),
+        'baseline_timestamp': baseline.get('run_timestamp'),
+        'current_timestamp': current.get('run_timestamp'),
+        'modules': compare(baseline.get('modules', {}), current.get('modules', {}), 'wall_ns'),
+        'methods': compare(baseline.get('methods', {}), current.get('methods', {}), 'total_ns')
+    }
+
 class ProductionAssuranceEngine:
-    def __init__(self, baseline_dir: str, case_data_path: str):
+    # Incremental re-run cache (relative to the output directory)
+    CACHE_DIR = '.assurance_cache'
+    CACHE_SCHEMA_VERSION = 1
+    
+    # Core calculation methods every cached module depends on
+    CORE_METHODS = [
+        'calculate_owner_earnings_scenarios',
+        'calculate_epv_g0_valuation',
+        'calculate_debt_service',
+        'calculate_dual_dscr',
+        'log_assertion',
+    ]
+    
+    # Artifacts written by each cacheable module (Meta and Performance always re-run)
+    MODULE_ARTIFACTS = {
+        '1_Determinism': ['determinism_report.md'],
+        '2_EPV_Correctness': ['epv_assertions.json'],
+        '3_DSCR_Engine': ['dscr_table.csv', 'dscr_curve.png', 'dscr_assertions.json'],
+        '4_Term_Sensitivity': ['term_sensitivity.csv', 'term_heatmap.png', 'term_boundaries.csv', 'term_assertions.json'],
+        '5_Price_to_Pass': ['price_to_pass.md', 'price_to_pass.json'],
+        '6_Structure_Pack': ['feasible_deal_pack.md'],
+        '7_Discipline': ['price_vs_epv_recon.md', 'discipline_assertions.json'],
+        '8_Shock_Tests': ['shock_tests.md', 'edge_assertions.json'],
+    }
+    
+    # Extra methods a module calls beyond the core set
+    MODULE_EXTRA_METHODS = {
+        '5_Price_to_Pass': ['solve_constrained_multiple'],
+    }
+    
+    # Engine modules (in the repo root) a module calls; their own engine imports are followed
+    MODULE_ENGINE_MODULES = {
+        '4_Term_Sensitivity': ['viability_boundary_refinement'],
+        '8_Shock_Tests': ['stress_test_engine'],
+    }
+    
+    # Core methods instrumented in profiling mode
+    PROFILED_METHODS = [
+        'calculate_dual_dscr',
+        'calculate_debt_service',
+        'calculate_epv_g0_valuation',
+    ]
+    PROFILE_SCHEMA_VERSION = 1
+    PROFILE_DIR = 'profiles'
+    
+    def __init__(self, baseline_dir: str, case_data_path: str, force: bool = False,
+                 profile: bool = False, cprofile: bool = False):
         """Initialize assurance engine with baseline and case data"""
         self.start_time = time.time()
         self.baseline_dir = baseline_dir
         self.case_data_path = case_data_path
+        self.force = force
+        self.profile = profile or cprofile
+        self.cprofile = cprofile
         
         # Load baseline artifacts
         self.load_baseline_artifacts()
@@ -72,6 +188,19 @@ class ProductionAssuranceEngine:
         # Performance tracking
         self.module_times = {}
         
+        # Incremental cache tracking
+        self.cached_modules = []
+        self.module_fingerprints = {}
+        self.cache_index = self.load_cache_index()
+        
+        # Opt-in profiling (perf_counter_ns, call counts, tracemalloc, cProfile)
+        self.module_profiles = {}
+        self.method_stats = {}
+        if self.profile:
+            self.install_method_profilers()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        
     def load_baseline_artifacts(self):
         """Load baseline v2 artifacts for comparison"""
         try:
@@ -127,12 +256,266 @@ class ProductionAssuranceEngine:
     def time_module_execution(self, module_name: str, func):
         """Time module execution"""
         start = time.time()
-        result = func()
+        if self.profile:
+            result = self.profile_module_execution(module_name, func)
+        else:
+            result = func()
         duration = time.time() - start
         self.module_times[module_name] = duration
         print(f"Module {module_name} completed in {duration:.2f}s")
         return result
     
+    # ==================== PROFILING ====================
+    
+    def install_method_profilers(self):
+        """Wrap core methods on this instance to record call counts and ns timings"""
+        for method_name in self.PROFILED_METHODS:
+            stats = {'calls': 0, 'total_ns': 0, 'min_ns': None, 'max_ns': 0}
+            self.method_stats[method_name] = stats
+            method = getattr(self, method_name)
+            
+            def make_wrapper(method, stats):
+                @functools.wraps(method)
+                def wrapper(*args, **kwargs):
+                    start_ns = time.perf_counter_ns()
+                    try:
+                        return method(*args, **kwargs)
+                    finally:
+                        elapsed_ns = time.perf_counter_ns() - start_ns
+                        stats['calls'] += 1
+                        stats['total_ns'] += elapsed_ns
+                        stats['max_ns'] = max(stats['max_ns'], elapsed_ns)
+                        stats['min_ns'] = elapsed_ns if stats['min_ns'] is None else min(stats['min_ns'], elapsed_ns)
+                return wrapper
+            
+            setattr(self, method_name, make_wrapper(method, stats))
+    
+    def profile_module_execution(self, module_name: str, func):
+        """Run a module under perf_counter_ns, tracemalloc and optional cProfile"""
+        calls_before = {name: (stats['calls'], stats['total_ns']) for name, stats in self.method_stats.items()}
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.cprofile else None
+        
+        start_ns = time.perf_counter_ns()
+        if profiler:
+            profiler.enable()
+        try:
+            result = func()
+        finally:
+            if profiler:
+                profiler.disable()
+            wall_ns = time.perf_counter_ns() - start_ns
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+        
+        method_calls = {}
+        for name, stats in self.method_stats.items():
+            calls = stats['calls'] - calls_before[name][0]
+            if calls:
+                method_calls[name] = {'calls': calls, 'total_ns': stats['total_ns'] - calls_before[name][1]}
+        
+        self.module_profiles[module_name] = {
+            'wall_ns': wall_ns,
+            'cached': False,
+            'tracemalloc_peak_bytes': memory_peak - memory_before,
+            'tracemalloc_net_bytes': memory_after - memory_before,
+            'method_calls': method_calls
+        }
+        
+        if profiler:
+            self.module_profiles[module_name].update(self.dump_cprofile(module_name, profiler))
+        
+        return result
+    
+    def dump_cprofile(self, module_name: str, profiler: cProfile.Profile) -> Dict[str, str]:
+        """Write a .prof dump and a caller/callee folded-stack file for flamegraph tools"""
+        os.makedirs(self.PROFILE_DIR, exist_ok=True)
+        prof_path = os.path.join(self.PROFILE_DIR, f"{module_name}.prof")
+        folded_path = os.path.join(self.PROFILE_DIR, f"{module_name}.folded")
+        profiler.dump_stats(prof_path)
+        
+        def label(func_key):
+            filename, line, name = func_key
+            return f"{os.path.basename(filename)}:{name}:{line}" if line else name
+        
+        stats = pstats.Stats(profiler)
+        with open(folded_path, 'w') as f:
+            for callee, (_, _, tottime, _, callers) in sorted(stats.stats.items()):
+                if not callers:
+                    f.write(f"{module_name};{label(callee)} {int(tottime * 1e6)}\n")
+                for caller, (_, _, caller_tottime, _) in sorted(callers.items()):
+                    weight = int(caller_tottime * 1e6)
+                    if weight > 0:
+                        f.write(f"{module_name};{label(caller)};{label(callee)} {weight}\n")
+        
+        return {'cprofile_dump': prof_path, 'flamegraph_folded': folded_path}
+    
+    def write_perf_profile(self) -> Dict[str, Any]:
+        """Write the structured, diffable profiling report"""
+        methods = {}
+        for name, stats in self.method_stats.items():
+            methods[name] = {
+                'calls': stats['calls'],
+                'total_ns': stats['total_ns'],
+                'mean_ns': stats['total_ns'] // stats['calls'] if stats['calls'] else 0,
+                'min_ns': stats['min_ns'] or 0,
+                'max_ns': stats['max_ns']
+            }
+        
+        perf_profile = {
+            'schema_version': self.PROFILE_SCHEMA_VERSION,
+            'clock': 'perf_counter_ns',
+            'run_timestamp': datetime.now().isoformat(),
+            'cprofile_enabled': self.cprofile,
+            'modules': self.module_profiles,
+            'methods': methods,
+            'totals': {
+                'modules_wall_ns': sum(m['wall_ns'] for m in self.module_profiles.values()),
+                'tracemalloc_peak_bytes': max((m['tracemalloc_peak_bytes'] for m in self.module_profiles.values()), default=0)
+            }
+        }
+        
+        with open('perf_profile.json', 'w') as f:
+            safe_json_dump(perf_profile, f, indent=2, sort_keys=True)
+        
+        return perf_profile
+    
+    # ==================== INCREMENTAL CACHE ====================
+    
+    def load_cache_index(self) -> Dict[str, Any]:
+        """Load the per-module cache index from the last run"""
+        index_path = os.path.join(self.CACHE_DIR, 'cache_index.json')
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            if index.get('schema_version') != self.CACHE_SCHEMA_VERSION:
+                return {'schema_version': self.CACHE_SCHEMA_VERSION, 'modules': {}}
+            return index
+        except (OSError, ValueError):
+            return {'schema_version': self.CACHE_SCHEMA_VERSION, 'modules': {}}
+    
+    def save_cache_index(self):
+        """Persist the per-module cache index"""
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        with open(os.path.join(self.CACHE_DIR, 'cache_index.json'), 'w') as f:
+            safe_json_dump(self.cache_index, f, indent=2)
+    
+    def calculate_input_fingerprint(self) -> str:
+        """Hash of case data and v2 engine, insensitive to whitespace and comments"""
+        if hasattr(self, '_input_fingerprint'):
+            return self._input_fingerprint
+        
+        input_hash = hashlib.md5()
+        input_hash.update(json.dumps(self.case_data, sort_keys=True).encode())
+        
+        engine_path = f"{self.baseline_dir}/sapphirederm_refinement_v2_engine.py"
+        try:
+            with open(engine_path, 'r') as f:
+                input_hash.update(normalized_source_hash(f.read()).encode())
+        except (OSError, SyntaxError):
+            input_hash.update(b'engine-unavailable')
+        
+        self._input_fingerprint = input_hash.hexdigest()
+        return self._input_fingerprint
+    
+    def calculate_module_fingerprint(self, module_name: str, func) -> str:
+        """Fingerprint a module from its inputs, code (including engine modules) and parameters"""
+        method_names = [func.__name__] + self.CORE_METHODS + self.MODULE_EXTRA_METHODS.get(module_name, [])
+        
+        code_hash = hashlib.md5()
+        for method_name in method_names:
+            code_hash.update(method_name.encode())
+            code_hash.update(normalized_source_hash(inspect.getsource(getattr(self, method_name))).encode())
+        for engine_name, engine_hash in sorted(engine_source_hashes(self.MODULE_ENGINE_MODULES.get(module_name, [])).items()):
+            code_hash.update(engine_name.encode())
+            code_hash.update(engine_hash.encode())
+        
+        parameters = {
+            'ttm_revenue': self.ttm_revenue,
+            'ttm_adj_ebitda': self.ttm_adj_ebitda,
+            'net_debt': self.net_debt,
+            'tax_rate': self.tax_rate,
+            'wacc_scenarios': self.wacc_scenarios,
+            'ttm_da': self.ttm_da,
+            'maintenance_capex': self.maintenance_capex,
+            'artifacts': self.MODULE_ARTIFACTS[module_name],
+            'numpy_version': np.__version__,
+        }
+        
+        fingerprint = hashlib.md5()
+        fingerprint.update(self.calculate_input_fingerprint().encode())
+        fingerprint.update(code_hash.hexdigest().encode())
+        fingerprint.update(json.dumps(parameters, sort_keys=True, default=str).encode())
+        return fingerprint.hexdigest()
+    
+    def restore_cached_module(self, module_name: str, fingerprint: str) -> Tuple[bool, Any]:
+        """Restore artifacts and assertions of an unchanged module"""
+        entry = self.cache_index['modules'].get(module_name)
+        if self.force or entry is None or entry.get('fingerprint') != fingerprint:
+            return False, None
+        
+        module_cache_dir = os.path.join(self.CACHE_DIR, module_name)
+        artifacts = self.MODULE_ARTIFACTS[module_name]
+        if not all(os.path.exists(os.path.join(module_cache_dir, name)) for name in artifacts):
+            return False, None
+        
+        for name in artifacts:
+            shutil.copy2(os.path.join(module_cache_dir, name), name)
+        
+        for assertion_module, record in entry['assertions']:
+            self.assertions.setdefault(assertion_module, []).append(record)
+            status = "✅ PASS" if record['result'] else "❌ FAIL"
+            print(f"  {status} (cached): {record['test']} - {record['message']}")
+        
+        return True, entry['result']
+    
+    def store_cached_module(self, module_name: str, fingerprint: str, result: Any, assertions: List):
+        """Store artifacts and assertions of a freshly executed module"""
+        module_cache_dir = os.path.join(self.CACHE_DIR, module_name)
+        os.makedirs(module_cache_dir, exist_ok=True)
+        for name in self.MODULE_ARTIFACTS[module_name]:
+            shutil.copy2(name, os.path.join(module_cache_dir, name))
+        
+        self.cache_index['modules'][module_name] = {
+            'fingerprint': fingerprint,
+            'result': result,
+            'assertions': assertions,
+            'cached_at': datetime.now().isoformat()
+        }
+        self.save_cache_index()
+    
+    def run_cached_module(self, module_name: str, func):
+        """Run a module, skipping it when its fingerprint matches the last run"""
+        fingerprint = self.calculate_module_fingerprint(module_name, func)
+        self.module_fingerprints[module_name] = fingerprint
+        
+        start = time.time()
+        hit, result = self.restore_cached_module(module_name, fingerprint)
+        if hit:
+            self.module_times[module_name] = time.time() - start
+            if self.profile:
+                self.module_profiles[module_name] = {
+                    'wall_ns': int(self.module_times[module_name] * 1e9),
+                    'cached': True,
+                    'tracemalloc_peak_bytes': 0,
+                    'tracemalloc_net_bytes': 0,
+                    'method_calls': {}
+                }
+            self.cached_modules.append(module_name)
+            print(f"Module {module_name} unchanged - reused cached results")
+            return result
+        
+        assertion_counts = {module: len(records) for module, records in self.assertions.items()}
+        result = self.time_module_execution(module_name, func)
+        
+        new_assertions = []
+        for assertion_module, records in self.assertions.items():
+            for record in records[assertion_counts.get(assertion_module, 0):]:
+                new_assertions.append([assertion_module, record])
+        
+        self.store_cached_module(module_name, fingerprint, result, new_assertions)
+        return result
+    
     # ==================== CORE CALCULATION METHODS ====================
     
     def calculate_owner_earnings_scenarios(self) -> Dict[str, Dict[str, float]]:
@@ -267,6 +650,8 @@ class ProductionAssuranceEngine:
                 "baseline_dir": self.baseline_dir
             },
             "random_seed": 42,
+            "input_fingerprint": self.calculate_input_fingerprint(),
+            "force_rerun": self.force,
             "test_parameters": {
                 "performance_budget_seconds": 90,
                 "epv_tolerance_pct": 3.0,
@@ -599,12 +984,44 @@ class ProductionAssuranceEngine:
         with open('term_heatmap.png', 'w') as f:
             f.write("Term Sensitivity Heatmap\n")
             f.write("Shows viable parameter combinations\n")
+            f.write("Boundary curves (max viable leverage) in term_boundaries.csv\n")
+        
+        # Adaptive boundary refinement: exact max leverage per rate/tenor/IO on a finer rate axis
+        boundaries = refine_term_map(
+            self.calculate_dual_dscr, self.ttm_adj_ebitda,
+            {name: [(scenarios[name]['adj_ebitda'], 1.70 if name == 'base' else 1.50)] for name in ['base', 'low']},
+            np.arange(0.08, 0.1201, 0.0025), tenors, io_periods, leverage_range, tolerance=0.001
+        )
+        
+        with open('term_boundaries.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Scenario', 'Rate', 'Tenor', 'IO Months', 'Max Leverage', 'Capped'])
+            for row in boundaries['records']:
+                max_leverage = '' if row['max_leverage'] is None else f"{row['max_leverage']:.3f}"
+                writer.writerow([row['scenario'], f"{row['rate']:.4f}", row['tenor'], row['io_months'],
+                                 max_leverage, row['capped']])
+        
+        # Boundary leverage should be weakly decreasing in rate for every scenario/tenor/IO
+        curves = {}
+        for row in boundaries['records']:
+            curves.setdefault((row['scenario'], row['tenor'], row['io_months']), []).append(
+                -np.inf if row['max_leverage'] is None else row['max_leverage'])
+        boundary_monotonic = all(curve[i] >= curve[i+1] - boundaries['tolerance']
+                                 for curve in curves.values() for i in range(len(curve)-1))
+        self.log_assertion("term_sensitivity", "boundary_rate_monotonic", boundary_monotonic,
+                         f"Max leverage non-increasing in rate ({boundaries['evaluations']:,} evaluations vs "
+                         f"{boundaries['uniform_evaluations']:,} uniform)",
+                         "Non-increasing", "Non-increasing" if boundary_monotonic else "Non-monotonic")
+        all_pass = all_pass and boundary_monotonic
         
         # Overall monotonicity assertion
         self.log_assertion("term_sensitivity", "overall_monotonicity", all_pass,
                          f"All term sensitivity monotonic", "All monotonic", "All monotonic" if all_pass else "Some non-monotonic")
         
         term_assertions['monotonicity_pass'] = all_pass
+        term_assertions['boundary_rate_monotonic'] = boundary_monotonic
+        term_assertions['boundary_evaluations'] = boundaries['evaluations']
+        term_assertions['boundary_uniform_evaluations'] = boundaries['uniform_evaluations']
         
         with open('term_assertions.json', 'w') as f:
             safe_json_dump(term_assertions, f, indent=2)
@@ -990,68 +1407,70 @@ class ProductionAssuranceEngine:
         all_pass = True
         shock_results = {}
         
-        # Shock 1: Revenue -10%, COGS +200bps
-        print("  Testing downside shock...")
-        shocked_revenue = self.ttm_revenue * 0.9
-        shocked_ebitda = self.ttm_adj_ebitda * 0.85  # Approximate impact
-        
-        # Test DSCR under shock
+        # Shocks 1-3 from the declarative stress library, evaluated in one pass
+        # (2.0x senior @ 10%, 7-year amortizing; no instance state is modified).
+        # Annual-annuity debt service keeps shocked DSCR on calculate_dual_dscr's basis (modules 3-6)
         leverage = 2.0
         debt_amount = leverage * self.ttm_adj_ebitda
-        shocked_dscr = self.calculate_dual_dscr(shocked_ebitda, debt_amount, 0.10, 7, 0)
+        shock_case = StressCases.from_records([{
+            'name': 'sapphirederm',
+            'revenue': self.ttm_revenue,
+            'ebitda': self.ttm_adj_ebitda,
+            'da': self.ttm_da,
+            'maintenance_capex': self.maintenance_capex,
+            'tax_rate': self.tax_rate,
+            'debt': debt_amount,
+            'rate': 0.10,
+            'tenor': 7,
+            'io_months': 0,
+            'multiple': 8.0,
+            'net_debt': self.net_debt
+        }])
+        capex_scenarios = [0.8, 1.0, 1.2]  # As multiples of D&A
+        battery = run_stress_battery(shock_case, scenario_set(
+            ['downside_shock', 'operational_shock'] + [f'capex_{m}x_da' for m in capex_scenarios]),
+            debt_service_convention='annual_annuity')
         
-        shock_stable = np.isfinite(shocked_dscr['dscr_post'])
+        # Shock 1: Revenue -10%, COGS +200bps
+        print("  Testing downside shock...")
+        downside = battery.scenario('downside_shock')
+        shock_stable = np.isfinite(downside['dscr_post'])
         self.log_assertion("shock_tests", "downside_shock_stable", shock_stable,
-                         f"Downside shock produces stable DSCR", "Finite", f"{shocked_dscr['dscr_post']:.2f}")
+                         f"Downside shock produces stable DSCR", "Finite", f"{downside['dscr_post']:.2f}")
         
         if not shock_stable:
             all_pass = False
         
         shock_results['downside_shock'] = {
-            'shocked_revenue': shocked_revenue,
-            'shocked_ebitda': shocked_ebitda,
-            'shocked_dscr': shocked_dscr['dscr_post'],
+            'shocked_revenue': downside['revenue'],
+            'shocked_ebitda': downside['ebitda'],
+            'shocked_dscr': downside['dscr_post'],
             'stable': shock_stable
         }
         
         # Shock 2: Operational loss (1 FTE injector out for 4 months)
         print("  Testing operational shock...")
-        injector_revenue_impact = 0.08  # 8% revenue impact
-        ops_shocked_revenue = self.ttm_revenue * (1 - injector_revenue_impact)
-        ops_shocked_ebitda = self.ttm_adj_ebitda * (1 - injector_revenue_impact * 1.5)  # Operating leverage
-        
-        ops_shocked_dscr = self.calculate_dual_dscr(ops_shocked_ebitda, debt_amount, 0.10, 7, 0)
-        ops_stable = np.isfinite(ops_shocked_dscr['dscr_post'])
+        operational = battery.scenario('operational_shock')
+        ops_stable = np.isfinite(operational['dscr_post'])
         
         self.log_assertion("shock_tests", "ops_shock_stable", ops_stable,
-                         f"Operational shock produces stable DSCR", "Finite", f"{ops_shocked_dscr['dscr_post']:.2f}")
+                         f"Operational shock produces stable DSCR", "Finite", f"{operational['dscr_post']:.2f}")
         
         if not ops_stable:
             all_pass = False
         
         shock_results['operational_shock'] = {
-            'revenue_impact_pct': injector_revenue_impact * 100,
-            'shocked_dscr': ops_shocked_dscr['dscr_post'],
+            'revenue_impact_pct': (1 - operational['revenue'] / self.ttm_revenue) * 100,
+            'shocked_dscr': operational['dscr_post'],
             'stable': ops_stable
         }
         
         # Shock 3: CapEx stress test
         print("  Testing CapEx variations...")
-        capex_scenarios = [0.8, 1.0, 1.2]  # As multiples of D&A
-        
         for capex_mult in capex_scenarios:
-            test_capex = self.ttm_da * capex_mult
-            
-            # Temporarily adjust maintenance capex
-            original_capex = self.maintenance_capex
-            self.maintenance_capex = test_capex
-            
-            capex_dscr = self.calculate_dual_dscr(self.ttm_adj_ebitda, debt_amount, 0.10, 7, 0)
+            capex_dscr = battery.scenario(f'capex_{capex_mult}x_da')
             capex_stable = np.isfinite(capex_dscr['dscr_post'])
             
-            # Restore original
-            self.maintenance_capex = original_capex
-            
             self.log_assertion("shock_tests", f"capex_{capex_mult}x_stable", capex_stable,
                              f"CapEx {capex_mult}x D&A stable", "Finite", f"{capex_dscr['dscr_post']:.2f}")
             
@@ -1147,7 +1566,10 @@ class ProductionAssuranceEngine:
             'within_tolerance': within_tolerance,
             'module_times': self.module_times,
             'total_module_time': total_module_time,
-            'overhead_time': elapsed_time - total_module_time
+            'overhead_time': elapsed_time - total_module_time,
+            'cached_modules': self.cached_modules,
+            'module_fingerprints': self.module_fingerprints,
+            'profiling_enabled': self.profile
         }
         
         with open('perf_report.json', 'w') as f:
@@ -1198,6 +1620,7 @@ class ProductionAssuranceEngine:
             'failed_assertions': total_assertions - passed_assertions,
             'module_results': module_results,
             'blocking_modules': blocking_modules,
+            'cached_modules': self.cached_modules,
             'execution_time_seconds': time.time() - self.start_time,
             'test_timestamp': datetime.now().isoformat()
         }
@@ -1248,6 +1671,7 @@ class ProductionAssuranceEngine:
             'dscr_assertions.json',
             'term_sensitivity.csv',
             'term_heatmap.png',
+            'term_boundaries.csv',
             'term_assertions.json',
             'price_to_pass.md',
             'price_to_pass.json',
@@ -1260,6 +1684,8 @@ class ProductionAssuranceEngine:
             'assurance_report.md',
             'assurance_summary.json'
         ]
+        if self.profile:
+            generated_files.append('perf_profile.json')
         
         manifest = {
             'manifest': {
@@ -1296,16 +1722,19 @@ class ProductionAssuranceEngine:
             results = []
             
             results.append(self.time_module_execution("0_Meta", self.module_0_meta_info))
-            results.append(self.time_module_execution("1_Determinism", self.module_1_determinism_test))
-            results.append(self.time_module_execution("2_EPV_Correctness", self.module_2_epv_correctness))
-            results.append(self.time_module_execution("3_DSCR_Engine", self.module_3_dscr_engine))
-            results.append(self.time_module_execution("4_Term_Sensitivity", self.module_4_term_sensitivity))
-            results.append(self.time_module_execution("5_Price_to_Pass", self.module_5_price_to_pass_solver))
-            results.append(self.time_module_execution("6_Structure_Pack", self.module_6_structure_pack))
-            results.append(self.time_module_execution("7_Discipline", self.module_7_discipline_overlay))
-            results.append(self.time_module_execution("8_Shock_Tests", self.module_8_shock_edge_tests))
+            results.append(self.run_cached_module("1_Determinism", self.module_1_determinism_test))
+            results.append(self.run_cached_module("2_EPV_Correctness", self.module_2_epv_correctness))
+            results.append(self.run_cached_module("3_DSCR_Engine", self.module_3_dscr_engine))
+            results.append(self.run_cached_module("4_Term_Sensitivity", self.module_4_term_sensitivity))
+            results.append(self.run_cached_module("5_Price_to_Pass", self.module_5_price_to_pass_solver))
+            results.append(self.run_cached_module("6_Structure_Pack", self.module_6_structure_pack))
+            results.append(self.run_cached_module("7_Discipline", self.module_7_discipline_overlay))
+            results.append(self.run_cached_module("8_Shock_Tests", self.module_8_shock_edge_tests))
             results.append(self.time_module_execution("9_Performance", self.module_9_performance))
             
+            if self.profile:
+                self.write_perf_profile()
+            
             # Final assessment
             final_result = self.module_10_final_rollup()
             
@@ -1330,16 +1759,43 @@ class ProductionAssuranceEngine:
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Production-ready assurance test suite")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-run every module even if its fingerprint is unchanged")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record perf_counter_ns timings, call counts and tracemalloc peaks to perf_profile.json")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="Also write cProfile dumps and folded flamegraph stacks to profiles/ (implies --profile)")
+    parser.add_argument('--profile-baseline', metavar='PATH',
+                        help="Diff this run's perf_profile.json against a previous one into perf_profile_diff.json")
+    args = parser.parse_args()
+    
     try:
         # Initialize assurance engine
         baseline_dir = "../sapphirederm"
         case_data_path = "../sapphirederm/sapphirederm_case_data.json"
         
-        engine = ProductionAssuranceEngine(baseline_dir, case_data_path)
+        # Profiled runs always execute every module so timings are comparable
+        profile = args.profile or args.cprofile or bool(args.profile_baseline)
+        engine = ProductionAssuranceEngine(baseline_dir, case_data_path, force=args.force or profile,
+                                           profile=profile, cprofile=args.cprofile)
+        
+        # Load the baseline profile before this run overwrites perf_profile.json
+        baseline_profile = None
+        if args.profile_baseline:
+            with open(args.profile_baseline, 'r') as f:
+                baseline_profile = json.load(f)
         
         # Run full test suite
         production_ready = engine.run_full_assurance_suite()
         
+        if baseline_profile is not None:
+            with open('perf_profile.json', 'r') as f:
+                current_profile = json.load(f)
+            with open('perf_profile_diff.json', 'w') as f:
+                safe_json_dump(diff_perf_profiles(baseline_profile, current_profile), f, indent=2, sort_keys=True)
+            print("Profile diff written to perf_profile_diff.json")
+        
         # Return appropriate exit code
         return 0 if production_ready else 1
         
@@ -6,10 +6,15 @@ Single-Site MedSpa Valuation with EPV, Multiples, and LBO Modeling
 
 import json
 import math
+import os
+import sys
 import numpy as np
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from capital_structure_optimizer import LBOCase, StructureConstraints, optimize_capital_structure
+
 class SapphireDermEPVAnalysis:
     """Comprehensive EPV analysis for SapphireDerm & Laser case"""
     
@@ -262,6 +267,25 @@ class SapphireDermEPVAnalysis:
         
         return lbo_results
     
+    def optimize_capital_structure(self, entry_multiple: float = 8.0, objective: str = 'irr') -> Dict[str, Any]:
+        """Search leverage, debt terms and cash sweep instead of the fixed 4.0-4.5x grid"""
+        base = self.calculate_owner_earnings('base')
+        low = self.calculate_owner_earnings('low')
+        growth = 1.05 ** np.arange(5)  # 5% annual growth, as in calculate_lbo_analysis
+        case = LBOCase(
+            name=self.case_data['case_name'],
+            entry_ebitda=self.ttm_adj_ebitda,
+            entry_multiple=entry_multiple,
+            ebitda=base['adjusted_ebitda'] * growth,
+            da=self.ttm_da,
+            maintenance_capex=base['maintenance_capex'] * growth,
+            tax_rate=self.tax_rate,
+            exit_multiple=9.0,
+            downside_ebitda_factor=low['adjusted_ebitda'] / base['adjusted_ebitda']
+        )
+        constraints = StructureConstraints(base_min_dscr=1.7, downside_min_dscr=1.5, max_leverage=4.5)
+        return optimize_capital_structure([case], objective, constraints=constraints)[0].to_dict()
+    
     def run_full_analysis(self) -> Dict[str, Any]:
         """Run complete EPV analysis"""
         print("🔧 Running SapphireDerm & Laser EPV Analysis...")
@@ -282,6 +306,9 @@ class SapphireDermEPVAnalysis:
         print("💰 Running LBO analysis (4.0x - 4.5x debt, DSCR >= 1.7x)...")
         lbo_results = self.calculate_lbo_analysis()
         
+        print("🏗️  Optimizing capital structure (leverage, terms, cash sweep)...")
+        lbo_optimization = self.optimize_capital_structure()
+        
         # Compile results
         self.results = {
             'case_name': self.case_data['case_name'],
@@ -290,6 +317,7 @@ class SapphireDermEPVAnalysis:
             'epv_valuation': epv_results,
             'multiples_analysis': multiples_grid,
             'lbo_analysis': lbo_results,
+            'lbo_optimization': lbo_optimization,
             'summary_metrics': {
                 'ttm_revenue': self.ttm_revenue,
                 'ttm_adj_ebitda': self.ttm_adj_ebitda,
@@ -367,6 +395,12 @@ class SapphireDermEPVAnalysis:
             else:
                 summary += f"| {lbo_data['debt_multiple']:.2f}x | {lbo_data['dscr']:.1f}x | - | - | - | - | ❌ |\n"
         
+        opt = results['lbo_optimization']
+        if opt['feasible']:
+            summary += f"""
+**Optimized Structure (8.0x entry, max IRR):** {opt['leverage']:.2f}x debt @ {opt['rate']:.2%}, {opt['tenor']:.0f}-year tenor, {opt['io_months']:.0f} months IO, {opt['sweep']:.0%} cash sweep — IRR {opt['irr']:.1%}, MoIC {opt['moic']:.2f}x, min DSCR {opt['min_dscr_base']:.2f}x base / {opt['min_dscr_downside']:.2f}x downside (binding: {opt['binding_constraint']})
+"""
+        
         summary += f"""
 ## Key Investment Metrics
 
@@ -11,8 +11,14 @@ import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
 import os
+import sys
 import math
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from debt_schedule_engine import dscr_surface
+from structure_frontier_search import StructureFeasibilityModel, search_structure_frontier
+from viability_boundary_refinement import refine_term_map
+
 class SapphireDermRefinementV2:
     def __init__(self, case_data_path: str, baseline_path: str):
         """Initialize with case data and baseline metrics"""
@@ -195,7 +201,7 @@ class SapphireDermRefinementV2:
         }
     
     def run_dscr_leverage_sweep(self) -> Dict[str, Any]:
-        """Run DSCR analysis across leverage levels"""
+        """Run DSCR analysis across leverage levels (amortizing schedule, years 1-3)"""
         scenarios = self.calculate_owner_earnings_scenarios()
         leverage_range = np.arange(1.5, 4.75, 0.25)
         
@@ -203,43 +209,41 @@ class SapphireDermRefinementV2:
         rate = 0.10
         tenor = 7
         io_months = 0
+        n_years = 3
         
         results = {}
         
         for scenario in ['base', 'low']:
             ebitda = scenarios[scenario]['adj_ebitda']
-            scenario_results = []
             
-            for leverage in leverage_range:
-                debt_amount = leverage * self.ttm_adj_ebitda
-                
-                # Calculate 3-year DSCR projections (simplified - assume flat)
-                year_dscrs = []
-                for year in range(1, 4):
-                    dscr_calcs = self.calculate_dual_dscr(ebitda, debt_amount, rate, tenor, io_months)
-                    year_dscrs.append({
-                        'year': year,
-                        'dscr_pre': dscr_calcs['dscr_pre'],
-                        'dscr_post': dscr_calcs['dscr_post']
-                    })
-                
-                # Minimum DSCR
-                min_dscr_pre = min([y['dscr_pre'] for y in year_dscrs])
-                min_dscr_post = min([y['dscr_post'] for y in year_dscrs])
-                
-                # Viability checks
-                base_viable = min_dscr_post >= 1.70
-                low_viable = min_dscr_post >= 1.50
+            # One vectorized pass: monthly schedules for every leverage point, aggregated per year
+            surface = dscr_surface(ebitda, leverage_range, rate, tenor, io_months, self.ttm_da,
+                                   self.maintenance_capex, self.tax_rate,
+                                   debt_basis_ebitda=self.ttm_adj_ebitda, n_years=n_years)
+            dscr_pre = surface['dscr_pre'][:, 0, 0, 0, :]
+            dscr_post = surface['dscr_post'][:, 0, 0, 0, :]
+            debt_service = surface['debt_service'][:, 0, 0, 0, :]
+            min_dscr_pre = surface['min_dscr_pre'][:, 0, 0, 0]
+            min_dscr_post = surface['min_dscr_post'][:, 0, 0, 0]
+            
+            scenario_results = []
+            for i, leverage in enumerate(leverage_range):
+                year_dscrs = [{
+                    'year': year,
+                    'debt_service': float(debt_service[i, year - 1]),
+                    'dscr_pre': float(dscr_pre[i, year - 1]),
+                    'dscr_post': float(dscr_post[i, year - 1])
+                } for year in range(1, n_years + 1)]
                 
                 scenario_results.append({
                     'leverage': leverage,
-                    'debt_amount': debt_amount,
-                    'debt_service': year_dscrs[0]['dscr_pre'] and dscr_calcs['debt_service'],
+                    'debt_amount': float(surface['debt_amount'][i, 0, 0, 0]),
+                    'debt_service': float(debt_service[i, 0]),
                     'year_dscrs': year_dscrs,
-                    'min_dscr_pre': min_dscr_pre,
-                    'min_dscr_post': min_dscr_post,
-                    'base_viable': base_viable,
-                    'low_viable': low_viable
+                    'min_dscr_pre': float(min_dscr_pre[i]),
+                    'min_dscr_post': float(min_dscr_post[i]),
+                    'base_viable': bool(min_dscr_post[i] >= 1.70),
+                    'low_viable': bool(min_dscr_post[i] >= 1.50)
                 })
             
             results[scenario] = scenario_results
@@ -291,6 +295,19 @@ class SapphireDermRefinementV2:
         
         return results
     
+    def refine_term_boundaries(self, tolerance: float = 0.001) -> Dict[str, Any]:
+        """Max viable leverage per rate/tenor/IO, refined adaptively around viability flips"""
+        scenarios = self.calculate_owner_earnings_scenarios()
+        
+        # Same convention as the term map: overall viable = base (1.70x) and low (1.50x) thresholds
+        return refine_term_map(
+            self.calculate_dual_dscr, self.ttm_adj_ebitda,
+            {scenario: [(scenarios[scenario]['adj_ebitda'], 1.70), (scenarios[scenario]['adj_ebitda'], 1.50)]
+             for scenario in ['base', 'low']},
+            rates=np.arange(0.08, 0.1201, 0.0025), tenors=[7, 8, 9, 10], io_months=[0, 12, 24],
+            coarse_levels=np.arange(1.5, 3.25, 0.25), tolerance=tolerance
+        )
+    
     def solve_price_to_pass(self) -> Dict[str, Any]:
         """Solve for maximum viable EV multiple"""
         scenarios = self.calculate_owner_earnings_scenarios()
@@ -381,6 +398,21 @@ class SapphireDermRefinementV2:
             'binding_constraint': binding_constraint
         }
     
+    def search_feasible_frontier(self, irr_hurdle: float = 0.20) -> Dict[str, Any]:
+        """Max leverage per EV multiple for every senior term set (boundary walk, not full grid)"""
+        model = StructureFeasibilityModel(
+            ttm_adj_ebitda=self.ttm_adj_ebitda, da=self.ttm_da, maintenance_capex=self.maintenance_capex,
+            tax_rate=self.tax_rate, irr_hurdle=irr_hurdle
+        )
+        return search_structure_frontier(
+            model,
+            multiples=np.arange(5.0, 12.001, 0.05),
+            leverages=np.arange(0.5, 5.001, 0.025),
+            rates=np.arange(0.08, 0.1201, 0.005),
+            tenors=[5, 6, 7, 8, 9, 10],
+            io_months=[0, 12, 24]
+        )
+        
     def test_feasible_structures(self, target_multiples: List[float]) -> Dict[str, Any]:
         """Test feasible deal structures at specified multiples"""
         scenarios = self.calculate_owner_earnings_scenarios()
@@ -734,6 +766,19 @@ class SapphireDermRefinementV2:
         with open('term_sensitivity_heatmap.png', 'w') as f:
             f.write("Term Sensitivity Heatmap Placeholder\n")
             f.write("Shows viable parameter combinations with passing region shaded\n")
+            f.write("Boundary curves (max viable leverage) in term_viability_boundaries.csv\n")
+        
+        # Refined viability boundaries
+        term_boundaries = self.refine_term_boundaries()
+        with open('term_viability_boundaries.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Scenario', 'Rate', 'Tenor', 'IO Months', 'Max Leverage', 'Capped'])
+            for row in term_boundaries['records']:
+                max_leverage = '' if row['max_leverage'] is None else f"{row['max_leverage']:.3f}"
+                writer.writerow([row['scenario'], f"{row['rate']:.4f}", row['tenor'], row['io_months'],
+                                 max_leverage, row['capped']])
+        print(f"   Boundaries refined to {term_boundaries['tolerance']}x with {term_boundaries['evaluations']:,} "
+              f"evaluations ({term_boundaries['uniform_evaluations']:,} on a uniform grid)")
         
         # 5. Price-to-pass solver
         print("5. Solving price-to-pass multiple...")
@@ -775,6 +820,17 @@ class SapphireDermRefinementV2:
                     f.write(f"- **Min DSCR:** {struct_data['dscr_metrics']['min_dscr']:.2f}x\n")
                     f.write(f"- **Viability:** {'✅ PASS' if struct_data['viability']['overall_pass'] else '❌ FAIL'}\n")
                     f.write(f"- **Est. IRR:** {struct_data['returns']['estimated_irr']*100:.1f}%\n\n")
+            
+            frontier = self.search_feasible_frontier()
+            f.write("## Feasibility Frontier (Senior Debt, 20% IRR Hurdle)\n\n")
+            f.write(f"Evaluated {frontier['evaluations']:,} of {frontier['grid_cells']:,} structures "
+                    f"along the price × leverage boundary.\n\n")
+            f.write("| EV Multiple | Leverage | Rate | Tenor | IO | Min DSCR Base | Min DSCR Low | IRR |\n")
+            f.write("|---|---|---|---|---|---|---|---|\n")
+            for s in frontier['pareto_set']:
+                f.write(f"| {s['ev_multiple']:.2f}x | {s['leverage']:.2f}x | {s['rate']*100:.1f}% | "
+                        f"{s['tenor']:.0f}y | {s['io_months']:.0f}m | {s['min_dscr_base']:.2f}x | "
+                        f"{s['min_dscr_low']:.2f}x | {s['irr']*100:.1f}% |\n")
         
         # 7. Operational uplift thresholds
         print("7. Calculating operational uplift thresholds...")
@@ -906,6 +962,7 @@ class SapphireDermRefinementV2:
             "lbo_dscr_curve_v2.png",
             "term_sensitivity.csv",
             "term_sensitivity_heatmap.png",
+            "term_viability_boundaries.csv",
             "price_to_pass.md",
             "feasible_deal_pack_v2.md",
             "ops_uplift_thresholds_v2.md",
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmark Suite
+Times representative valuation workloads and gates them against versioned baselines
+
+Workloads: unified EPV (scalar and batch), vectorized DCF, CPP Monte Carlo, independent quantitative
+analysis, term-sensitivity sweeps, LBO schedules, visual generation and workbook export.
+Runs fully offline; every workload writes into a temporary directory.
+
+Usage:
+    python performance_benchmark_suite.py                     # compare against baseline
+    python performance_benchmark_suite.py --update-baseline   # record a new baseline
+    python performance_benchmark_suite.py --threshold 0.40 --workload epv_batch
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import warnings
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+warnings.filterwarnings('ignore')
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SAPPHIREDERM_DIR = os.path.join(REPO_DIR, "out", "sapphirederm")
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, SAPPHIREDERM_DIR)
+
+BENCHMARK_SCHEMA_VERSION = 1
+DEFAULT_BASELINE_PATH = os.path.join(REPO_DIR, "benchmark_baselines.json")
+DEFAULT_THRESHOLD = 0.25  # Fail when median time regresses by more than 25%
+
+@dataclass
+class BenchmarkWorkload:
+    """A named workload: setup() builds state once, run(state) is timed"""
+    name: str
+    description: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+    repeat: int = 5
+
+# =============================================================================
+# WORKLOAD DEFINITIONS
+# =============================================================================
+
+def _setup_cpp_case():
+    from cpp_medispa_simulation_2025 import create_cpp_medispa_case, calculate_epv_inputs_from_case
+    case = create_cpp_medispa_case()
+    return case, calculate_epv_inputs_from_case(case)
+
+def _setup_epv_batch(batch_size: int = 10000):
+    _, base_inputs = _setup_cpp_case()
+    rng = random.Random(42)
+    inputs_list = []
+    for _ in range(batch_size):
+        revenue_factor = rng.uniform(0.97, 1.03)
+        service_lines = [
+            replace(sl, price=sl.price * revenue_factor, cogs_pct=sl.cogs_pct * rng.uniform(0.95, 1.05))
+            for sl in base_inputs.service_lines
+        ]
+        inputs_list.append(replace(
+            base_inputs,
+            service_lines=service_lines,
+            marketing_pct=base_inputs.marketing_pct * rng.uniform(0.98, 1.02),
+            beta=base_inputs.beta * rng.uniform(0.95, 1.05),
+        ))
+    return inputs_list
+
+def _run_epv_scalar(state):
+    from unified_epv_system import compute_unified_epv
+    _, inputs = state
+    for _ in range(1000):
+        compute_unified_epv(inputs)
+
+def _run_epv_batch(inputs_list):
+    from unified_epv_system import compute_unified_epv_batch
+    return compute_unified_epv_batch(inputs_list)
+
+def _setup_dcf_paths(n_paths: int = 10000, n_years: int = 10):
+    rng = np.random.default_rng(42)
+    return {
+        "growth": rng.normal(0.04, 0.03, (n_paths, n_years)),
+        "margin": np.clip(rng.normal(0.22, 0.03, (n_paths, n_years)), 0.05, 0.40),
+        "wacc": rng.uniform(0.10, 0.16, n_paths),
+        "terminal_growth": rng.uniform(0.01, 0.03, n_paths),
+    }
+
+def _run_dcf_paths(paths):
+    from vectorized_dcf_engine import vectorized_dcf
+    return vectorized_dcf(3_726_000, paths["growth"], paths["margin"], paths["wacc"], paths["terminal_growth"],
+                          tax_rate=0.26, da_pct_ebitda=0.08, capex_pct_revenue=0.03, wc_pct_revenue_change=0.01)
+
+def _setup_multi_year_paths():
+    from multi_year_monte_carlo import MultiYearSimulationConfig
+    return MultiYearSimulationConfig(base_revenue=8500, initial_debt=2300, n_paths=200000, n_years=10,
+                                     growth_phi=0.5, margin_phi=0.7, multiple_phi=0.8)
+
+def _run_multi_year_paths(config):
+    from multi_year_monte_carlo import run_multi_year_simulation
+    return run_multi_year_simulation(config)
+
+def _run_cpp_monte_carlo(state):
+    from cpp_medispa_simulation_2025 import run_monte_carlo_analysis
+    case, inputs = state
+    return run_monte_carlo_analysis(case, inputs)
+
+def _setup_quantitative_analysis():
+    from independent_quantitative_analysis import create_medispa_financial_data
+    return create_medispa_financial_data()
+
+def _run_quantitative_analysis(financial_data):
+    from independent_quantitative_analysis import IndependentQuantitativeAnalyzer
+    np.random.seed(42)
+    return IndependentQuantitativeAnalyzer(financial_data).run_comprehensive_analysis()
+
+def _setup_sapphirederm_v2():
+    from sapphirederm_refinement_v2_engine import SapphireDermRefinementV2
+    return SapphireDermRefinementV2(
+        os.path.join(SAPPHIREDERM_DIR, "sapphirederm_case_data.json"),
+        os.path.join(SAPPHIREDERM_DIR, "_baseline_prior_metrics.json"),
+    )
+
+def _run_term_sensitivity(engine):
+    engine.run_dscr_leverage_sweep()
+    return engine.run_term_sensitivity_analysis()
+
+def _setup_lbo():
+    from sapphirederm_epv_analysis import SapphireDermEPVAnalysis
+    return SapphireDermEPVAnalysis(os.path.join(SAPPHIREDERM_DIR, "sapphirederm_case_data.json"))
+
+def _run_lbo(analysis):
+    for _ in range(200):
+        analysis.calculate_lbo_analysis()
+
+def _setup_visuals():
+    from generate_cpp_visuals import CPPVisualGenerator
+    return CPPVisualGenerator(
+        os.path.join(REPO_DIR, "harborglow_aesthetic_simulation_results.json"),
+        "HarborGlow Aesthetics (Nashville) — Benchmark",
+    )
+
+def _run_visuals(generator):
+    import matplotlib.pyplot as plt
+    generator.create_ebitda_bridge()
+    generator.create_valuation_matrix()
+    generator.create_epv_panel()
+    generator.create_lbo_summary()
+    plt.close('all')
+
+def _run_workbook_export(_state):
+    from generate_medispa_adjustments_workbook import MedspaAnalysisWorkbook
+    return MedspaAnalysisWorkbook().generate_workbook("benchmark_workbook.xlsx")
+
+WORKLOADS: List[BenchmarkWorkload] = [
+    BenchmarkWorkload("epv_scalar", "compute_unified_epv x1000 on the CPP case", _setup_cpp_case, _run_epv_scalar),
+    BenchmarkWorkload("epv_batch", "compute_unified_epv_batch on 10,000 perturbed CPP cases", _setup_epv_batch, _run_epv_batch),
+    BenchmarkWorkload("dcf_paths", "vectorized_dcf over 10,000 scenarios × 10 years", _setup_dcf_paths, _run_dcf_paths),
+    BenchmarkWorkload("multi_year_paths", "Path-dependent multi-year MC, 200,000 paths × 10 years (AR(1))",
+                      _setup_multi_year_paths, _run_multi_year_paths, repeat=3),
+    BenchmarkWorkload("cpp_monte_carlo", "CPP run_monte_carlo_analysis (1,000 iterations)", _setup_cpp_case, _run_cpp_monte_carlo, repeat=3),
+    BenchmarkWorkload("quantitative_analysis", "IndependentQuantitativeAnalyzer.run_comprehensive_analysis",
+                      _setup_quantitative_analysis, _run_quantitative_analysis, repeat=3),
+    BenchmarkWorkload("term_sensitivity", "SapphireDerm v2 DSCR leverage sweep + term sensitivity grid",
+                      _setup_sapphirederm_v2, _run_term_sensitivity),
+    BenchmarkWorkload("lbo_schedules", "SapphireDerm calculate_lbo_analysis x200", _setup_lbo, _run_lbo),
+    BenchmarkWorkload("visual_generation", "CPP visual pack (4 charts, 300 dpi)", _setup_visuals, _run_visuals, repeat=3),
+    BenchmarkWorkload("workbook_export", "Medispa adjustments workbook export", lambda: None, _run_workbook_export, repeat=3),
+]
+
+# =============================================================================
+# HARNESS
+# =============================================================================
+
+def calibrate(iterations: int = 2_000_000) -> float:
+    """Time a fixed pure-Python loop; used to normalise baselines across machines"""
+    start = time.perf_counter()
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return time.perf_counter() - start
+
+def environment_info() -> Dict[str, str]:
+    """Describe the machine and interpreter the benchmark ran on"""
+    return {
+        "python_version": platform.python_version(),
+        "numpy_version": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": str(os.cpu_count()),
+    }
+
+def time_workload(workload: BenchmarkWorkload, repeat: Optional[int] = None) -> Dict[str, Any]:
+    """Run one warm-up plus `repeat` timed iterations inside a scratch directory"""
+    repeat = repeat or workload.repeat
+    original_cwd = os.getcwd()
+    scratch_dir = tempfile.mkdtemp(prefix=f"bench_{workload.name}_")
+    try:
+        os.chdir(scratch_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = workload.setup()
+            workload.run(state)  # Warm-up (imports, caches)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                workload.run(state)
+                timings.append(time.perf_counter() - start)
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {
+        "description": workload.description,
+        "repeat": repeat,
+        "median_seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "max_seconds": max(timings),
+    }
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """Load a baseline file, ignoring it when the schema version differs"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("schema_version") != BENCHMARK_SCHEMA_VERSION:
+        print(f"⚠️ Baseline schema {baseline.get('schema_version')} != {BENCHMARK_SCHEMA_VERSION}; ignoring {path}")
+        return None
+    return baseline
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+                        normalize: bool) -> Dict[str, Dict[str, Any]]:
+    """Flag workloads whose median time exceeds baseline * (1 + threshold)"""
+    scale = 1.0
+    if normalize and baseline.get("calibration_seconds"):
+        scale = results["calibration_seconds"] / baseline["calibration_seconds"]
+
+    comparisons = {}
+    for name, current in results["workloads"].items():
+        reference = baseline.get("workloads", {}).get(name)
+        if reference is None:
+            comparisons[name] = {"status": "NEW", "ratio": None}
+            continue
+        expected = reference["median_seconds"] * scale
+        ratio = current["median_seconds"] / expected if expected > 0 else float('inf')
+        comparisons[name] = {
+            "status": "REGRESSION" if ratio > 1 + threshold else "OK",
+            "ratio": ratio,
+            "baseline_median_seconds": reference["median_seconds"],
+            "current_median_seconds": current["median_seconds"],
+        }
+    return comparisons
+
+def run_benchmarks(selected: Optional[List[str]] = None, repeat: Optional[int] = None) -> Dict[str, Any]:
+    """Time the selected workloads (all by default)"""
+    workloads = [w for w in WORKLOADS if not selected or w.name in selected]
+    unknown = set(selected or []) - {w.name for w in WORKLOADS}
+    if unknown:
+        raise ValueError(f"Unknown workloads: {', '.join(sorted(unknown))}")
+
+    results = {
+        "schema_version": BENCHMARK_SCHEMA_VERSION,
+        "run_timestamp": datetime.now().isoformat(),
+        "environment": environment_info(),
+        "calibration_seconds": calibrate(),
+        "workloads": {},
+    }
+
+    for workload in workloads:
+        print(f"⏱️  {workload.name}: {workload.description}")
+        results["workloads"][workload.name] = time_workload(workload, repeat)
+        print(f"    median {results['workloads'][workload.name]['median_seconds'] * 1000:.1f} ms")
+
+    return results
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Valuation engine performance benchmarks")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument('--update-baseline', action='store_true', help="Write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed fractional slowdown vs baseline median (default 0.25)")
+    parser.add_argument('--normalize', action='store_true',
+                        help="Scale baseline times by the calibration-loop ratio (for different machines)")
+    parser.add_argument('--workload', action='append', help="Run only this workload (repeatable)")
+    parser.add_argument('--repeat', type=int, help="Override timed iterations per workload")
+    parser.add_argument('--output', help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    print("🏁 VALUATION ENGINE BENCHMARK SUITE")
+    print("=" * 60)
+
+    results = run_benchmarks(args.workload, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline) or {"schema_version": BENCHMARK_SCHEMA_VERSION, "workloads": {}}
+        baseline.update({k: v for k, v in results.items() if k != "workloads"})
+        baseline["workloads"].update(results["workloads"])
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\n⚠️ No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+
+    comparisons = compare_to_baseline(results, baseline, args.threshold, args.normalize)
+
+    print("\n" + "=" * 60)
+    print(f"{'Workload':<24}{'Baseline':>12}{'Current':>12}{'Ratio':>8}  Status")
+    for name, row in comparisons.items():
+        if row["ratio"] is None:
+            print(f"{name:<24}{'-':>12}{results['workloads'][name]['median_seconds'] * 1000:>10.1f}ms{'-':>8}  NEW")
+            continue
+        status = "❌ REGRESSION" if row["status"] == "REGRESSION" else "✅ OK"
+        print(f"{name:<24}{row['baseline_median_seconds'] * 1000:>10.1f}ms{row['current_median_seconds'] * 1000:>10.1f}ms"
+              f"{row['ratio']:>8.2f}  {status}")
+
+    regressions = [name for name, row in comparisons.items() if row["status"] == "REGRESSION"]
+    print("=" * 60)
+    if regressions:
+        print(f"❌ {len(regressions)} workload(s) regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"✅ All workloads within {args.threshold:.0%} of baseline")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
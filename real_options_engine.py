@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Real Options Engine
+Vectorized Black-Scholes and recombining lattices for expansion, abandonment and deferral
+
+Every pricer takes scalars or arrays for the value of the underlying project (S), the
+exercise cost or salvage value (K), horizon (T), risk-free rate (r), volatility (sigma)
+and value leakage (q, the yield lost while waiting) and broadcasts them to one batch,
+so pricing one option per Monte Carlo path costs about as much as pricing one option.
+
+    black_scholes   - closed-form European call/put (ndtr, no per-option Python calls)
+    lattice_price   - CRR binomial or Boyle-style trinomial tree with early exercise;
+                      backward induction steps over time once, each step vectorized
+                      across all options and nodes
+
+Real options on a project worth V (Trigeorgis conventions):
+    expansion   - scale up by a fraction x at cost I:    max(x·V - I, 0), American call
+    abandonment - walk away for salvage value A:         max(A - V, 0),   American put
+    deferral    - wait to invest I, losing q per year:   max(V - I, 0),   American call
+
+Usage:
+    python real_options_engine.py --paths 10000 --steps 200
+"""
+
+import time
+import argparse
+from typing import Dict, Union
+
+import numpy as np
+from scipy.special import ndtr
+
+ArrayLike = Union[float, np.ndarray]
+
+# =============================================================================
+# CLOSED FORM
+# =============================================================================
+
+def black_scholes(S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+                  q: ArrayLike = 0.0, kind: str = "call") -> np.ndarray:
+    """
+    European Black-Scholes-Merton value, broadcast over all inputs.
+    Zero horizon or zero volatility falls back to discounted intrinsic value.
+    """
+    S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)))
+    forward = S * np.exp(-q * T)
+    strike = K * np.exp(-r * T)
+    vol = sigma * np.sqrt(T)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(forward / strike) + 0.5 * vol ** 2) / vol
+    d2 = d1 - vol
+    if kind == "call":
+        value = forward * ndtr(d1) - strike * ndtr(d2)
+        intrinsic = np.maximum(forward - strike, 0.0)
+    elif kind == "put":
+        value = strike * ndtr(-d2) - forward * ndtr(-d1)
+        intrinsic = np.maximum(strike - forward, 0.0)
+    else:
+        raise ValueError(f"kind must be 'call' or 'put', got {kind!r}")
+
+    return np.maximum(np.where(vol > 0, value, intrinsic), 0.0)
+
+# =============================================================================
+# LATTICE
+# =============================================================================
+
+def _exercise_value(nodes: np.ndarray, K: np.ndarray, multiplier: np.ndarray, kind: str) -> np.ndarray:
+    """Immediate exercise payoff at lattice nodes"""
+    if kind == "call":
+        return np.maximum(multiplier * nodes - K, 0.0)
+    return np.maximum(K - multiplier * nodes, 0.0)
+
+def lattice_price(S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+                  q: ArrayLike = 0.0, kind: str = "call", multiplier: ArrayLike = 1.0,
+                  american: bool = True, n_steps: int = 200, method: str = "binomial",
+                  chunk_size: int = 256) -> np.ndarray:
+    """
+    Option value on a recombining lattice for a batch of options.
+
+    Inputs broadcast to one batch shape; the payoff is max(multiplier·S - K, 0) for calls
+    and max(K - multiplier·S, 0) for puts. Each option gets its own time step T / n_steps
+    (T must be positive). The batch is inducted chunk_size options at a time so the
+    working lattice stays cache-resident.
+    """
+    if kind not in ("call", "put"):
+        raise ValueError(f"kind must be 'call' or 'put', got {kind!r}")
+    if method not in ("binomial", "trinomial"):
+        raise ValueError(f"method must be 'binomial' or 'trinomial', got {method!r}")
+
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q, multiplier)))
+    shape = arrays[0].shape
+    S, K, T, r, sigma, q, multiplier = (a.reshape(-1, 1) for a in arrays)
+
+    dt = T / n_steps
+    discount = np.exp(-r * dt)
+    growth = np.exp((r - q) * dt)
+
+    if method == "binomial":
+        # CRR: node j at step i sits at S·u^(i - 2j). Steps with the same parity as n_steps
+        # share the terminal grid, the others the grid one step earlier.
+        log_step = sigma * np.sqrt(dt)
+        u, d = np.exp(log_step), np.exp(-log_step)
+        p_up = (growth - d) / (u - d)
+        probabilities = (p_up, 1 - p_up)
+        grids = [_exercise_value(S * np.exp(log_step * np.arange(n, -n - 1, -2)), K, multiplier, kind)
+                 for n in (n_steps, n_steps - 1)]
+        exercise_at = lambda i, columns: grids[(n_steps - i) % 2][(n_steps - i) // 2:(n_steps - i) // 2 + i + 1, columns]
+    else:
+        # Trinomial: node j at step i sits at S·u^(i - j), u = exp(σ√(2dt)); every step is
+        # a centred slice of the terminal grid
+        half = np.exp(sigma * np.sqrt(dt / 2))
+        drift = np.exp((r - q) * dt / 2)
+        p_up = ((drift - 1 / half) / (half - 1 / half)) ** 2
+        p_down = ((half - drift) / (half - 1 / half)) ** 2
+        log_step = sigma * np.sqrt(2 * dt)
+        probabilities = (p_up, 1 - p_up - p_down, p_down)
+        grids = [_exercise_value(S * np.exp(log_step * np.arange(n_steps, -n_steps - 1, -1)), K, multiplier, kind)]
+        exercise_at = lambda i, columns: grids[0][n_steps - i:n_steps + i + 1, columns]
+
+    # Induction runs nodes × options so every step slices whole contiguous rows
+    weights = [(discount * p).T for p in probabilities]
+    grids = [np.ascontiguousarray(grid.T) for grid in grids]
+    result = np.empty(len(S))
+    for begin in range(0, len(S), chunk_size):
+        columns = slice(begin, begin + chunk_size)
+        values = grids[0][:, columns].copy()
+        chunk_weights = [w[:, columns] for w in weights]
+        buffers = [np.empty_like(values) for _ in chunk_weights[1:]]
+
+        for i in range(n_steps - 1, -1, -1):
+            width = values.shape[0] - len(buffers)
+            # Shifted branches first, then the in-place update of the surviving nodes
+            shifted = [np.multiply(values[b:b + width], w, out=buffer[:width])
+                       for b, (w, buffer) in enumerate(zip(chunk_weights[1:], buffers), 1)]
+            values = values[:width]
+            values *= chunk_weights[0]
+            for term in shifted:
+                values += term
+            if american:
+                np.maximum(values, exercise_at(i, columns), out=values)
+
+        result[columns] = values[0]
+
+    return result.reshape(shape)
+
+# =============================================================================
+# REAL OPTIONS
+# =============================================================================
+
+def expansion_option(project_value: ArrayLike, expansion_factor: ArrayLike, cost: ArrayLike, T: ArrayLike,
+                     r: ArrayLike, sigma: ArrayLike, leakage: ArrayLike = 0.0, **lattice) -> np.ndarray:
+    """Option to scale the project up by expansion_factor for cost, any time before T"""
+    return lattice_price(project_value, cost, T, r, sigma, q=leakage, kind="call",
+                         multiplier=expansion_factor, american=True, **lattice)
+
+def abandonment_option(project_value: ArrayLike, salvage: ArrayLike, T: ArrayLike, r: ArrayLike,
+                       sigma: ArrayLike, leakage: ArrayLike = 0.0, **lattice) -> np.ndarray:
+    """Option to give up the project for its salvage value, any time before T"""
+    return lattice_price(project_value, salvage, T, r, sigma, q=leakage, kind="put", american=True, **lattice)
+
+def deferral_option(project_value: ArrayLike, investment: ArrayLike, T: ArrayLike, r: ArrayLike,
+                    sigma: ArrayLike, leakage: ArrayLike = 0.0, **lattice) -> np.ndarray:
+    """Value of holding the right to invest (rather than investing now) until T"""
+    return lattice_price(project_value, investment, T, r, sigma, q=leakage, kind="call", american=True, **lattice)
+
+def real_option_summary(project_value: float, investment: float, T: float, r: float, sigma: float,
+                        leakage: float = 0.0, expansion_factor: float = 0.0, expansion_cost: float = 0.0,
+                        salvage: float = 0.0, n_steps: int = 200) -> Dict[str, float]:
+    """European benchmark plus American expansion, abandonment and deferral values for one project"""
+    summary = {
+        "european_call": float(black_scholes(project_value, investment, T, r, sigma, leakage)),
+        "deferral_american": float(deferral_option(project_value, investment, T, r, sigma, leakage,
+                                                   n_steps=n_steps)),
+    }
+    summary["deferral_premium"] = max(summary["deferral_american"] - max(project_value - investment, 0.0), 0.0)
+    if expansion_factor > 0:
+        summary["expansion_american"] = float(expansion_option(project_value, expansion_factor, expansion_cost,
+                                                               T, r, sigma, leakage, n_steps=n_steps))
+    if salvage > 0:
+        summary["abandonment_american"] = float(abandonment_option(project_value, salvage, T, r, sigma, leakage,
+                                                                   n_steps=n_steps))
+    return summary
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Vectorized real options: Black-Scholes and lattice pricing")
+    parser.add_argument('--paths', type=int, default=10000, help="Monte Carlo paths to price per path")
+    parser.add_argument('--steps', type=int, default=200, help="Lattice time steps")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("🧮 REAL OPTIONS ENGINE")
+    print("=" * 60)
+
+    # Convergence: European lattice → Black-Scholes, American put premium
+    S, K, T, r, sigma = 1200.0, 800.0, 3.0, 0.045, 0.35
+    closed_form = float(black_scholes(S, K, T, r, sigma))
+    print(f"European call (Black-Scholes): {closed_form:.3f}")
+    for method in ("binomial", "trinomial"):
+        for steps in (50, 200, 800):
+            value = float(lattice_price(S, K, T, r, sigma, american=False, n_steps=steps, method=method))
+            print(f"   {method:<9} {steps:>4} steps: {value:.3f} (error {value - closed_form:+.4f})")
+    print(f"American put vs European put: {float(lattice_price(S, K, T, r, sigma, kind='put')):.3f} vs "
+          f"{float(black_scholes(S, K, T, r, sigma, kind='put')):.3f}")
+
+    # Per-path valuation: one option per simulated project value
+    rng = np.random.default_rng(args.seed)
+    project_values = S * np.exp(rng.normal(0.0, 0.25, args.paths))
+    sigmas = rng.uniform(0.25, 0.45, args.paths)
+
+    start = time.perf_counter()
+    closed = black_scholes(project_values, K, T, r, sigmas)
+    bs_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expansion = expansion_option(project_values, 0.3, 250.0, T, r, sigmas, leakage=0.02, n_steps=args.steps)
+    abandonment = abandonment_option(project_values, 900.0, T, r, sigmas, n_steps=args.steps)
+    deferral = deferral_option(project_values, K, T, r, sigmas, leakage=0.03, n_steps=args.steps)
+    lattice_time = time.perf_counter() - start
+
+    print(f"\n{args.paths:,} paths:")
+    print(f"   Black-Scholes: {bs_time * 1000:.1f} ms (mean {closed.mean():.1f})")
+    print(f"   3 American lattices × {args.steps} steps: {lattice_time:.2f} s")
+    print(f"   Mean expansion {expansion.mean():.1f}, abandonment {abandonment.mean():.1f}, "
+          f"deferral {deferral.mean():.1f}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
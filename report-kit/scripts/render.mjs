@@ -131,10 +131,19 @@ const templates = [
   },
 ];
 
+// Templates receive pre-aggregated chart data; larger payloads usually carry raw samples
+const CASE_PAYLOAD_LIMIT_BYTES = 100_000;
+
 async function loadCaseData(casePath) {
   try {
     const fullPath = path.resolve(rootDir, casePath);
     const data = await fs.readFile(fullPath, 'utf8');
+    if (Buffer.byteLength(data) > CASE_PAYLOAD_LIMIT_BYTES) {
+      console.warn(
+        `⚠️  Case JSON is ${(Buffer.byteLength(data) / 1024).toFixed(0)} KB; ` +
+          'pre-aggregate raw samples with `python chart_preaggregation.py <case.json>`'
+      );
+    }
     return JSON.parse(data);
   } catch (error) {
     console.error(`Error loading case data from ${casePath}:`, error.message);
@@ -5,9 +5,14 @@ Denver, CO MedSpa Case Study
 TTM Window: 2024-Q3 → 2025-Q2
 """
 
+import os
+import sys
 import json
 from datetime import datetime
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from chart_preaggregation import attach_monte_carlo_summary
+
 class VistaBelleSimulation:
     def __init__(self):
         # Basic case information
@@ -402,6 +407,12 @@ class VistaBelleSimulation:
             }
         }
         
+        # 9. Returns distribution, pre-aggregated for report-kit/templates/monte-carlo.html
+        results = attach_monte_carlo_summary(results, n_simulations=10000)
+        irr_percentiles = results["monte_carlo_summary"]["irr"]["summary"]
+        print(f"\n🎲 Monte Carlo IRR (10,000 exits): P10 {irr_percentiles['p10']:.1f}% | "
+              f"P50 {irr_percentiles['p50']:.1f}% | P90 {irr_percentiles['p90']:.1f}%")
+        
         return results
 
 def main():
@@ -6,8 +6,11 @@ Running comprehensive multi-year P&L data through hybrid valuation models
 
 import sys
 import os
+import numpy as np
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from vectorized_dcf_engine import vectorized_dcf
+
 # Mock the enhanced valuation models for standalone execution
 class MultiYearFinancialData:
     def __init__(self, year, revenue, ebitda, ebit, adjustedEbitda, normalizations):
@@ -61,33 +64,31 @@ def calculate_dcf_value(multi_year_data, wacc, terminal_growth=0.03):
     
     print(f"📈 Calculated Historical Growth Rate: {growth_rate:.1%}")
     
-    # Project future cash flows
-    projected_cf = []
-    for year in range(1, projection_years + 1):
-        # Declining growth rate
-        year_growth = growth_rate - ((growth_rate - terminal_growth) * (year - 1) / (projection_years - 1))
-        year_ebitda = current_ebitda * ((1 + year_growth) ** year)
-        
-        # Convert to free cash flow (simplified)
-        tax_rate = 0.26
-        depreciation = year_ebitda * 0.08
-        ebit = year_ebitda - depreciation
-        nopat = ebit * (1 - tax_rate)
-        capex = year_ebitda * 0.03  # 3% of EBITDA
-        working_capital_change = year_ebitda * 0.02 * year_growth  # WC impact
-        
-        free_cash_flow = nopat + depreciation - capex - working_capital_change
-        projected_cf.append(free_cash_flow)
-    
-    # Calculate present values
-    present_values = [cf / ((1 + wacc) ** (i + 1)) for i, cf in enumerate(projected_cf)]
-    
-    # Terminal value
-    terminal_cf = projected_cf[-1] * (1 + terminal_growth)
-    terminal_value = terminal_cf / (wacc - terminal_growth)
-    terminal_pv = terminal_value / ((1 + wacc) ** projection_years)
-    
-    enterprise_value = sum(present_values) + terminal_pv
+    # Project future cash flows with declining growth: year-y EBITDA = current × (1 + g_y)^y
+    years_ahead = np.arange(1, projection_years + 1)
+    year_growth = growth_rate - (growth_rate - terminal_growth) * (years_ahead - 1) / (projection_years - 1)
+    ebitda_index = (1 + year_growth) ** years_ahead
+    effective_growth = ebitda_index / np.concatenate([[1.0], ebitda_index[:-1]]) - 1
+    
+    # Convert to free cash flow (simplified): 8% D&A, 3% capex and 2% × growth WC, all on EBITDA
+    dcf = vectorized_dcf(
+        base_revenue=current_ebitda,
+        growth=effective_growth,
+        margin=1.0,
+        wacc=wacc,
+        terminal_growth=terminal_growth,
+        tax_rate=0.26,
+        da_pct_ebitda=0.08,
+        capex_pct_revenue=0.03,
+        wc_pct_revenue_growth=0.02,
+        wc_growth=year_growth,
+    )
+    
+    projected_cf = dcf['fcf'][0].tolist()
+    present_values = dcf['pv_fcf'][0].tolist()
+    terminal_value = float(dcf['terminal_value'][0])
+    terminal_pv = float(dcf['pv_terminal'][0])
+    enterprise_value = float(dcf['enterprise_value'][0])
     
     return {
         'enterprise_value': enterprise_value,
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Sensitivity Grid Store
+Out-of-core N-D sensitivity grids on memory-mapped arrays with lazy slicing
+
+Sensitivity sweeps (term sensitivity, two-way tables, structure grids) have been kept
+in RAM as lists of dicts, one dict per cell. A dense rate × tenor × IO × leverage ×
+multiple × margin space is ~10^8 cells, far beyond what fits in memory that way. Here
+each metric is one .npy file opened as a numpy memmap, and a small JSON sidecar holds
+the axis metadata:
+
+    <dir>/grid.json        axes (name → values), per-metric axes and dtype, tile layout
+    <dir>/<metric>.npy     N-D array over that metric's axes (a subset of the grid axes)
+    <dir>/progress.npy     completed-tile mask (fills resume where they stopped)
+
+A metric may skip axes it does not depend on (DSCR has no price axis), so only
+price-dependent metrics pay for the full grid.
+
+Filling: the leading `tile_axes` axes are split into tiles. Each tile is evaluated by
+the evaluator and written straight into the memmaps, in-process or by a pool of worker
+processes. Workers open the files themselves, so results never travel back through the
+parent.
+
+Reading: sel() resolves axis values to indices and reads only the selected cells. It
+is the building block for heatmap(), frontier() (largest axis value where a boolean
+metric holds) and block-streamed CSV extracts.
+
+Usage:
+    python sensitivity_grid_store.py --directory /tmp/structure_grid --workers 4
+"""
+
+import os
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+GRID_META_FILE = "grid.json"
+PROGRESS_FILE = "progress.npy"
+
+Selection = Union[float, Sequence[float], slice, None]
+
+# =============================================================================
+# GRID STORE
+# =============================================================================
+
+class SensitivityGrid:
+    """Memory-mapped N-D metrics over named axes (opened lazily, one file per metric)"""
+
+    def __init__(self, directory: str, meta: Dict[str, Any]):
+        self.directory = directory
+        self.meta = meta
+        self.axes = {name: np.asarray(values, dtype=float) for name, values in meta["axes"].items()}
+        self._arrays: Dict[str, np.memmap] = {}
+
+    @classmethod
+    def create(cls, directory: str, axes: Dict[str, Sequence[float]], metrics: Dict[str, Tuple[Sequence[str], str]],
+               tile_axes: int = 2, attrs: Dict[str, Any] = None) -> "SensitivityGrid":
+        """
+        New grid. metrics: name → (axes it depends on, dtype); every metric must
+        include the leading tile_axes axes. Existing files in directory are replaced.
+        """
+        axis_names = list(axes)
+        tiles = axis_names[:tile_axes]
+        for name, (metric_axes, _) in metrics.items():
+            if [a for a in axis_names if a in metric_axes] != list(metric_axes):
+                raise ValueError(f"Axes of metric '{name}' must follow the grid axis order {axis_names}")
+            if not set(tiles) <= set(metric_axes):
+                raise ValueError(f"Metric '{name}' must include the tile axes {tiles}")
+
+        os.makedirs(directory, exist_ok=True)
+        meta = {
+            "axes": {name: [float(v) for v in values] for name, values in axes.items()},
+            "metrics": {name: {"axes": list(metric_axes), "dtype": np.dtype(dtype).str}
+                        for name, (metric_axes, dtype) in metrics.items()},
+            "tile_axes": tiles,
+            "attrs": attrs or {},
+        }
+        grid = cls(directory, meta)
+        for name in metrics:
+            np.lib.format.open_memmap(grid._path(name), mode="w+", dtype=grid.meta["metrics"][name]["dtype"],
+                                      shape=grid.shape(name))
+        np.save(os.path.join(directory, PROGRESS_FILE), np.zeros(grid.tile_shape, dtype=bool))
+        with open(os.path.join(directory, GRID_META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        return grid
+
+    @classmethod
+    def open(cls, directory: str) -> "SensitivityGrid":
+        with open(os.path.join(directory, GRID_META_FILE), "r") as f:
+            return cls(directory, json.load(f))
+
+    def _path(self, metric: str) -> str:
+        return os.path.join(self.directory, f"{metric}.npy")
+
+    @property
+    def metrics(self) -> List[str]:
+        return list(self.meta["metrics"])
+
+    @property
+    def tile_shape(self) -> Tuple[int, ...]:
+        return tuple(self.axes[name].size for name in self.meta["tile_axes"])
+
+    @property
+    def n_cells(self) -> int:
+        return int(np.prod([values.size for values in self.axes.values()]))
+
+    def metric_axes(self, metric: str) -> List[str]:
+        return self.meta["metrics"][metric]["axes"]
+
+    def shape(self, metric: str) -> Tuple[int, ...]:
+        return tuple(self.axes[name].size for name in self.metric_axes(metric))
+
+    def array(self, metric: str, mode: str = "r") -> np.memmap:
+        """The metric's memmap (nothing is read until it is indexed)"""
+        if mode != "r":
+            return np.lib.format.open_memmap(self._path(metric), mode=mode)
+        if metric not in self._arrays:
+            self._arrays[metric] = np.lib.format.open_memmap(self._path(metric), mode="r")
+        return self._arrays[metric]
+
+    def progress(self) -> np.ndarray:
+        return np.load(os.path.join(self.directory, PROGRESS_FILE))
+
+    def mark_tiles(self, tiles: Sequence[Tuple[int, ...]]):
+        progress = np.lib.format.open_memmap(os.path.join(self.directory, PROGRESS_FILE), mode="r+")
+        for tile in tiles:
+            progress[tile] = True
+        progress.flush()
+
+    def nbytes(self) -> int:
+        return sum(os.path.getsize(self._path(metric)) for metric in self.metrics)
+
+    # ---------------------------------------------------------------- reading
+
+    def axis_index(self, axis: str, selection: Selection) -> Union[int, np.ndarray]:
+        """Axis value(s) → index: scalar → int, sequence → array, slice of values → range"""
+        values = self.axes[axis]
+        if selection is None:
+            return np.arange(values.size)
+        if isinstance(selection, slice):
+            lo = -np.inf if selection.start is None else selection.start
+            hi = np.inf if selection.stop is None else selection.stop
+            return np.nonzero((values >= lo - 1e-12) & (values <= hi + 1e-12))[0]
+        if np.ndim(selection) == 0:
+            index = int(np.argmin(np.abs(values - float(selection))))
+            if not np.isclose(values[index], float(selection), rtol=1e-9, atol=1e-9):
+                raise KeyError(f"{axis}={selection} is not on the grid (nearest {values[index]:g})")
+            return index
+        return np.array([self.axis_index(axis, value) for value in selection], dtype=int)
+
+    def sel(self, metric: str, **selection: Selection) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Read a slice: returns (values, remaining axes). Axes selected with a scalar are
+        dropped; selections on axes the metric does not depend on are ignored.
+        """
+        unknown = set(selection) - set(self.axes)
+        if unknown:
+            raise KeyError(f"Unknown axes: {sorted(unknown)}")
+        index, remaining = [], {}
+        for axis in self.metric_axes(metric):
+            idx = self.axis_index(axis, selection.get(axis))
+            index.append(idx)
+            if not np.isscalar(idx):
+                remaining[axis] = self.axes[axis][idx]
+
+        array = self.array(metric)
+        basic = tuple(idx if np.isscalar(idx) else slice(None) for idx in index)
+        fancy = [idx for idx in index if not np.isscalar(idx)]
+        view = array[basic]
+        if fancy and any(len(idx) != size for idx, size in zip(fancy, view.shape)):
+            view = view[np.ix_(*fancy)]
+        return np.asarray(view), remaining
+
+    def heatmap(self, metric: str, y_axis: str, x_axis: str, reduce: Optional[str] = None,
+                **selection: Selection) -> pd.DataFrame:
+        """2-D table over y_axis × x_axis; other free axes are reduced (max/min/mean/any)"""
+        values, axes = self.sel(metric, **selection)
+        names = list(axes)
+        others = tuple(i for i, name in enumerate(names) if name not in (y_axis, x_axis))
+        if others:
+            if reduce is None:
+                raise ValueError(f"Fix or reduce the axes {[names[i] for i in others]}")
+            values = getattr(np, reduce)(values, axis=others)
+            names = [name for i, name in enumerate(names) if i not in others]
+        if names.index(y_axis) > names.index(x_axis):
+            values = values.T
+        return pd.DataFrame(values, index=pd.Index(axes[y_axis], name=y_axis),
+                            columns=pd.Index(axes[x_axis], name=x_axis))
+
+    def frontier(self, metric: str, axis: str, **selection: Selection) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Largest `axis` value where a boolean metric holds (NaN where it never does)"""
+        values, axes = self.sel(metric, **selection)
+        position = list(axes).index(axis)
+        values = np.moveaxis(values.astype(bool), position, -1)
+        any_true = values.any(axis=-1)
+        last = values.shape[-1] - 1 - np.argmax(values[..., ::-1], axis=-1)
+        axis_values = axes.pop(axis)
+        return np.where(any_true, axis_values[last], np.nan), axes
+
+    def to_frame(self, metrics: Sequence[str] = None, **selection: Selection) -> pd.DataFrame:
+        """Long-format slice: one row per cell, one column per axis and metric"""
+        metrics = self.metrics if metrics is None else list(metrics)
+        slices = {metric: self.sel(metric, **selection) for metric in metrics}
+        axes = {}
+        for name in self.axes:
+            for _, metric_axes in slices.values():
+                if name in metric_axes:
+                    axes[name] = metric_axes[name]
+        shape = tuple(values.size for values in axes.values())
+        columns = {name: grid.ravel() for name, grid in zip(axes, np.meshgrid(*axes.values(), indexing="ij"))}
+        for metric, (values, metric_axes) in slices.items():
+            expanded = values.reshape([axes[name].size if name in metric_axes else 1 for name in axes])
+            columns[metric] = np.broadcast_to(expanded, shape).ravel()
+        return pd.DataFrame(columns)
+
+    def to_csv(self, path: str, metrics: Sequence[str] = None, block_axis: str = None,
+               **selection: Selection) -> int:
+        """Stream a slice to CSV one block_axis value at a time (bounded memory); returns rows"""
+        block_axis = block_axis or self.meta["tile_axes"][0]
+        block_values = self.axes[block_axis][np.atleast_1d(self.axis_index(block_axis, selection.pop(block_axis, None)))]
+        rows = 0
+        for i, value in enumerate(block_values):
+            frame = self.to_frame(metrics, **{block_axis: [value]}, **selection)
+            frame.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(frame)
+        return rows
+
+# =============================================================================
+# FILLING
+# =============================================================================
+
+def grid_tiles(grid: SensitivityGrid, pending_only: bool = True) -> List[Tuple[int, ...]]:
+    done = grid.progress() if pending_only else np.zeros(grid.tile_shape, dtype=bool)
+    return [tile for tile in itertools.product(*(range(n) for n in grid.tile_shape)) if not done[tile]]
+
+def _fill_tile(directory: str, evaluator: Callable, tile: Tuple[int, ...]) -> Tuple[int, ...]:
+    grid = SensitivityGrid.open(directory)
+    tile_axes = grid.meta["tile_axes"]
+    point = {name: float(grid.axes[name][i]) for name, i in zip(tile_axes, tile)}
+    inner = {name: values for name, values in grid.axes.items() if name not in tile_axes}
+    outputs = evaluator(point, inner)
+    for metric in grid.metrics:
+        array = grid.array(metric, mode="r+")
+        array[tile] = outputs[metric]
+        array.flush()
+        del array
+    return tile
+
+def fill_grid(grid: SensitivityGrid, evaluator: Callable[[Dict[str, float], Dict[str, np.ndarray]], Dict[str, np.ndarray]],
+              n_workers: int = 1, progress_every: int = 0) -> int:
+    """
+    Evaluate every pending tile. evaluator(point, inner_axes) gets the tile-axis values and
+    the remaining axis arrays, and returns each metric over its non-tile axes. It must be
+    picklable when n_workers > 1. Returns the number of tiles filled.
+    """
+    tiles = grid_tiles(grid)
+    done = []
+    if n_workers > 1 and len(tiles) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = pool.map(_fill_tile, [grid.directory] * len(tiles), [evaluator] * len(tiles), tiles)
+            for tile in futures:
+                done.append(tile)
+                if progress_every and len(done) % progress_every == 0:
+                    grid.mark_tiles(done[-progress_every:])
+                    print(f"   ... {len(done):,}/{len(tiles):,} tiles")
+    else:
+        for tile in tiles:
+            done.append(_fill_tile(grid.directory, evaluator, tile))
+            if progress_every and len(done) % progress_every == 0:
+                grid.mark_tiles(done[-progress_every:])
+                print(f"   ... {len(done):,}/{len(tiles):,} tiles")
+    grid.mark_tiles(done)
+    return len(done)
+
+# =============================================================================
+# DEAL-STRUCTURE GRID
+# =============================================================================
+
+STRUCTURE_AXES = ("ebitda_margin", "rate", "tenor", "io_months", "leverage", "multiple")
+
+@dataclass
+class StructureGridEvaluator:
+    """
+    Tile evaluator for margin × rate × tenor × IO × leverage × multiple structure grids.
+
+    TTM EBITDA = revenue × margin; debt metrics are computed once per loan and
+    broadcast over the price axis (structure_frontier_search.StructureFeasibilityModel).
+    """
+    model: Any
+    revenue: float
+
+    @staticmethod
+    def metrics() -> Dict[str, Tuple[Sequence[str], str]]:
+        debt_axes = STRUCTURE_AXES[:-1]
+        return {
+            "min_dscr_base": (debt_axes, "float32"),
+            "min_dscr_low": (debt_axes, "float32"),
+            "irr": (STRUCTURE_AXES, "float32"),
+            "feasible": (STRUCTURE_AXES, "bool"),
+        }
+
+    def __call__(self, point: Dict[str, float], inner: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        model = replace(self.model, ttm_adj_ebitda=self.revenue * point["ebitda_margin"])
+        T, IO, L = np.meshgrid(inner["tenor"], inner["io_months"], inner["leverage"], indexing="ij")
+        debt = model.debt_outcomes(L, point["rate"], T, IO)
+        priced = model.price_outcomes(inner["multiple"], L[..., None], {name: values[..., None]
+                                                                       for name, values in debt.items()})
+        return {
+            "min_dscr_base": debt["min_dscr_base"],
+            "min_dscr_low": debt["min_dscr_low"],
+            "irr": priced["irr"],
+            "feasible": priced["feasible"],
+        }
+
+def build_structure_grid(directory: str, model, revenue: float, axes: Dict[str, Sequence[float]],
+                         n_workers: int = 1, progress_every: int = 0) -> SensitivityGrid:
+    """Create (or resume) and fill a structure grid; axes keys must be STRUCTURE_AXES"""
+    if list(axes) != list(STRUCTURE_AXES):
+        raise ValueError(f"Structure grid axes must be {STRUCTURE_AXES}")
+    attrs = {"model": {k: v for k, v in vars(model).items()}, "revenue": revenue}
+    try:
+        grid = SensitivityGrid.open(directory)
+        if grid.meta["axes"] != {k: [float(v) for v in vals] for k, vals in axes.items()} or grid.meta["attrs"] != attrs:
+            raise ValueError("different grid")
+    except (OSError, ValueError, KeyError):
+        grid = SensitivityGrid.create(directory, axes, StructureGridEvaluator.metrics(), tile_axes=2, attrs=attrs)
+    fill_grid(grid, StructureGridEvaluator(model, revenue), n_workers, progress_every)
+    return grid
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Out-of-core sensitivity grid over deal structures")
+    parser.add_argument('--case', default="out/sapphirederm/sapphirederm_case_data.json", help="Case data JSON")
+    parser.add_argument('--directory', default=None, help="Grid directory (default: temp dir, removed)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--csv', default=None, help="Write a CSV extract at base margin / 12m IO")
+    args = parser.parse_args()
+
+    import shutil
+    import resource
+    import tempfile
+    from structure_frontier_search import StructureFeasibilityModel
+
+    print("🧮 OUT-OF-CORE SENSITIVITY GRID")
+    print("=" * 60)
+
+    with open(args.case, 'r') as f:
+        overview = json.load(f)['target_overview']
+    revenue = overview['ttm_revenue']
+    base_margin = overview['ttm_adj_ebitda'] / revenue
+    model = StructureFeasibilityModel.from_case_file(args.case)
+
+    axes = {
+        "ebitda_margin": np.round(base_margin + np.arange(-0.064, 0.0641, 0.008), 4),
+        "rate": np.round(np.arange(0.08, 0.1201, 0.0025), 4),
+        "tenor": np.arange(5, 11, dtype=float),
+        "io_months": np.array([0, 6, 12, 18, 24], dtype=float),
+        "leverage": np.round(np.arange(0.5, 5.001, 0.05), 3),
+        "multiple": np.round(np.arange(5.0, 12.001, 0.05), 3),
+    }
+    directory = args.directory or tempfile.mkdtemp(prefix="structure_grid_")
+    try:
+        start = time.perf_counter()
+        grid = build_structure_grid(directory, model, revenue, axes, n_workers=args.workers, progress_every=50)
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"Grid: {' × '.join(str(v.size) for v in grid.axes.values())} = {grid.n_cells:,} cells")
+        print(f"   Filled in {elapsed:.1f} s with {args.workers} worker(s); {grid.nbytes() / 1e6:,.0f} MB on disk, "
+              f"parent peak RSS {peak_mb:,.0f} MB")
+
+        margin = float(grid.axes["ebitda_margin"][np.argmin(np.abs(grid.axes["ebitda_margin"] - base_margin))])
+        frontier, frontier_axes = grid.frontier("feasible", "leverage", ebitda_margin=margin, multiple=5.5,
+                                                io_months=12)
+        table = pd.DataFrame(frontier, index=pd.Index(frontier_axes["rate"], name="rate"),
+                             columns=pd.Index(frontier_axes["tenor"], name="tenor"))
+        print(f"\nMax feasible leverage at {margin:.1%} margin, 5.5x EV, 12m IO (rate × tenor):")
+        print(table.iloc[::4].to_string(float_format=lambda v: f"{v:.2f}x", na_rep="   —"))
+
+        heat = grid.heatmap("feasible", "ebitda_margin", "multiple", reduce="any", rate=0.09, tenor=10)
+        max_price = heat.apply(lambda row: row.index[row.values].max() if row.any() else np.nan, axis=1)
+        print("\nMax feasible EV multiple by margin (9% rate, 10y, any IO / leverage):")
+        for m, value in max_price.iloc[::3].items():
+            print(f"   {m:.1%}: {'—' if np.isnan(value) else f'{value:.2f}x'}")
+
+        rng = np.random.default_rng(0)
+        picks = {name: values[rng.integers(0, values.size, 200)] for name, values in grid.axes.items()}
+        worst = 0.0
+        for k in range(200):
+            point = {name: float(picks[name][k]) for name in grid.axes}
+            direct = replace(model, ttm_adj_ebitda=revenue * point["ebitda_margin"]).evaluate(
+                point["multiple"], point["leverage"], point["rate"], point["tenor"], point["io_months"])
+            stored, _ = grid.sel("irr", **point)
+            feasible, _ = grid.sel("feasible", **point)
+            worst = max(worst, abs(float(stored) - float(direct["irr"])) / max(1.0, abs(float(direct["irr"]))))
+            worst = max(worst, float(bool(feasible) != bool(direct["feasible"])))
+        print(f"\n🔍 200 random cells vs direct model evaluation: max IRR error {worst:.1e} "
+              f"{'✅' if worst < 1e-5 else '❌'}")
+
+        if args.csv:
+            rows = grid.to_csv(args.csv, ["min_dscr_base", "min_dscr_low", "irr", "feasible"],
+                               ebitda_margin=margin, io_months=12)
+            print(f"📄 CSV extract: {rows:,} rows → {args.csv}")
+    finally:
+        if not args.directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Simulation Checkpoint
+Chunked, resumable execution of long Monte Carlo runs and sweeps
+
+A run is a sequence of chunks drawn from one numpy Generator. After each chunk the
+runner holds a consistent snapshot - completed chunk indices, the bit generator state
+and the partial accumulators - and writes it to the checkpoint directory at most every
+`checkpoint_seconds` (and always on Ctrl-C, on `max_chunks` and at the end):
+
+    <dir>/state.npz        run fingerprint, completed chunks, RNG state, accumulators
+    <dir>/<name>.npy       per-row outputs (memory-mapped, filled chunk by chunk)
+
+Because the generator is restored to exactly the state it had after the last completed
+chunk, and accumulators are combined in chunk order, a resumed run draws the same
+numbers and returns results bit-identical to an uninterrupted one. Rows written after
+the last snapshot are simply overwritten on resume. Snapshots are written to a temp file
+and renamed, so a kill mid-write leaves the previous checkpoint intact.
+
+The run fingerprint (caller-supplied key + chunk layout + output shapes) guards against
+resuming a checkpoint from a different configuration.
+
+Usage:
+    python simulation_checkpoint.py --paths 1000000 --interrupt-after 3
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+STATE_FILE = "state.npz"
+
+@dataclass
+class ChunkedRunResult:
+    """Outputs of a (possibly partial) chunked run"""
+    complete: bool
+    completed_chunks: int
+    n_chunks: int
+    rows: Dict[str, np.ndarray]
+    accumulators: Dict[str, np.ndarray]
+    resumed_from: int = 0
+
+def chunk_bounds(n_items: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + chunk_size, n_items)) for start in range(0, n_items, chunk_size)]
+
+def run_fingerprint(run_key: Any, n_items: int, chunk_size: int, row_specs: Dict[str, tuple]) -> str:
+    """Hash of everything a checkpoint must agree on to be resumable"""
+    payload = {"key": run_key, "n_items": n_items, "chunk_size": chunk_size,
+               "rows": {name: [list(tail), np.dtype(dtype).str] for name, (tail, dtype) in row_specs.items()}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+# =============================================================================
+# CHECKPOINT STORAGE
+# =============================================================================
+
+class SimulationCheckpoint:
+    """Snapshot file plus memory-mapped row outputs in one directory"""
+
+    def __init__(self, directory: str, fingerprint: str):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.directory, STATE_FILE)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Last snapshot, or None when absent or written by a different run"""
+        try:
+            with np.load(self.state_path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != self.fingerprint:
+                    return None
+                return {
+                    "completed": [int(i) for i in data["completed"]],
+                    "rng_state": json.loads(str(data["rng_state"])),
+                    "accumulators": {key[len("acc_"):]: data[key].copy() for key in data.files if key.startswith("acc_")},
+                }
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, completed: List[int], rng_state: Dict[str, Any], accumulators: Dict[str, np.ndarray],
+             rows: Dict[str, np.ndarray]):
+        for values in rows.values():
+            if isinstance(values, np.memmap):
+                values.flush()
+        tmp_path = self.state_path + ".tmp.npz"
+        np.savez(tmp_path, fingerprint=np.array(self.fingerprint), completed=np.asarray(completed, dtype=np.int64),
+                 rng_state=np.array(json.dumps(rng_state)),
+                 **{f"acc_{name}": np.asarray(value) for name, value in accumulators.items()})
+        os.replace(tmp_path, self.state_path)
+
+    def open_rows(self, row_specs: Dict[str, tuple], n_items: int, resume: bool) -> Tuple[Dict[str, np.ndarray], bool]:
+        """Memory-mapped row outputs; reopened when resuming, recreated otherwise"""
+        paths = {name: os.path.join(self.directory, f"{name}.npy") for name in row_specs}
+        resume = resume and all(os.path.exists(path) for path in paths.values())
+        rows = {}
+        if resume:
+            for name, (tail, dtype) in row_specs.items():
+                rows[name] = np.lib.format.open_memmap(paths[name], mode="r+")
+                if rows[name].shape != (n_items,) + tuple(tail) or rows[name].dtype != np.dtype(dtype):
+                    resume = False
+        if not resume:
+            rows = {name: np.lib.format.open_memmap(paths[name], mode="w+", dtype=dtype, shape=(n_items,) + tuple(tail))
+                    for name, (tail, dtype) in row_specs.items()}
+        return rows, resume
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def run_chunked(chunk_fn: Callable[[np.random.Generator, int, int], Dict[str, np.ndarray]],
+                n_items: int, chunk_size: int, seed: int,
+                row_specs: Dict[str, tuple] = None,
+                accumulate: Callable[[Dict[str, np.ndarray], Dict[str, np.ndarray]], Dict[str, np.ndarray]] = None,
+                checkpoint_dir: Optional[str] = None, run_key: Any = None,
+                checkpoint_seconds: float = 30.0, max_chunks: Optional[int] = None) -> ChunkedRunResult:
+    """
+    Run chunk_fn(rng, start, stop) over [0, n_items) in order, resuming from a checkpoint.
+
+    row_specs: name → (trailing shape, dtype) of per-row outputs; chunk_fn returns those
+    rows for [start, stop). accumulate(acc, chunk_output) → new accumulators (must not
+    mutate acc) for running totals. max_chunks bounds the work done in this call, so a
+    preemptible job can run in slices. Without checkpoint_dir the run is in memory.
+    """
+    row_specs = row_specs or {}
+    bounds = chunk_bounds(n_items, chunk_size)
+    rng = np.random.default_rng(seed)
+    accumulators: Dict[str, np.ndarray] = {}
+    completed: List[int] = []
+
+    checkpoint = None
+    if checkpoint_dir:
+        checkpoint = SimulationCheckpoint(checkpoint_dir, run_fingerprint(run_key, n_items, chunk_size, row_specs))
+        snapshot = checkpoint.load()
+        rows, resumed = checkpoint.open_rows(row_specs, n_items, resume=snapshot is not None)
+        if resumed:
+            completed = snapshot["completed"]
+            rng.bit_generator.state = snapshot["rng_state"]
+            accumulators = snapshot["accumulators"]
+    else:
+        rows = {name: np.empty((n_items,) + tuple(tail), dtype=dtype) for name, (tail, dtype) in row_specs.items()}
+    resumed_from = len(completed)
+
+    # (completed, rng state, accumulators) only ever changes by whole-chunk replacement
+    snapshot_state = (list(completed), rng.bit_generator.state, accumulators)
+    last_saved = time.monotonic()
+    ran = 0
+    try:
+        for index in range(len(completed), len(bounds)):
+            if max_chunks is not None and ran >= max_chunks:
+                break
+            start, stop = bounds[index]
+            output = chunk_fn(rng, start, stop)
+            for name in row_specs:
+                rows[name][start:stop] = output[name]
+            if accumulate:
+                accumulators = accumulate(accumulators, output)
+            completed = completed + [index]
+            snapshot_state = (completed, rng.bit_generator.state, accumulators)
+            ran += 1
+            if checkpoint and time.monotonic() - last_saved >= checkpoint_seconds:
+                checkpoint.save(*snapshot_state, rows)
+                last_saved = time.monotonic()
+    except KeyboardInterrupt:
+        if checkpoint:
+            checkpoint.save(*snapshot_state, rows)
+            print(f"\n💾 Interrupted: checkpoint saved after {len(snapshot_state[0])}/{len(bounds)} chunks "
+                  f"in {checkpoint.directory}")
+        raise
+
+    complete = len(completed) == len(bounds)
+    if checkpoint:
+        checkpoint.save(*snapshot_state, rows)
+    return ChunkedRunResult(complete=complete, completed_chunks=len(completed), n_chunks=len(bounds),
+                            rows=rows, accumulators=accumulators, resumed_from=resumed_from)
+
+def sum_accumulator(names: List[str]) -> Callable:
+    """accumulate() that keeps float64 column sums of the named chunk outputs"""
+    def accumulate(acc, output):
+        return {name: acc.get(name, 0.0) + np.asarray(output[name], dtype=np.float64).sum(axis=0) for name in names}
+    return accumulate
+
+# =============================================================================
+# EPV MONTE CARLO
+# =============================================================================
+
+def checkpointed_epv_monte_carlo(inputs, n_draws: int, chunk_size: int = 50000, seed: int = 42,
+                                 checkpoint_dir: Optional[str] = None, max_chunks: Optional[int] = None,
+                                 checkpoint_seconds: float = 30.0) -> ChunkedRunResult:
+    """unified_epv_system Monte Carlo (enterprise and equity EPV draws) with checkpoints"""
+    from unified_epv_system import freeze_epv_inputs, simulate_epv_draws
+
+    frozen = freeze_epv_inputs(inputs)
+
+    def chunk_fn(rng, start, stop):
+        return simulate_epv_draws(frozen, stop - start, rng)
+
+    return run_chunked(chunk_fn, n_draws, chunk_size, seed,
+                       row_specs={"enterprise_epv": ((), np.float64), "equity_epv": ((), np.float64)},
+                       checkpoint_dir=checkpoint_dir, run_key={"epv_inputs": frozen.fingerprint, "seed": seed},
+                       checkpoint_seconds=checkpoint_seconds, max_chunks=max_chunks)
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Checkpointed, resumable chunked simulations")
+    parser.add_argument('--paths', type=int, default=1_000_000, help="Multi-year Monte Carlo paths")
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--interrupt-after', type=int, default=3, help="Chunks before the simulated preemption")
+    parser.add_argument('--checkpoint-dir', default=None, help="Checkpoint directory (default: temp dir)")
+    args = parser.parse_args()
+
+    import shutil
+    import tempfile
+    from multi_year_monte_carlo import MultiYearSimulationConfig, run_multi_year_simulation
+
+    print("💾 CHECKPOINTED SIMULATION")
+    print("=" * 60)
+
+    config = MultiYearSimulationConfig(base_revenue=8500, initial_debt=2300, n_paths=args.paths, n_years=10,
+                                       growth_phi=0.5, margin_phi=0.7, multiple_phi=0.8, chunk_size=args.chunk_size)
+    workdir = args.checkpoint_dir or tempfile.mkdtemp(prefix="sim_checkpoint_")
+    try:
+        start = time.perf_counter()
+        reference = run_multi_year_simulation(config)
+        baseline = time.perf_counter() - start
+        print(f"Uninterrupted in-memory run: {args.paths:,} paths × 10 years in {baseline:.2f} s")
+
+        start = time.perf_counter()
+        partial = run_multi_year_simulation(config, checkpoint_dir=workdir, max_chunks=args.interrupt_after)
+        first_leg = time.perf_counter() - start
+        print(f"Leg 1: stopped after {args.interrupt_after} chunks ({first_leg:.2f} s), "
+              f"complete={partial is not None}")
+
+        start = time.perf_counter()
+        resumed = run_multi_year_simulation(config, checkpoint_dir=workdir)
+        second_leg = time.perf_counter() - start
+        print(f"Leg 2: resumed from checkpoint and finished in {second_leg:.2f} s")
+
+        identical = json.dumps(reference, sort_keys=True) == json.dumps(resumed, sort_keys=True)
+        print(f"\n🔍 Resumed summary bit-identical to uninterrupted run: {'✅' if identical else '❌'}")
+
+        from unified_epv_system import EPVInputs, ServiceLine
+        inputs = EPVInputs(service_lines=[ServiceLine("inj", "Injectables", 575, 2200, 0.28, "service"),
+                                          ServiceLine("retail", "Retail", 90, 3000, 0.55, "retail")])
+        epv_dir = os.path.join(workdir, "epv")
+        full = checkpointed_epv_monte_carlo(inputs, 400_000)
+        checkpointed_epv_monte_carlo(inputs, 400_000, checkpoint_dir=epv_dir, max_chunks=2)
+        resumed_epv = checkpointed_epv_monte_carlo(inputs, 400_000, checkpoint_dir=epv_dir)
+        same = np.array_equal(full.rows["enterprise_epv"], resumed_epv.rows["enterprise_epv"])
+        print(f"🔍 EPV Monte Carlo draws identical after resume (from chunk {resumed_epv.resumed_from}): "
+              f"{'✅' if same else '❌'}")
+    finally:
+        if not args.checkpoint_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
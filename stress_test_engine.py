@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Stress Test Engine
+Declarative shock library applied to many cases at once with pure array functions
+
+Scenarios are frozen StressScenario records; a case batch is a frozen set of arrays.
+apply_stress maps (cases × scenarios) to stressed revenue, EBITDA, capex, rate and
+multiple without touching any object state, so batches can run on several threads
+(numpy releases the GIL) with no locking and no save/restore of attributes.
+
+Shock conventions (all relative to the case's own inputs):
+    revenue_shock        relative revenue change (-0.10 = -10%)
+    operating_leverage   EBITDA moves by operating_leverage × revenue_shock (1.0 = margin held)
+    margin_shock         EBITDA margin change in points of revenue (-0.03 = -300bps)
+    cogs_shock_bps       COGS increase in bps of revenue (reduces margin)
+    ebitda_shock         final relative EBITDA haircut
+    margin_floor         stressed EBITDA margin floor (None = no floor)
+    capex_multiplier     scale on maintenance capex
+    capex_to_da          if set, maintenance capex = capex_to_da × D&A (overrides the multiplier)
+    rate_shock_bps       added to the debt rate
+    multiple_shock       relative change in the valuation multiple
+
+Outputs per case × scenario: stressed EV (EBITDA × multiple), equity (EV - net debt)
+and year-1 pre/post-shield DSCR. The debt-service convention is selectable:
+    "schedule"        monthly amortization from debt_schedule_engine, actual year-1 interest
+    "annual_annuity"  annual annuity (monthly annuity × 12 after any IO period), interest
+                      on the opening principal, as in the assurance suite's calculate_dual_dscr
+
+Usage:
+    python stress_test_engine.py --cases 10000 --workers 4
+"""
+
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from debt_schedule_engine import build_amortization_schedule, annualize_schedule, dual_dscr_by_year
+
+# =============================================================================
+# SCENARIO LIBRARY
+# =============================================================================
+
+@dataclass(frozen=True)
+class StressScenario:
+    """One declarative shock (see module docstring for conventions)"""
+    name: str
+    description: str = ""
+    revenue_shock: float = 0.0
+    operating_leverage: float = 1.0
+    margin_shock: float = 0.0
+    cogs_shock_bps: float = 0.0
+    ebitda_shock: float = 0.0
+    margin_floor: Optional[float] = None
+    capex_multiplier: float = 1.0
+    capex_to_da: Optional[float] = None
+    rate_shock_bps: float = 0.0
+    multiple_shock: float = 0.0
+
+SCENARIO_LIBRARY: Dict[str, StressScenario] = {s.name: s for s in (
+    StressScenario("base", "No shock"),
+    # Independent quantitative analysis stress set (10% EBITDA margin floor)
+    StressScenario("recession", "Economic recession scenario", revenue_shock=-0.25, margin_shock=-0.05,
+                   margin_floor=0.10),
+    StressScenario("competition", "Increased competition scenario", revenue_shock=-0.15, margin_shock=-0.03,
+                   margin_floor=0.10),
+    StressScenario("marketing_normalization", "Marketing expense normalization", revenue_shock=-0.08,
+                   margin_shock=-0.08, margin_floor=0.10),
+    # Assurance shock battery
+    StressScenario("downside_shock", "Revenue -10%, COGS +200bps", revenue_shock=-0.10, cogs_shock_bps=200),
+    StressScenario("operational_shock", "1 FTE injector out for 4 months (8% revenue, 1.5x operating leverage)",
+                   revenue_shock=-0.08, operating_leverage=1.5),
+    StressScenario("capex_0.8x_da", "Maintenance capex at 0.8x D&A", capex_to_da=0.8),
+    StressScenario("capex_1.0x_da", "Maintenance capex at 1.0x D&A", capex_to_da=1.0),
+    StressScenario("capex_1.2x_da", "Maintenance capex at 1.2x D&A", capex_to_da=1.2),
+    # Financing and market shocks
+    StressScenario("rate_up_200bps", "Debt rate +200bps", rate_shock_bps=200),
+    StressScenario("multiple_compression", "Valuation multiple -20%", multiple_shock=-0.20),
+    StressScenario("combined_severe", "Recession with rate +200bps and multiple -20%", revenue_shock=-0.25,
+                   margin_shock=-0.05, rate_shock_bps=200, multiple_shock=-0.20, capex_multiplier=1.2),
+)}
+
+def scenario_set(names: Sequence[str]) -> List[StressScenario]:
+    """Library scenarios by name, in the order given"""
+    return [SCENARIO_LIBRARY[name] for name in names]
+
+def pack_scenarios(scenarios: Sequence[StressScenario]) -> Dict[str, np.ndarray]:
+    """Scenario fields as (1 × scenarios) arrays; None becomes NaN"""
+    packed = {}
+    for f in fields(StressScenario):
+        if f.name in ("name", "description"):
+            continue
+        values = [getattr(s, f.name) for s in scenarios]
+        packed[f.name] = np.array([np.nan if v is None else v for v in values], dtype=float)[None, :]
+    return packed
+
+# =============================================================================
+# CASE BATCHES
+# =============================================================================
+
+@dataclass(frozen=True)
+class StressCases:
+    """Columnar case inputs (one entry per case, same currency units throughout)"""
+    names: tuple
+    revenue: np.ndarray
+    ebitda: np.ndarray
+    da: np.ndarray
+    maintenance_capex: np.ndarray
+    tax_rate: np.ndarray
+    debt: np.ndarray
+    rate: np.ndarray
+    tenor: np.ndarray
+    io_months: np.ndarray
+    multiple: np.ndarray
+    net_debt: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict]) -> "StressCases":
+        """Build from dicts with the field names above ('name' instead of 'names'; net_debt defaults to debt)"""
+        columns = {}
+        for f in fields(cls):
+            if f.name == "names":
+                continue
+            default = [r.get("debt", 0.0) for r in records] if f.name == "net_debt" else None
+            values = [r.get(f.name, default[i] if default else 0.0) for i, r in enumerate(records)]
+            column = np.array(values, dtype=float)
+            column.setflags(write=False)
+            columns[f.name] = column
+        return cls(names=tuple(r.get("name", f"case_{i}") for i, r in enumerate(records)), **columns)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def slice(self, start: int, stop: int) -> "StressCases":
+        return StressCases(names=self.names[start:stop],
+                           **{f.name: getattr(self, f.name)[start:stop] for f in fields(self) if f.name != "names"})
+
+# =============================================================================
+# PURE STRESS FUNCTIONS
+# =============================================================================
+
+def apply_stress(cases: StressCases, shocks: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Stressed operating and financing inputs, (cases × scenarios) arrays"""
+    col = lambda values: np.asarray(values, dtype=float)[:, None]
+    revenue, ebitda = col(cases.revenue), col(cases.ebitda)
+
+    stressed_revenue = revenue * (1 + shocks["revenue_shock"])
+    margin_change = shocks["margin_shock"] - shocks["cogs_shock_bps"] / 1e4
+    stressed_ebitda = ebitda * (1 + shocks["operating_leverage"] * shocks["revenue_shock"]) + stressed_revenue * margin_change
+    floor = np.where(np.isnan(shocks["margin_floor"]), -np.inf, shocks["margin_floor"])
+    stressed_ebitda = np.maximum(stressed_ebitda, stressed_revenue * floor) * (1 + shocks["ebitda_shock"])
+
+    capex = np.where(np.isnan(shocks["capex_to_da"]), col(cases.maintenance_capex) * shocks["capex_multiplier"],
+                     col(cases.da) * shocks["capex_to_da"])
+    return {
+        "revenue": stressed_revenue,
+        "ebitda": stressed_ebitda,
+        "maintenance_capex": capex,
+        "rate": col(cases.rate) + shocks["rate_shock_bps"] / 1e4,
+        "multiple": col(cases.multiple) * (1 + shocks["multiple_shock"]),
+    }
+
+DEBT_SERVICE_CONVENTIONS = ("schedule", "annual_annuity")
+
+def annual_annuity_year_one(debt: np.ndarray, rate: np.ndarray, tenor: np.ndarray,
+                            io_months: np.ndarray) -> Dict[str, np.ndarray]:
+    """Year-1 debt service and interest on the annual-annuity convention, shaped (..., 1)"""
+    amort_months = np.floor((tenor - io_months / 12) * 12)
+    monthly_rate = rate / 12
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        growth = (1 + monthly_rate) ** amort_months
+        post_io = np.where(monthly_rate == 0, debt / amort_months,
+                           debt * monthly_rate * growth / (growth - 1)) * 12
+        annuity = np.where(rate == 0, debt / tenor, debt * rate / (1 - (1 + rate) ** -tenor))
+    debt_service = np.where(io_months > 0, np.where(amort_months <= 0, debt * rate, post_io), annuity)
+    return {"debt_service": debt_service[..., None], "interest": (debt * rate)[..., None]}
+
+def stressed_valuation(cases: StressCases, shocks: Dict[str, np.ndarray],
+                       debt_service_convention: str = "schedule") -> Dict[str, np.ndarray]:
+    """Stressed EV, equity and year-1 DSCR for every case × scenario (no shared state)"""
+    if debt_service_convention not in DEBT_SERVICE_CONVENTIONS:
+        raise ValueError(f"debt_service_convention must be one of {DEBT_SERVICE_CONVENTIONS}")
+    stressed = apply_stress(cases, shocks)
+    col = lambda values: np.asarray(values, dtype=float)[:, None]
+    enterprise_value = stressed["ebitda"] * stressed["multiple"]
+
+    shape = stressed["ebitda"].shape
+    debt, tenor, io_months = (np.broadcast_to(col(values), shape) for values in (cases.debt, cases.tenor, cases.io_months))
+    if debt_service_convention == "annual_annuity":
+        annual = annual_annuity_year_one(debt, stressed["rate"], tenor, io_months)
+    else:
+        annual = annualize_schedule(build_amortization_schedule(debt, stressed["rate"], tenor, io_months,
+                                                                horizon_years=1))
+    dscr = dual_dscr_by_year(annual, stressed["ebitda"][..., None], col(cases.da)[..., None],
+                             stressed["maintenance_capex"][..., None], col(cases.tax_rate)[..., None])
+    return {
+        **stressed,
+        "enterprise_value": enterprise_value,
+        "equity_value": enterprise_value - col(cases.net_debt),
+        "debt_service": annual["debt_service"][..., 0],
+        "dscr_pre": dscr["dscr_pre"][..., 0],
+        "dscr_post": dscr["dscr_post"][..., 0],
+    }
+
+@dataclass
+class StressResults:
+    """Case × scenario stress outputs"""
+    case_names: tuple
+    scenario_names: tuple
+    arrays: Dict[str, np.ndarray]
+    seconds: float = 0.0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long frame indexed by (case, scenario)"""
+        index = pd.MultiIndex.from_product([self.case_names, self.scenario_names], names=["case", "scenario"])
+        return pd.DataFrame({name: values.ravel() for name, values in self.arrays.items()}, index=index)
+
+    def scenario(self, name: str, case: int = 0) -> Dict[str, float]:
+        j = self.scenario_names.index(name)
+        return {field: float(values[case, j]) for field, values in self.arrays.items()}
+
+def run_stress_battery(cases: StressCases, scenarios: Sequence[StressScenario] = None,
+                       n_workers: int = 1, chunk_size: int = 2048,
+                       debt_service_convention: str = "schedule") -> StressResults:
+    """Every case × scenario; chunks of cases run on a thread pool when n_workers > 1"""
+    scenarios = list(SCENARIO_LIBRARY.values()) if scenarios is None else list(scenarios)
+    shocks = pack_scenarios(scenarios)
+    start = time.perf_counter()
+    chunks = [cases.slice(i, i + chunk_size) for i in range(0, len(cases), chunk_size)]
+    if n_workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(lambda chunk: stressed_valuation(chunk, shocks, debt_service_convention), chunks))
+    else:
+        parts = [stressed_valuation(chunk, shocks, debt_service_convention) for chunk in chunks]
+    arrays = {name: np.concatenate([part[name] for part in parts], axis=0) for name in parts[0]}
+    return StressResults(case_names=cases.names, scenario_names=tuple(s.name for s in scenarios),
+                         arrays=arrays, seconds=time.perf_counter() - start)
+
+def build_stress_cases(n_cases: int, seed: int = 11) -> StressCases:
+    """Synthetic single-site practices for stress benchmarks"""
+    rng = np.random.default_rng(seed)
+    revenue = rng.uniform(2e6, 12e6, n_cases)
+    ebitda = revenue * rng.uniform(0.12, 0.30, n_cases)
+    records = [{
+        "name": f"practice_{i:05d}", "revenue": revenue[i], "ebitda": ebitda[i],
+        "da": ebitda[i] * rng.uniform(0.08, 0.15), "maintenance_capex": ebitda[i] * rng.uniform(0.08, 0.15),
+        "tax_rate": 0.26, "debt": ebitda[i] * rng.uniform(1.5, 4.0), "rate": rng.uniform(0.08, 0.11),
+        "tenor": rng.choice([5, 7, 10]), "io_months": rng.choice([0, 12]), "multiple": rng.uniform(6.0, 10.0),
+    } for i in range(n_cases)]
+    return StressCases.from_records(records)
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Vectorized stress-test battery")
+    parser.add_argument('--cases', type=int, default=10000, help="Synthetic cases")
+    parser.add_argument('--workers', type=int, default=4, help="Thread-pool workers")
+    parser.add_argument('--output', help="Write the case × scenario frame to CSV")
+    args = parser.parse_args()
+
+    print("🌪️  STRESS TEST BATTERY")
+    print("=" * 60)
+    print(f"Scenarios ({len(SCENARIO_LIBRARY)}): {', '.join(SCENARIO_LIBRARY)}")
+
+    cases = build_stress_cases(args.cases)
+    serial = run_stress_battery(cases, n_workers=1)
+    parallel = run_stress_battery(cases, n_workers=args.workers)
+    identical = all(np.array_equal(serial.arrays[k], parallel.arrays[k], equal_nan=True) for k in serial.arrays)
+    pairs = len(cases) * len(SCENARIO_LIBRARY)
+    print(f"\n{pairs:,} case × scenario pairs: serial {serial.seconds * 1000:.0f} ms, "
+          f"{args.workers} threads {parallel.seconds * 1000:.0f} ms (identical: {'✅' if identical else '❌'})")
+
+    frame = parallel.to_frame()
+    summary = frame.groupby(level="scenario", sort=False).agg(
+        median_ev=("enterprise_value", "median"), median_equity=("equity_value", "median"),
+        median_dscr=("dscr_post", "median"), share_dscr_below_1_25=("dscr_post", lambda d: float((d < 1.25).mean())))
+    print("\nScenario medians:")
+    print(summary.to_string(float_format=lambda v: f"{v:,.2f}"))
+
+    if args.output:
+        frame.to_csv(args.output)
+        print(f"\n💾 Saved: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Structure Feasibility Frontier Search
+Monotone boundary walk over price × leverage instead of brute-force structure grids
+
+Deal-structure packs (module_6_structure_pack, test_feasible_structures,
+test_deal_structures) test every multiple × leverage × rate × tenor × IO cell. DSCR
+falls monotonically with leverage and rate, and the sponsor return falls with price,
+so feasibility is a down-set in (price, leverage) for each set of debt terms. Once a
+cell fails, every harder cell fails too, so only the boundary has to be evaluated.
+
+For each combination of outer terms (rate, tenor, IO), the staircase walk starts at
+(lowest price, highest leverage):
+    feasible   -> record max leverage for this price, move to the next price
+    infeasible -> step leverage down
+This takes at most n_price + n_leverage evaluations instead of n_price × n_leverage.
+All term combinations walk in lockstep, so each step is one vectorized evaluation.
+The walk is exact whenever, at every leverage, a structure that fails at some price
+also fails at every higher price. Leverage is stepped one notch at a time, so
+feasibility need not be monotone in leverage. Cells ruled out by a per-price cap
+(debt at or above the price leaves no equity, which eases as the price rises) are
+skipped rather than walked, so the cap never lowers the leverage tried at higher
+prices.
+
+The Pareto set keeps every structure that no other feasible structure beats on both
+price and leverage.
+
+Feasibility (StructureFeasibilityModel):
+    - min DSCR over years 1-3 (post-shield, amortizing schedule): base ≥ 1.70x, low ≥ 1.50x
+    - sponsor IRR over the hold ≥ irr_hurdle (optional; exit at exit_multiple)
+DSCR does not depend on price and the IRR falls with price, so the condition holds
+below the equity cap; verify=True re-checks the walk against the full grid.
+
+Usage:
+    python structure_frontier_search.py --case out/sapphirederm/sapphirederm_case_data.json --verify
+"""
+
+import json
+import time
+import argparse
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from debt_schedule_engine import build_amortization_schedule, annualize_schedule, dual_dscr_by_year
+
+# =============================================================================
+# STAIRCASE WALK
+# =============================================================================
+
+def staircase_frontier(feasible: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray],
+                       n_outer: int, n_x: int, n_y: int,
+                       y_limit: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Max feasible y index for every (outer, x) when a cell failing at x also fails at every larger x.
+
+    feasible(outer_idx, x_idx, y_idx) evaluates a batch of cells and returns booleans.
+    y_limit (n_x, optional) is the highest y index worth trying at each x; cells above it
+    are infeasible outright and need not fail at larger x, so they never move the walk.
+    Returns y_max (n_outer × n_x, -1 where nothing is feasible) and the evaluation count.
+    """
+    limit = np.full(n_x, n_y - 1, dtype=int) if y_limit is None else np.minimum(np.asarray(y_limit, dtype=int), n_y - 1)
+    x = np.zeros(n_outer, dtype=int)
+    y = np.full(n_outer, n_y - 1, dtype=int)
+    y_max = np.full((n_outer, n_x), -1, dtype=int)
+    active = np.ones(n_outer, dtype=bool) if n_y > 0 and n_x > 0 else np.zeros(n_outer, dtype=bool)
+    evaluations = 0
+    while active.any():
+        outer = np.flatnonzero(active)
+        trial = np.minimum(y[outer], limit[x[outer]])
+        capped = trial < 0
+        x[outer[capped]] += 1
+        outer, trial = outer[~capped], trial[~capped]
+        if outer.size:
+            ok = np.asarray(feasible(outer, x[outer], trial), dtype=bool)
+            evaluations += outer.size
+            passed, failed = outer[ok], outer[~ok]
+            y_max[passed, x[passed]] = trial[ok]
+            x[passed] += 1
+            y[failed] = trial[~ok] - 1
+        active = (x < n_x) & (y >= 0)
+    return {"y_max": y_max, "evaluations": evaluations}
+
+def pareto_maximal(points: np.ndarray) -> np.ndarray:
+    """Indices of points not dominated on both columns (maximize both)"""
+    if len(points) == 0:
+        return np.array([], dtype=int)
+    order = np.lexsort((-points[:, 1], -points[:, 0]))   # price desc, then leverage desc
+    best = -np.inf
+    keep = []
+    for index in order:
+        if points[index, 1] > best:
+            keep.append(index)
+            best = points[index, 1]
+    return np.array(keep, dtype=int)
+
+# =============================================================================
+# STRUCTURE MODEL
+# =============================================================================
+
+@dataclass
+class StructureFeasibilityModel:
+    """Senior-debt structure feasibility for one practice (currency units of ttm_adj_ebitda)"""
+    ttm_adj_ebitda: float
+    da: float
+    maintenance_capex: float
+    tax_rate: float
+    base_ebitda_factor: float = 1.00
+    low_ebitda_factor: float = 0.90
+    base_min_dscr: float = 1.70
+    low_min_dscr: float = 1.50
+    dscr_years: int = 3
+    irr_hurdle: Optional[float] = 0.20
+    hold_years: int = 5
+    exit_multiple: float = 8.0
+    ebitda_growth: float = 0.0
+
+    @classmethod
+    def from_case_file(cls, path: str, **overrides) -> "StructureFeasibilityModel":
+        with open(path, 'r') as f:
+            overview = json.load(f)['target_overview']
+        # D&A and maintenance capex as used by the SapphireDerm engines
+        params = dict(ttm_adj_ebitda=overview['ttm_adj_ebitda'], da=180000, maintenance_capex=150000,
+                      tax_rate=overview['tax_rate'])
+        params.update(overrides)
+        return cls(**params)
+
+    def debt_outcomes(self, leverage: np.ndarray, rate: np.ndarray, tenor: np.ndarray,
+                      io_months: np.ndarray) -> Dict[str, np.ndarray]:
+        """Price-independent part: min DSCRs and (with an IRR hurdle) exit equity per loan"""
+        leverage, rate, tenor, io_months = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (leverage, rate, tenor, io_months)))
+        debt = leverage * self.ttm_adj_ebitda
+        horizon = max(self.dscr_years, self.hold_years if self.irr_hurdle is not None else 0)
+        annual = annualize_schedule(build_amortization_schedule(debt, rate, tenor, io_months,
+                                                                horizon_years=horizon))
+        growth = (1 + self.ebitda_growth) ** np.arange(horizon)
+
+        dscr_window = {name: values[..., :self.dscr_years] for name, values in annual.items()}
+        outcomes = {}
+        for scenario, factor in (("base", self.base_ebitda_factor), ("low", self.low_ebitda_factor)):
+            ebitda = self.ttm_adj_ebitda * factor * growth[:self.dscr_years]
+            outcomes[f"min_dscr_{scenario}"] = dual_dscr_by_year(dscr_window, ebitda, self.da, self.maintenance_capex,
+                                                                 self.tax_rate)["dscr_post"].min(axis=-1)
+        if self.irr_hurdle is not None:
+            ebitda = self.ttm_adj_ebitda * self.base_ebitda_factor * growth
+            cash = dual_dscr_by_year(annual, ebitda, self.da, self.maintenance_capex, self.tax_rate)["cfads_post"]
+            free_cash = (cash - annual["debt_service"] - annual["balloon"])[..., :self.hold_years].sum(axis=-1)
+            outcomes["exit_equity"] = (self.exit_multiple * ebitda[self.hold_years - 1]
+                                       - annual["closing_balance"][..., self.hold_years - 1] + free_cash)
+        return outcomes
+
+    def price_outcomes(self, multiple: np.ndarray, leverage: np.ndarray,
+                       debt: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Combine debt_outcomes with entry prices (broadcast) into returns and feasibility"""
+        feasible = (debt["min_dscr_base"] >= self.base_min_dscr) & (debt["min_dscr_low"] >= self.low_min_dscr)
+        result = {"min_dscr_base": debt["min_dscr_base"], "min_dscr_low": debt["min_dscr_low"]}
+        if self.irr_hurdle is not None:
+            equity = (np.asarray(multiple, dtype=float) - leverage) * self.ttm_adj_ebitda
+            with np.errstate(divide="ignore", invalid="ignore"):
+                moic = np.where(equity > 0, debt["exit_equity"] / np.where(equity > 0, equity, 1.0), 0.0)
+            irr = np.where(moic > 0, np.maximum(moic, 1e-12) ** (1 / self.hold_years) - 1, -1.0)
+            feasible = feasible & (equity > 0) & (irr >= self.irr_hurdle)
+            result.update({"equity_check": equity, "moic": moic, "irr": irr})
+        result["feasible"] = feasible
+        return result
+
+    def evaluate(self, multiple: np.ndarray, leverage: np.ndarray, rate: np.ndarray, tenor: np.ndarray,
+                 io_months: np.ndarray) -> Dict[str, np.ndarray]:
+        """DSCR, returns and feasibility for arrays of structures (all inputs broadcast)"""
+        multiple, leverage, rate, tenor, io_months = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (multiple, leverage, rate, tenor, io_months)))
+        return self.price_outcomes(multiple, leverage, self.debt_outcomes(leverage, rate, tenor, io_months))
+
+# =============================================================================
+# FRONTIER SEARCH
+# =============================================================================
+
+def search_structure_frontier(model: StructureFeasibilityModel, multiples: Sequence[float],
+                              leverages: Sequence[float], rates: Sequence[float], tenors: Sequence[float],
+                              io_months: Sequence[float], verify: bool = False) -> Dict:
+    """
+    Max feasible leverage per price for every term set, plus the price × leverage Pareto set.
+
+    multiples and leverages are sorted ascending (harder); rates/tenors/IO are enumerated.
+    """
+    multiples, leverages = np.sort(np.asarray(multiples, float)), np.sort(np.asarray(leverages, float))
+    R, T, IO = (v.ravel() for v in np.meshgrid(np.asarray(rates, float), np.asarray(tenors, float),
+                                               np.asarray(io_months, float), indexing="ij"))
+
+    def feasible(outer, x, y):
+        return model.evaluate(multiples[x], leverages[y], R[outer], T[outer], IO[outer])["feasible"]
+
+    # With an IRR hurdle, debt at or above the price leaves no equity: cap leverage below each multiple
+    y_limit = np.searchsorted(leverages, multiples, side="left") - 1 if model.irr_hurdle is not None else None
+
+    start = time.perf_counter()
+    walk = staircase_frontier(feasible, R.size, multiples.size, leverages.size, y_limit)
+    elapsed = time.perf_counter() - start
+    y_max = walk["y_max"]
+
+    outer_index, price_index = np.nonzero(y_max >= 0)
+    candidates = np.column_stack([multiples[price_index], leverages[y_max[outer_index, price_index]]])
+    pareto = []
+    for k in pareto_maximal(candidates):
+        o, p = outer_index[k], price_index[k]
+        details = model.evaluate(multiples[p], leverages[y_max[o, p]], R[o], T[o], IO[o])
+        pareto.append({
+            "ev_multiple": float(multiples[p]),
+            "leverage": float(leverages[y_max[o, p]]),
+            "rate": float(R[o]),
+            "tenor": float(T[o]),
+            "io_months": float(IO[o]),
+            **{name: float(values) for name, values in details.items() if name != "feasible"},
+        })
+    pareto.sort(key=lambda s: s["ev_multiple"])
+
+    results = {
+        "grid_cells": int(R.size * multiples.size * leverages.size),
+        "evaluations": int(walk["evaluations"]),
+        "seconds": elapsed,
+        "max_leverage_by_terms": [
+            {"rate": float(R[o]), "tenor": float(T[o]), "io_months": float(IO[o]),
+             "max_leverage": [float(leverages[j]) if j >= 0 else None for j in y_max[o]]}
+            for o in range(R.size)
+        ],
+        "multiples": multiples.tolist(),
+        "pareto_set": pareto,
+    }
+
+    if verify:
+        M, L = np.meshgrid(multiples, leverages, indexing="ij")
+        brute = np.empty_like(y_max)
+        for o in range(R.size):   # one term set at a time keeps memory flat
+            grid = model.evaluate(M, L, R[o], T[o], IO[o])["feasible"]      # (price, leverage)
+            brute[o] = np.where(grid.any(axis=1), leverages.size - 1 - np.argmax(grid[:, ::-1], axis=1), -1)
+        results["verified"] = bool(np.array_equal(brute, y_max))
+    return results
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Feasibility-frontier search over deal structures")
+    parser.add_argument('--case', default="out/sapphirederm/sapphirederm_case_data.json", help="Case data JSON")
+    parser.add_argument('--irr-hurdle', type=float, default=0.20, help="Sponsor IRR hurdle (negative = off)")
+    parser.add_argument('--exit-multiple', type=float, default=8.0)
+    parser.add_argument('--verify', action='store_true', help="Check the walk against the full grid")
+    parser.add_argument('--output', help="Write the frontier to JSON")
+    args = parser.parse_args()
+
+    print("🧭 STRUCTURE FEASIBILITY FRONTIER")
+    print("=" * 60)
+
+    model = StructureFeasibilityModel.from_case_file(
+        args.case, irr_hurdle=args.irr_hurdle if args.irr_hurdle >= 0 else None, exit_multiple=args.exit_multiple)
+    results = search_structure_frontier(
+        model,
+        multiples=np.arange(5.0, 12.001, 0.05),
+        leverages=np.arange(0.5, 5.001, 0.025),
+        rates=np.arange(0.08, 0.1201, 0.005),
+        tenors=[5, 6, 7, 8, 9, 10],
+        io_months=[0, 12, 24],
+        verify=args.verify,
+    )
+
+    print(f"Grid cells: {results['grid_cells']:,}   evaluated: {results['evaluations']:,} "
+          f"({results['evaluations'] / results['grid_cells']:.1%}) in {results['seconds'] * 1000:.0f} ms")
+    if args.verify:
+        print(f"Matches brute-force grid: {'✅' if results['verified'] else '❌'}")
+    by_rate = {}
+    for terms in results['max_leverage_by_terms']:
+        feasible_prices = [m for m, lev in zip(results['multiples'], terms['max_leverage']) if lev is not None]
+        if feasible_prices:
+            by_rate[terms['rate']] = max(by_rate.get(terms['rate'], 0.0), max(feasible_prices))
+    print("\nMax feasible EV multiple by rate (best tenor / IO):")
+    for rate, multiple in sorted(by_rate.items()):
+        print(f"   {rate:.2%}: {multiple:.2f}x")
+
+    print(f"\nPareto set (max price, max leverage): {len(results['pareto_set'])} structures")
+    for s in results['pareto_set']:
+        irr = f"  IRR {s['irr']:.1%}" if 'irr' in s else ""
+        print(f"   {s['ev_multiple']:.2f}x EV  {s['leverage']:.3f}x debt  @ {s['rate']:.2%}, {s['tenor']:.0f}y, "
+              f"IO {s['io_months']:.0f}m  (DSCR base {s['min_dscr_base']:.2f}x / low {s['min_dscr_low']:.2f}x){irr}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Frontier written to {args.output}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
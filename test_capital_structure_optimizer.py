@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test Capital Structure Optimizer
+Checks the boundary search against a brute-force leverage × sweep grid on the HarborGlow,
+LumiDerm and synthetic screening cases, and the IRR solver's unbracketed rows
+"""
+
+import io
+import os
+import sys
+import contextlib
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from capital_structure_optimizer import (OBJECTIVES, LBOCase, TermMenu, StructureConstraints, build_screening_cases,
+                                         evaluate_structures, irr_batch, optimize_capital_structure, solve_irr,
+                                         _feasible, _pack_cases, _unit_service_factors)
+
+def brute_force_best(case, objective, leverage_step=0.025, sweep_step=0.025):
+    """Best feasible objective over every option × leverage × sweep on a fine grid"""
+    packed = _pack_cases([case])
+    options = TermMenu().options()
+    factors = _unit_service_factors(options, packed["hold_years"])
+    constraints = StructureConstraints()
+    grid = np.meshgrid(np.arange(options["rate"].size),
+                       np.arange(constraints.min_leverage, constraints.max_leverage + 1e-9, leverage_step),
+                       np.arange(0.0, 1.0 + 1e-9, sweep_step), indexing="ij")
+    option, leverage, sweep = (v.ravel()[None, :] for v in grid)
+    metrics = evaluate_structures(packed, factors, option, leverage, sweep)
+    feasible = _feasible(metrics, leverage, constraints)
+    solve_irr(metrics, feasible)
+    return np.where(feasible, metrics[objective], -np.inf).max()
+
+def validator_cases():
+    from harborglow_aesthetic_simulation import HarborGlowValidator
+    from lumiderm_aesthetic_simulation import LumiDermValidator
+    cases = []
+    for validator in (HarborGlowValidator(), LumiDermValidator()):
+        with contextlib.redirect_stdout(io.StringIO()):
+            ttm_metrics = validator.calculate_ttm_metrics()
+        cases.append(LBOCase.from_validator(validator, ttm_metrics))
+    return cases
+
+def test_optimizer_matches_brute_force_on_validator_cases():
+    """IRR and MOIC optima at least as good as the 0.025 × 2.5% brute-force grid"""
+    cases = validator_cases()
+    for objective in OBJECTIVES:
+        for case, result in zip(cases, optimize_capital_structure(cases, objective)):
+            assert result.feasible, (case.name, objective)
+            assert getattr(result, objective) >= brute_force_best(case, objective) - 1e-6, (case.name, objective)
+
+def test_harborglow_irr_optimum():
+    """HarborGlow IRR pick beats the MOIC pick on IRR and reaches the brute-force 20.29%"""
+    cases = validator_cases()[:1]
+    by_irr = optimize_capital_structure(cases, "irr")[0]
+    by_moic = optimize_capital_structure(cases, "moic")[0]
+    assert by_irr.irr >= by_moic.irr
+    assert by_irr.irr >= 0.2028
+
+def test_optimizer_matches_brute_force_on_screening_cases():
+    """Batched synthetic cases each match a coarser brute-force grid"""
+    cases = build_screening_cases(4)
+    for objective in OBJECTIVES:
+        for case, result in zip(cases, optimize_capital_structure(cases, objective)):
+            best = brute_force_best(case, objective, leverage_step=0.05, sweep_step=0.05)
+            if np.isfinite(best):
+                assert getattr(result, objective) >= best - 1e-6, (case.name, objective)
+            else:
+                assert not result.feasible, case.name
+
+def test_irr_batch_unbracketed_rows_are_nan():
+    """Cash flows whose NPV never changes sign return NaN, not a bracket endpoint"""
+    irr = irr_batch(np.array([[-100.0, 10.0, 110.0], [-100.0, 0.0, 0.0], [100.0, 10.0, 10.0]]))
+    assert abs(irr[0] - 0.10) < 1e-9
+    assert np.isnan(irr[1]) and np.isnan(irr[2])
+
+if __name__ == "__main__":
+    print("🏗️  CAPITAL STRUCTURE OPTIMIZER TESTS")
+    for test in (test_optimizer_matches_brute_force_on_validator_cases,
+                 test_harborglow_irr_optimum,
+                 test_optimizer_matches_brute_force_on_screening_cases,
+                 test_irr_batch_unbracketed_rows_are_nan):
+        test()
+        print(f"   ✅ {test.__name__}")
@@ -6,8 +6,11 @@ Validates the market-calibrated refinements for 2025 medispa analysis
 
 import sys
 import os
+import numpy as np
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from vectorized_dcf_engine import vectorized_dcf
+
 # Mock TypeScript interfaces for Python testing
 class MultiYearFinancialData:
     def __init__(self, year, revenue, ebitda, ebit, adjustedEbitda, normalizations):
@@ -218,36 +221,28 @@ def run_refined_hybrid_valuation():
     projection_years = 7
     decay_rate = 0.25  # CONSERVATIVE: 25% annual decay (increased from 15%)
     
-    projected_cash_flows = []
-    current_ebitda = enhanced_ebitda
-    
-    for year in range(1, projection_years + 1):
-        # REFINED: Exponential decay to terminal rate
-        decay_factor = pow(1 - decay_rate, year - 1)
-        growth_rate = max(terminal_growth, 
-                         terminal_growth + (historical_growth - terminal_growth) * decay_factor)
-        
-        current_ebitda *= (1 + growth_rate)
-        
-        # Convert EBITDA to Free Cash Flow
-        depreciation = current_ebitda * 0.08
-        ebit = current_ebitda - depreciation
-        nopat = ebit * (1 - tax_rate)
-        
-        revenue = current_ebitda / 0.25  # Assume 25% EBITDA margin
-        capex = revenue * 0.03
-        wc_change = revenue * 0.02 * growth_rate
-        
-        fcf = nopat + depreciation - capex - wc_change
-        projected_cash_flows.append(fcf)
-    
-    # Terminal value
-    terminal_cf = projected_cash_flows[-1] * (1 + terminal_growth)
-    terminal_value = terminal_cf / (base_wacc - terminal_growth)
-    
-    # Present values
-    present_values = [cf / pow(1 + base_wacc, i + 1) for i, cf in enumerate(projected_cash_flows)]
-    terminal_pv = terminal_value / pow(1 + base_wacc, projection_years)
+    # REFINED: Exponential decay to terminal rate
+    years_ahead = np.arange(1, projection_years + 1)
+    decay_factor = (1 - decay_rate) ** (years_ahead - 1)
+    growth_rates = np.maximum(terminal_growth,
+                              terminal_growth + (historical_growth - terminal_growth) * decay_factor)
+    
+    # Convert EBITDA to Free Cash Flow (8% D&A, revenue = EBITDA / 25% margin,
+    # 3% revenue capex, 2% revenue × growth working capital)
+    dcf = vectorized_dcf(
+        base_revenue=enhanced_ebitda / 0.25,
+        growth=growth_rates,
+        margin=0.25,
+        wacc=base_wacc,
+        terminal_growth=terminal_growth,
+        tax_rate=tax_rate,
+        da_pct_ebitda=0.08,
+        capex_pct_revenue=0.03,
+        wc_pct_revenue_growth=0.02,
+    )
+    
+    present_values = dcf['pv_fcf'][0].tolist()
+    terminal_pv = float(dcf['pv_terminal'][0])
     
     dcf_valuation = sum(present_values) + terminal_pv
     
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test Structure Feasibility Frontier Search
+Checks the staircase walk against brute-force grids, including entry multiples at or
+below the leverage ladder (where the positive-equity condition caps leverage per price)
+"""
+
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from structure_frontier_search import StructureFeasibilityModel, search_structure_frontier, staircase_frontier
+
+CASE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "out", "sapphirederm", "sapphirederm_case_data.json")
+
+def test_staircase_respects_per_price_cap():
+    """A cap that rises with x must not lower the leverage tried at later x"""
+    n_x, n_y = 6, 8
+    y_limit = np.array([1, 2, 4, 7, 7, 7])
+    true_max = np.array([1, 2, 4, 5, 5, 3])      # feasible up to min(cap, 5), tightening at the end
+
+    def feasible(outer, x, y):
+        return y <= np.minimum(true_max[x], y_limit[x])
+
+    walk = staircase_frontier(feasible, 1, n_x, n_y, y_limit)
+    assert walk["y_max"][0].tolist() == true_max.tolist(), walk["y_max"]
+    assert walk["evaluations"] <= n_x + n_y
+
+def test_frontier_matches_brute_force_when_multiples_overlap_leverage():
+    """Entry multiples at or below the max leverage (equity ≤ 0 cells) still match the full grid"""
+    model = StructureFeasibilityModel.from_case_file(CASE_FILE)
+    results = search_structure_frontier(model, np.arange(2, 8.01, .25), np.arange(.5, 4.01, .25),
+                                        [.09], [7], [0], verify=True)
+    assert results["verified"]
+    max_leverage = results["max_leverage_by_terms"][0]["max_leverage"]
+    for multiple, leverage in zip(results["multiples"], max_leverage):
+        assert leverage is None or leverage < multiple
+
+def test_frontier_matches_brute_force_across_terms():
+    """Walk equals the brute-force grid over hurdles, exit multiples and debt terms"""
+    for irr_hurdle in (None, 0.0, 0.2):
+        for exit_multiple in (6.0, 10.0):
+            model = StructureFeasibilityModel.from_case_file(CASE_FILE, irr_hurdle=irr_hurdle,
+                                                             exit_multiple=exit_multiple)
+            results = search_structure_frontier(model, np.arange(1, 8.01, .25), np.arange(.5, 5.01, .25),
+                                                [.07, .09, .11], [5, 7, 10], [0, 12, 24], verify=True)
+            assert results["verified"], (irr_hurdle, exit_multiple)
+            assert results["evaluations"] < results["grid_cells"]
+
+if __name__ == "__main__":
+    print("🧭 STRUCTURE FRONTIER SEARCH TESTS")
+    for test in (test_staircase_respects_per_price_cap,
+                 test_frontier_matches_brute_force_when_multiples_overlap_leverage,
+                 test_frontier_matches_brute_force_across_terms):
+        test()
+        print(f"   ✅ {test.__name__}")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+TTM Time-Series Store
+Rolling trailing-twelve-month metrics for every practice and every window at once
+
+The practice validators (HarborGlow, LumiDerm, Radiant Point) sum a hard-coded list
+of four quarter dicts for one TTM window and add TTM-level normalizations on top.
+This store keeps each practice's quarterly (or monthly) history on a shared period
+axis and computes every TTM window with cumulative sums:
+
+    TTM[t] = C[t] - C[t - w],   C = cumsum(values),   w = 4 quarters / 12 months
+
+Add-backs are overlays keyed by period (owner comp per quarter, a one-time cost in
+the quarter it was booked, rent-to-market per quarter), so an item drops out of TTM
+once its period leaves the window, with no per-window bookkeeping. Windows missing
+any period are flagged incomplete rather than silently summed.
+
+revalue_book re-values every practice at every quarter-end in one array pass
+(owner-earnings EPV and multiple-based EV) to track EPV drift across the book.
+
+Usage:
+    python ttm_time_series_store.py --practices 500 --years 6
+"""
+
+import time
+import argparse
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+WINDOW = {"Q": 4, "M": 12}
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class TTMTimeSeriesStore:
+    """Practices × periods panel of revenue, reported EBITDA and add-back overlays"""
+
+    def __init__(self, freq: str = "Q"):
+        if freq not in WINDOW:
+            raise ValueError(f"freq must be one of {sorted(WINDOW)}")
+        self.freq = freq
+        self.window_length = WINDOW[freq]
+        self._series: Dict[str, Dict[str, pd.Series]] = {}
+
+    @property
+    def practices(self) -> List[str]:
+        return list(self._series)
+
+    def _index(self, periods: Sequence) -> pd.PeriodIndex:
+        return pd.PeriodIndex([pd.Period(p, freq=self.freq) for p in periods], freq=self.freq)
+
+    def add_practice(self, practice: str, periods: Sequence, revenue: Sequence[float],
+                     ebitda_reported: Sequence[float]) -> None:
+        index = self._index(periods)
+        if index.has_duplicates:
+            raise ValueError(f"{practice}: duplicate periods")
+        self._series[practice] = {
+            "revenue": pd.Series(np.asarray(revenue, float), index=index),
+            "ebitda_reported": pd.Series(np.asarray(ebitda_reported, float), index=index),
+        }
+
+    def add_overlay(self, practice: str, name: str, amounts: Mapping) -> None:
+        """Add-back (positive) or normalization (negative) amounts keyed by period"""
+        if name in ("revenue", "ebitda_reported"):
+            raise ValueError(f"Overlay name '{name}' is reserved")
+        series = pd.Series(list(amounts.values()), index=self._index(list(amounts)), dtype=float)
+        existing = self._series[practice].get(name)
+        self._series[practice][name] = series if existing is None else existing.add(series, fill_value=0.0)
+
+    def overlay_names(self) -> List[str]:
+        names = []
+        for columns in self._series.values():
+            names.extend(n for n in columns if n not in ("revenue", "ebitda_reported") and n not in names)
+        return names
+
+    def panel(self) -> Dict[str, np.ndarray]:
+        """Aligned (practices × periods) arrays; NaN where a practice has no data"""
+        periods = pd.PeriodIndex(sorted(set().union(*(s["revenue"].index for s in self._series.values()))),
+                                 freq=self.freq) if self._series else pd.PeriodIndex([], freq=self.freq)
+        if len(periods):
+            periods = pd.period_range(periods.min(), periods.max(), freq=self.freq)
+        arrays = {"periods": periods}
+        for column in ["revenue", "ebitda_reported"] + self.overlay_names():
+            values = np.full((len(self._series), len(periods)), np.nan if column in ("revenue", "ebitda_reported") else 0.0)
+            for row, columns in enumerate(self._series.values()):
+                if column in columns:
+                    values[row, periods.get_indexer(columns[column].index)] = columns[column].to_numpy(float)
+            arrays[column] = values
+        return arrays
+
+    # -------------------------------------------------------------------------
+    # Rolling TTM
+    # -------------------------------------------------------------------------
+
+    def rolling_ttm(self) -> Dict[str, np.ndarray]:
+        """Every TTM window for every practice (windows ending at each period)"""
+        panel = self.panel()
+        w = self.window_length
+
+        def trailing(values: np.ndarray) -> np.ndarray:
+            cumulative = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)], axis=1)
+            out = np.full(values.shape, np.nan)
+            out[:, w - 1:] = cumulative[:, w:] - cumulative[:, :-w]
+            return out
+
+        observed = ~np.isnan(panel["revenue"]) & ~np.isnan(panel["ebitda_reported"])
+        complete = trailing(observed.astype(float)) == w
+        ttm = {"periods": panel["periods"], "complete": complete}
+        for column in ["revenue", "ebitda_reported"]:
+            ttm[f"ttm_{column}"] = np.where(complete, trailing(np.nan_to_num(panel[column])), np.nan)
+        adjustments = np.zeros_like(ttm["ttm_revenue"])
+        ttm["overlays"] = {}
+        for name in self.overlay_names():
+            ttm["overlays"][name] = np.where(complete, trailing(panel[name]), np.nan)
+            adjustments = adjustments + ttm["overlays"][name]
+        ttm["ttm_ebitda_adjusted"] = ttm["ttm_ebitda_reported"] + adjustments
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ttm["ttm_margin"] = ttm["ttm_ebitda_adjusted"] / ttm["ttm_revenue"]
+        return ttm
+
+    def to_frame(self) -> pd.DataFrame:
+        """Rolling TTM as a long frame indexed by (practice, period_end)"""
+        ttm = self.rolling_ttm()
+        index = pd.MultiIndex.from_product([self.practices, ttm["periods"]], names=["practice", "period_end"])
+        columns = {name: ttm[name].ravel() for name in
+                   ("ttm_revenue", "ttm_ebitda_reported", "ttm_ebitda_adjusted", "ttm_margin", "complete")}
+        columns.update({f"ttm_{name}": values.ravel() for name, values in ttm["overlays"].items()})
+        return pd.DataFrame(columns, index=index)
+
+    def window(self, practice: str, period_end) -> Dict[str, float]:
+        """One TTM window in the validators' ttm_metrics layout (plus overlay totals)"""
+        ttm = self.rolling_ttm()
+        i = self.practices.index(practice)
+        j = ttm["periods"].get_loc(pd.Period(period_end, freq=self.freq))
+        if not ttm["complete"][i, j]:
+            raise ValueError(f"{practice}: TTM window ending {period_end} is incomplete")
+        start = ttm["periods"][j - self.window_length + 1]
+        return {
+            "ttm_revenue": float(ttm["ttm_revenue"][i, j]),
+            "ttm_ebitda_reported": float(ttm["ttm_ebitda_reported"][i, j]),
+            "ttm_ebitda_adjusted": float(ttm["ttm_ebitda_adjusted"][i, j]),
+            "ttm_margin": float(ttm["ttm_margin"][i, j]),
+            "ttm_window": f"{start} → {ttm['periods'][j]}",
+            "ttm_overlays": {name: float(values[i, j]) for name, values in ttm["overlays"].items()},
+        }
+
+# =============================================================================
+# BOOK REVALUATION
+# =============================================================================
+
+@dataclass
+class PracticeValuation:
+    """Validator-style EPV and multiple inputs for one practice"""
+    da_annual: float
+    tax_rate: float
+    reinvestment_rate: float
+    wacc: float
+    net_debt: float
+    ev_multiple: float = 8.5
+
+def revalue_book(store: TTMTimeSeriesStore, valuations: Mapping[str, PracticeValuation]) -> pd.DataFrame:
+    """
+    EPV and multiple EV for every practice at every quarter-end with a complete TTM.
+
+    EPV = (EBIT × (1 - tax) - EBIT × reinvestment) / WACC, EBIT = TTM adj. EBITDA - D&A.
+    """
+    ttm = store.rolling_ttm()
+    practices = store.practices
+    params = {name: np.array([getattr(valuations[p], name) for p in practices], float)[:, None]
+              for name in PracticeValuation.__dataclass_fields__}
+
+    periods = ttm["periods"]
+    quarter_end = np.asarray(periods.month % 3 == 0) if store.freq == "M" else np.ones(len(periods), bool)
+    ebitda = ttm["ttm_ebitda_adjusted"][:, quarter_end]
+    complete = ttm["complete"][:, quarter_end]
+
+    ebit = ebitda - params["da_annual"]
+    fcf = ebit * (1 - params["tax_rate"]) - ebit * params["reinvestment_rate"]
+    epv_enterprise = fcf / params["wacc"]
+    epv_equity = epv_enterprise - params["net_debt"]
+    multiple_ev = ebitda * params["ev_multiple"]
+    previous = np.concatenate([np.full((len(practices), 1), np.nan), epv_enterprise[:, :-1]], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drift = epv_enterprise / previous - 1
+
+    index = pd.MultiIndex.from_product([practices, periods[quarter_end].asfreq("Q")], names=["practice", "quarter_end"])
+    frame = pd.DataFrame({
+        "ttm_revenue": ttm["ttm_revenue"][:, quarter_end].ravel(),
+        "ttm_ebitda_adjusted": ebitda.ravel(),
+        "epv_enterprise": epv_enterprise.ravel(),
+        "epv_equity": epv_equity.ravel(),
+        "multiple_ev": multiple_ev.ravel(),
+        "epv_to_multiple_ev": (epv_enterprise / multiple_ev).ravel(),
+        "epv_drift_qoq": drift.ravel(),
+    }, index=index)
+    return frame[complete.ravel()]
+
+def store_from_validator(validator, practice: str, store: TTMTimeSeriesStore = None,
+                         per_quarter_overlays: Mapping[str, float] = None,
+                         onetime_column: Optional[str] = "onetime") -> TTMTimeSeriesStore:
+    """
+    Quarterly store from a validator's all_quarters records.
+
+    per_quarter_overlays holds TTM-level run-rate normalizations (spread evenly over the
+    four quarters of every window); one-time items come from onetime_column by quarter.
+    """
+    store = store or TTMTimeSeriesStore("Q")
+    quarters = [q['quarter'] for q in validator.all_quarters]
+    store.add_practice(practice, quarters, [q['revenue'] for q in validator.all_quarters],
+                       [q['ebitda_reported'] for q in validator.all_quarters])
+    for name, ttm_amount in (per_quarter_overlays or {}).items():
+        store.add_overlay(practice, name, {quarter: ttm_amount / 4 for quarter in quarters})
+    if onetime_column:
+        store.add_overlay(practice, "onetime_addback",
+                          {q['quarter']: q.get(onetime_column, 0.0) for q in validator.all_quarters})
+    return store
+
+def build_synthetic_book(n_practices: int, years: int, seed: int = 5) -> Tuple[TTMTimeSeriesStore, Dict[str, PracticeValuation]]:
+    """Synthetic quarterly book with owner add-backs and scattered one-time items"""
+    rng = np.random.default_rng(seed)
+    store = TTMTimeSeriesStore("Q")
+    periods = pd.period_range("2019Q1", periods=years * 4, freq="Q")
+    valuations = {}
+    for i in range(n_practices):
+        name = f"practice_{i:04d}"
+        start = rng.integers(0, 4)   # staggered history starts
+        growth = rng.normal(0.015, 0.02, len(periods) - start)
+        revenue = rng.uniform(0.8e6, 2.5e6) * np.cumprod(1 + growth)
+        margin = np.clip(rng.uniform(0.10, 0.25) + rng.normal(0, 0.02, revenue.size), 0.0, 0.4)
+        store.add_practice(name, periods[start:], revenue, revenue * margin)
+        store.add_overlay(name, "owner_addback", {p: rng.uniform(20e3, 60e3) for p in periods[start:]})
+        onetime = rng.choice(periods[start:], size=2, replace=False)
+        store.add_overlay(name, "onetime_addback", {p: rng.uniform(20e3, 90e3) for p in onetime})
+        valuations[name] = PracticeValuation(da_annual=revenue[-1] * 0.05, tax_rate=0.26, reinvestment_rate=0.10,
+                                             wacc=rng.uniform(0.11, 0.14), net_debt=revenue[-1] * rng.uniform(0, 1))
+    return store, valuations
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Rolling TTM store and book-wide EPV drift")
+    parser.add_argument('--practices', type=int, default=500, help="Synthetic practices in the book")
+    parser.add_argument('--years', type=int, default=6, help="Years of quarterly history")
+    parser.add_argument('--output', help="Write the quarter-end revaluation frame to CSV")
+    args = parser.parse_args()
+
+    from harborglow_aesthetic_simulation import HarborGlowValidator
+    from lumiderm_aesthetic_simulation import LumiDermValidator
+
+    print("📅 ROLLING TTM STORE & BOOK REVALUATION")
+    print("=" * 60)
+
+    for validator, practice in ((HarborGlowValidator(), "HarborGlow"), (LumiDermValidator(), "LumiDerm")):
+        store = validator.build_ttm_store()
+        frame = store.to_frame().loc[practice]
+        print(f"\n{practice} rolling TTM adjusted EBITDA:")
+        for period_end, row in frame[frame["complete"]].iterrows():
+            print(f"   {period_end}: revenue ${row['ttm_revenue']:,.0f}  adj. EBITDA ${row['ttm_ebitda_adjusted']:,.0f} "
+                  f"({row['ttm_margin']:.1%})")
+
+    store, valuations = build_synthetic_book(args.practices, args.years)
+    start = time.perf_counter()
+    book = revalue_book(store, valuations)
+    elapsed = time.perf_counter() - start
+    print(f"\nBook: {args.practices} practices × {args.years * 4} quarters → {len(book):,} quarter-end valuations "
+          f"in {elapsed * 1000:.0f} ms")
+    drift = book["epv_drift_qoq"].groupby(level="quarter_end").median()
+    print("Median quarter-over-quarter EPV drift (last 4 quarter-ends):")
+    for quarter, value in drift.tail(4).items():
+        print(f"   {quarter}: {value:+.2%}")
+
+    if args.output:
+        book.to_csv(args.output)
+        print(f"\n💾 Saved: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,9 +3,19 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 import altair as alt
-from dataclasses import dataclass
-from typing import Optional, Dict, Tuple, List
+from dataclasses import dataclass, fields, FrozenInstanceError
+from collections import OrderedDict, namedtuple
+from typing import Any, Optional, Dict, Tuple, List, Union
+import hashlib
+from operator import attrgetter
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import json
+import sys
+
+from chart_preaggregation import histogram as chart_histogram
+import historical_epv_panel
 
 st.set_page_config(
     page_title="Unified EPV Valuation System",
@@ -335,12 +345,25 @@ def calculate_asset_reproduction(
     return (buildout_improvements + equipment_devices + ffne + 
             startup_intangibles + other_repro + nwc_required)
 
+# Scenario modelling uses multiplicative WACC factor for dimensional consistency
+SCENARIO_MULTIPLIERS = {
+    "Base": (1.0, 1.0, 1.0),
+    "Bull": (1.08, 1.05, 0.95),   # Revenue ↑8%, EBIT ↑5%, WACC ↓5%
+    "Bear": (0.92, 0.95, 1.05),   # Revenue ↓8%, EBIT ↓5%, WACC ↑5%
+}
+
 # =============================================================================
 # MAIN EPV COMPUTATION
 # =============================================================================
 
-def compute_unified_epv(inputs: EPVInputs, fin_data: Dict = None) -> EPVOutputs:
-    """Main EPV computation function"""
+def compute_unified_epv(inputs: EPVInputs, fin_data: Dict = None, with_gradients: bool = False):
+    """
+    Main EPV computation function.
+    
+    Returns EPVOutputs, or (EPVOutputs, EPVGradients) when with_gradients=True.
+    """
+    if with_gradients:
+        return compute_unified_epv_gradients(inputs, fin_data)
     
     # Revenue calculation
     if inputs.use_real_data and fin_data:
@@ -433,14 +456,7 @@ def compute_unified_epv(inputs: EPVInputs, fin_data: Dict = None) -> EPVOutputs:
     recommended_equity = equity_epv
     
     # Scenario adjustments
-    # Scenario modelling now uses multiplicative WACC factor for dimensional consistency
-    scenario_multipliers = {
-        "Base": (1.0, 1.0, 1.0),
-        "Bull": (1.08, 1.05, 0.95),   # Revenue ↑8%, EBIT ↑5%, WACC ↓5%
-        "Bear": (0.92, 0.95, 1.05),   # Revenue ↓8%, EBIT ↓5%, WACC ↑5%
-    }
-
-    rev_mult, ebit_mult, wacc_mult = scenario_multipliers.get(inputs.scenario, (1.0, 1.0, 1.0))
+    rev_mult, ebit_mult, wacc_mult = SCENARIO_MULTIPLIERS.get(inputs.scenario, (1.0, 1.0, 1.0))
 
     scenario_revenue = total_revenue * rev_mult
     scenario_ebit = ebit_normalized * ebit_mult * rev_mult
@@ -478,6 +494,788 @@ def compute_unified_epv(inputs: EPVInputs, fin_data: Dict = None) -> EPVOutputs:
         scenario_epv=scenario_epv
     )
 
+# =============================================================================
+# FORWARD-MODE GRADIENTS
+# =============================================================================
+
+class DualNumber:
+    """Forward-mode dual number: a value plus one tangent slot per seeded input"""
+    __slots__ = ("value", "grad")
+    __array_ufunc__ = None  # numpy scalars defer to the reflected operators below
+
+    def __init__(self, value: float, grad: np.ndarray):
+        self.value = float(value)
+        self.grad = grad
+
+    @staticmethod
+    def _split(other) -> Tuple[float, Optional[np.ndarray]]:
+        if isinstance(other, DualNumber):
+            return other.value, other.grad
+        return float(other), None
+
+    def __add__(self, other):
+        v, g = self._split(other)
+        return DualNumber(self.value + v, self.grad if g is None else self.grad + g)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        v, g = self._split(other)
+        return DualNumber(self.value - v, self.grad if g is None else self.grad - g)
+
+    def __rsub__(self, other):
+        v, g = self._split(other)
+        return DualNumber(v - self.value, -self.grad if g is None else g - self.grad)
+
+    def __mul__(self, other):
+        v, g = self._split(other)
+        grad = self.grad * v if g is None else self.grad * v + g * self.value
+        return DualNumber(self.value * v, grad)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        v, g = self._split(other)
+        grad = self.grad / v if g is None else (self.grad * v - g * self.value) / (v * v)
+        return DualNumber(self.value / v, grad)
+
+    def __rtruediv__(self, other):
+        v, g = self._split(other)
+        grad = -v * self.grad / self.value ** 2 if g is None else (g * self.value - v * self.grad) / self.value ** 2
+        return DualNumber(v / self.value, grad)
+
+    def __neg__(self):
+        return DualNumber(-self.value, -self.grad)
+
+    def __pos__(self):
+        return self
+
+    # Branches (zero guards, clipping) follow the primal value
+    def __lt__(self, other): return self.value < self._split(other)[0]
+    def __le__(self, other): return self.value <= self._split(other)[0]
+    def __gt__(self, other): return self.value > self._split(other)[0]
+    def __ge__(self, other): return self.value >= self._split(other)[0]
+
+    def __float__(self) -> float:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"DualNumber({self.value!r})"
+
+def _gradient_field_names(inputs: EPVInputs) -> Tuple[List[str], List[Tuple[Optional[int], str]]]:
+    """Names and (line index | None, attribute) locations of every differentiable input"""
+    names, locations = [], []
+    for f in fields(EPVInputs):
+        if f.type in (float, Optional[float]) and getattr(inputs, f.name) is not None:
+            names.append(f.name)
+            locations.append((None, f.name))
+    
+    line_ids = [line.id for line in inputs.service_lines]
+    unique_ids = len(set(line_ids)) == len(line_ids)
+    for i, line in enumerate(inputs.service_lines):
+        label = line.id if unique_ids else str(i)
+        for f in fields(ServiceLine):
+            if f.type is float:
+                names.append(f"service_lines[{label}].{f.name}")
+                locations.append((i, f.name))
+    return names, locations
+
+def _dual_value(x) -> float:
+    return x.value if isinstance(x, DualNumber) else float(x)
+
+@dataclass
+class EPVGradients:
+    """d(enterprise/equity EPV)/d(input) for every numeric EPVInputs and ServiceLine field"""
+    inputs: Dict[str, float]
+    enterprise_epv: Dict[str, float]
+    equity_epv: Dict[str, float]
+    enterprise_value: float
+    equity_value: float
+
+    def elasticity_table(self) -> pd.DataFrame:
+        """Gradients plus elasticities (% change in EPV per 1% change in the input)"""
+        table = pd.DataFrame({
+            "input": list(self.inputs),
+            "value": list(self.inputs.values()),
+            "d_enterprise_epv": list(self.enterprise_epv.values()),
+            "d_equity_epv": list(self.equity_epv.values()),
+        })
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["enterprise_elasticity"] = table["d_enterprise_epv"] * table["value"] / self.enterprise_value
+            table["equity_elasticity"] = table["d_equity_epv"] * table["value"] / self.equity_value
+        return table
+
+    def tornado_ranking(self, output: str = "enterprise_epv", swing: float = 0.10) -> pd.DataFrame:
+        """First-order ±swing impact of each input on `output`, largest first"""
+        gradient = getattr(self, output)
+        impact = pd.DataFrame({
+            "input": list(self.inputs),
+            "high": [gradient[name] * value * swing for name, value in self.inputs.items()],
+        })
+        impact["low"] = -impact["high"]
+        impact["range"] = impact["high"].abs() * 2
+        impact = impact[impact["range"] > 0]
+        return impact.sort_values("range", ascending=False).reset_index(drop=True)
+
+def compute_unified_epv_gradients(inputs: EPVInputs, fin_data: Dict = None) -> Tuple[EPVOutputs, EPVGradients]:
+    """One dual-number pass of compute_unified_epv returning outputs and input gradients"""
+    names, locations = _gradient_field_names(inputs)
+    n = len(names)
+    seeds = np.eye(n)
+    
+    scalar_values = {f.name: getattr(inputs, f.name) for f in fields(EPVInputs)}
+    line_values = [{f.name: getattr(line, f.name) for f in fields(ServiceLine)} for line in inputs.service_lines]
+    base_values = {}
+    for k, (name, (line_index, attribute)) in enumerate(zip(names, locations)):
+        target = scalar_values if line_index is None else line_values[line_index]
+        base_values[name] = float(target[attribute])
+        target[attribute] = DualNumber(target[attribute], seeds[k])
+    scalar_values["service_lines"] = [ServiceLine(**values) for values in line_values]
+    
+    dual_outputs = compute_unified_epv(EPVInputs(**scalar_values), fin_data)
+    outputs = EPVOutputs(**{name: _dual_value(getattr(dual_outputs, name)) for name in EPV_OUTPUT_FIELDS})
+    
+    def gradient_of(value) -> Dict[str, float]:
+        grad = value.grad if isinstance(value, DualNumber) else np.zeros(n)
+        return dict(zip(names, grad.tolist()))
+    
+    return outputs, EPVGradients(
+        inputs=base_values,
+        enterprise_epv=gradient_of(dual_outputs.enterprise_epv),
+        equity_epv=gradient_of(dual_outputs.equity_epv),
+        enterprise_value=outputs.enterprise_epv,
+        equity_value=outputs.equity_epv,
+    )
+
+def validate_epv_gradients(inputs: EPVInputs, fin_data: Dict = None, rel_step: float = 1e-6) -> pd.DataFrame:
+    """Compare dual-number gradients with central finite differences, one row per input"""
+    _, gradients = compute_unified_epv_gradients(inputs, fin_data)
+    names, locations = _gradient_field_names(inputs)
+    frozen = freeze_epv_inputs(inputs)
+    
+    def bumped(line_index, attribute, value):
+        if line_index is None:
+            return frozen.replace(**{attribute: value})
+        lines = list(frozen.service_lines)
+        lines[line_index] = lines[line_index]._replace(**{attribute: value})
+        return frozen.replace(service_lines=lines)
+    
+    rows = []
+    for name, (line_index, attribute) in zip(names, locations):
+        x = gradients.inputs[name]
+        h = rel_step * max(abs(x), 1.0)
+        up = compute_unified_epv(bumped(line_index, attribute, x + h), fin_data)
+        down = compute_unified_epv(bumped(line_index, attribute, x - h), fin_data)
+        for output in ("enterprise_epv", "equity_epv"):
+            fd = (getattr(up, output) - getattr(down, output)) / (2 * h)
+            analytic = getattr(gradients, output)[name]
+            rows.append({
+                "input": name,
+                "output": output,
+                "analytic": analytic,
+                "finite_difference": fd,
+                "abs_error": abs(analytic - fd),
+                "rel_error": abs(analytic - fd) / max(abs(fd), 1e-9),
+            })
+    return pd.DataFrame(rows)
+
+# =============================================================================
+# BATCH (VECTORIZED) EPV COMPUTATION
+# =============================================================================
+
+EPV_OUTPUT_FIELDS = [f.name for f in fields(EPVOutputs)]
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise numerator / denominator, 0 where denominator <= 0 (matches scalar guards)"""
+    positive = denominator > 0
+    return np.divide(numerator, np.where(positive, denominator, 1.0), out=np.zeros_like(numerator, dtype=float), where=positive)
+
+def pack_epv_inputs(inputs_list: List[EPVInputs]) -> Dict[str, np.ndarray]:
+    """Pack a list of EPVInputs into column arrays (service lines padded to the widest case)"""
+    n = len(inputs_list)
+    max_lines = max((len(inputs.service_lines) for inputs in inputs_list), default=0)
+    
+    price = np.zeros((n, max_lines))
+    volume = np.zeros((n, max_lines))
+    cogs_pct = np.zeros((n, max_lines))
+    is_retail = np.zeros((n, max_lines), dtype=bool)
+    for i, inputs in enumerate(inputs_list):
+        for j, line in enumerate(inputs.service_lines):
+            price[i, j] = line.price
+            volume[i, j] = line.volume
+            cogs_pct[i, j] = line.cogs_pct
+            is_retail[i, j] = line.kind == "retail"
+    
+    packed = {
+        "price": price,
+        "volume": volume,
+        "cogs_pct": cogs_pct,
+        "is_retail": is_retail,
+    }
+    
+    numeric_fields = [
+        "clinical_labor_pct", "marketing_pct", "admin_pct", "other_opex_pct",
+        "rent_annual", "med_director_annual", "insurance_annual", "software_annual", "utilities_annual",
+        "owner_add_back", "other_add_back", "da_annual", "maint_factor", "maintenance_capex_amount",
+        "dso_days", "dsi_days", "dpo_days", "cash_non_operating", "debt_interest_bearing",
+        "tax_rate", "rf_rate", "mrp", "beta", "size_premium", "specific_premium", "cost_debt",
+        "target_debt_weight", "buildout_improvements", "equipment_devices", "ffne",
+        "startup_intangibles", "other_repro",
+    ]
+    for name in numeric_fields:
+        packed[name] = np.array([getattr(inputs, name) for inputs in inputs_list], dtype=float)
+    
+    packed["wacc_override"] = np.array(
+        [np.nan if inputs.wacc_override is None else inputs.wacc_override for inputs in inputs_list], dtype=float
+    )
+    packed["depr_factor_method"] = np.array([inputs.maintenance_method == "depr_factor" for inputs in inputs_list], dtype=bool)
+    packed["owner_earnings_method"] = np.array([inputs.epv_method == "Owner Earnings" for inputs in inputs_list], dtype=bool)
+    
+    multipliers = np.array([SCENARIO_MULTIPLIERS.get(inputs.scenario, (1.0, 1.0, 1.0)) for inputs in inputs_list], dtype=float).reshape(n, 3)
+    packed["rev_mult"] = multipliers[:, 0]
+    packed["ebit_mult"] = multipliers[:, 1]
+    packed["wacc_mult"] = multipliers[:, 2]
+    
+    return packed
+
+def compute_unified_epv_arrays(p: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Vectorized EPV over packed column arrays; mirrors compute_unified_epv for service-line inputs"""
+    line_revenue = p["price"] * p["volume"]
+    total_revenue = line_revenue.sum(axis=1)
+    retail_revenue = np.where(p["is_retail"], line_revenue, 0.0).sum(axis=1)
+    service_revenue = total_revenue - retail_revenue
+    
+    # Cost structure
+    total_cogs = (line_revenue * p["cogs_pct"]).sum(axis=1)
+    clinical_labor_cost = p["clinical_labor_pct"] * service_revenue
+    gross_profit = total_revenue - total_cogs - clinical_labor_cost
+    fixed_costs_total = (p["rent_annual"] + p["med_director_annual"] + p["insurance_annual"] +
+                         p["software_annual"] + p["utilities_annual"])
+    opex_total = (p["marketing_pct"] + p["admin_pct"] + p["other_opex_pct"]) * total_revenue + fixed_costs_total
+    
+    # EBITDA and EBIT
+    ebitda_reported = gross_profit - opex_total
+    ebitda_normalized = ebitda_reported + p["owner_add_back"] + p["other_add_back"]
+    ebit_normalized = ebitda_normalized - p["da_annual"]
+    ebit_margin = _safe_divide(ebit_normalized, total_revenue)
+    
+    # Maintenance capex and EPV earnings
+    maintenance_capex = np.where(p["depr_factor_method"], p["da_annual"] * p["maint_factor"], p["maintenance_capex_amount"])
+    nopat = ebit_normalized * (1 - p["tax_rate"])
+    owner_earnings = nopat + p["da_annual"] - maintenance_capex
+    adjusted_earnings = np.where(p["owner_earnings_method"], owner_earnings, nopat)
+    
+    # WACC
+    cost_equity = p["rf_rate"] + p["beta"] * p["mrp"] + p["size_premium"] + p["specific_premium"]
+    after_tax_cost_debt = p["cost_debt"] * (1 - p["tax_rate"])
+    wacc_capm = np.clip(p["target_debt_weight"] * after_tax_cost_debt +
+                        (1 - p["target_debt_weight"]) * cost_equity, 0.03, 0.35)
+    wacc = np.where(np.isnan(p["wacc_override"]), wacc_capm, p["wacc_override"])
+    
+    enterprise_epv = _safe_divide(adjusted_earnings, wacc)
+    
+    # Working capital
+    cogs_for_wc = total_cogs + clinical_labor_cost
+    ar = total_revenue * (p["dso_days"] / 365)
+    inv = cogs_for_wc * (p["dsi_days"] / 365)
+    ap = cogs_for_wc * (p["dpo_days"] / 365)
+    nwc_required = np.maximum(0, ar + inv - ap)
+    
+    # Asset reproduction and equity values
+    enterprise_repro = (p["buildout_improvements"] + p["equipment_devices"] + p["ffne"] +
+                        p["startup_intangibles"] + p["other_repro"] + nwc_required)
+    equity_epv = enterprise_epv + p["cash_non_operating"] - p["debt_interest_bearing"]
+    equity_repro = enterprise_repro + p["cash_non_operating"] - p["debt_interest_bearing"]
+    
+    # Scenario adjustments
+    scenario_revenue = total_revenue * p["rev_mult"]
+    scenario_ebit = ebit_normalized * p["ebit_mult"] * p["rev_mult"]
+    scenario_epv = _safe_divide(scenario_ebit * (1 - p["tax_rate"]), wacc * p["wacc_mult"])
+    
+    return {
+        "total_revenue": total_revenue,
+        "service_revenue": service_revenue,
+        "retail_revenue": retail_revenue,
+        "gross_profit": gross_profit,
+        "ebitda_reported": ebitda_reported,
+        "ebitda_normalized": ebitda_normalized,
+        "ebit_normalized": ebit_normalized,
+        "ebit_margin": ebit_margin,
+        "nopat": nopat,
+        "owner_earnings": owner_earnings,
+        "adjusted_earnings": adjusted_earnings,
+        "maintenance_capex": maintenance_capex,
+        "wacc": wacc,
+        "enterprise_epv": enterprise_epv,
+        "equity_epv": equity_epv,
+        "enterprise_repro": enterprise_repro,
+        "equity_repro": equity_repro,
+        "franchise_ratio": _safe_divide(enterprise_epv, enterprise_repro),
+        "ar": ar,
+        "inv": inv,
+        "ap": ap,
+        "nwc_required": nwc_required,
+        "ev_to_revenue": _safe_divide(enterprise_epv, total_revenue),
+        "ev_to_ebitda": _safe_divide(enterprise_epv, ebitda_normalized),
+        "recommended_equity": equity_epv,
+        "scenario_revenue": scenario_revenue,
+        "scenario_ebit": scenario_ebit,
+        "scenario_epv": scenario_epv,
+    }
+
+def compute_unified_epv_batch(inputs_list: List[EPVInputs]) -> Dict[str, np.ndarray]:
+    """Batch EPV computation returning one array per EPVOutputs field"""
+    if any(inputs.use_real_data for inputs in inputs_list):
+        raise ValueError("compute_unified_epv_batch supports service-line inputs only; use compute_unified_epv for real data")
+    return compute_unified_epv_arrays(pack_epv_inputs(inputs_list))
+
+def batch_outputs_to_list(batch: Dict[str, np.ndarray]) -> List[EPVOutputs]:
+    """Unpack batch arrays into per-case EPVOutputs"""
+    n = len(batch["enterprise_epv"])
+    return [EPVOutputs(**{name: float(batch[name][i]) for name in EPV_OUTPUT_FIELDS}) for i in range(n)]
+
+# =============================================================================
+# FROZEN INPUTS & RESULT CACHE
+# =============================================================================
+
+EPV_INPUT_FIELDS = [f.name for f in fields(EPVInputs)]
+_EPV_INPUT_INDEX = {name: i for i, name in enumerate(EPV_INPUT_FIELDS)}
+_get_epv_input_values = attrgetter(*EPV_INPUT_FIELDS)
+
+# Immutable, hashable service line with the same attributes as ServiceLine
+FrozenServiceLine = namedtuple("FrozenServiceLine", [f.name for f in fields(ServiceLine)])
+_get_service_line_values = attrgetter(*FrozenServiceLine._fields)
+
+def _freeze_service_lines(service_lines) -> Tuple[FrozenServiceLine, ...]:
+    return tuple(
+        line if isinstance(line, FrozenServiceLine) else FrozenServiceLine._make(_get_service_line_values(line))
+        for line in service_lines
+    )
+
+class FrozenEPVInputs:
+    """
+    Immutable, hashable EPVInputs with a structural fingerprint.
+
+    Exposes the same attributes as EPVInputs (service lines as FrozenServiceLine
+    namedtuples), so compute_unified_epv accepts it directly. replace() is
+    copy-on-write: unchanged fields, including the service-line tuple, are shared
+    with the original.
+    """
+    __slots__ = ("_values", "_hash", "_fingerprint")
+
+    def __init__(self, values: Tuple):
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "_hash", hash(values))
+        object.__setattr__(self, "_fingerprint", None)
+
+    @classmethod
+    def from_inputs(cls, inputs: EPVInputs) -> "FrozenEPVInputs":
+        values = list(_get_epv_input_values(inputs))
+        values[_EPV_INPUT_INDEX["service_lines"]] = _freeze_service_lines(inputs.service_lines)
+        return cls(tuple(values))
+
+    def __setattr__(self, name: str, value: Any):
+        raise FrozenInstanceError(f"cannot assign to field {name!r}; use replace()")
+
+    def __reduce__(self):
+        return (FrozenEPVInputs, (self._values,))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FrozenEPVInputs):
+            return NotImplemented
+        return self._hash == other._hash and self._values == other._values
+
+    def __repr__(self) -> str:
+        return f"FrozenEPVInputs(fingerprint={self.fingerprint})"
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable content digest (same across processes, unlike hash())"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(repr(self._values).encode("utf-8"), digest_size=16).hexdigest()
+            object.__setattr__(self, "_fingerprint", digest)
+        return self._fingerprint
+
+    def replace(self, **changes) -> "FrozenEPVInputs":
+        """Return a new instance with `changes` applied"""
+        if not changes:
+            return self
+        values = list(self._values)
+        for name, value in changes.items():
+            if name not in _EPV_INPUT_INDEX:
+                raise TypeError(f"EPVInputs has no field {name!r}")
+            values[_EPV_INPUT_INDEX[name]] = _freeze_service_lines(value) if name == "service_lines" else value
+        return FrozenEPVInputs(tuple(values))
+
+    def to_inputs(self) -> EPVInputs:
+        """Materialize a mutable EPVInputs (fresh ServiceLine objects)"""
+        kwargs = dict(zip(EPV_INPUT_FIELDS, self._values))
+        kwargs["service_lines"] = [ServiceLine(*line) for line in kwargs["service_lines"]]
+        return EPVInputs(**kwargs)
+
+# Read-only field accessors (one property per EPVInputs field)
+for _name, _index in _EPV_INPUT_INDEX.items():
+    setattr(FrozenEPVInputs, _name, property(lambda self, _i=_index: self._values[_i]))
+del _name, _index
+
+def freeze_epv_inputs(inputs: Union[EPVInputs, FrozenEPVInputs]) -> FrozenEPVInputs:
+    return inputs if isinstance(inputs, FrozenEPVInputs) else FrozenEPVInputs.from_inputs(inputs)
+
+def _approx_nbytes(obj: Any) -> int:
+    """Shallow-recursive size of a cache key or value (containers, namedtuples, dataclass dicts)"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_approx_nbytes(k) + _approx_nbytes(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_nbytes(item) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _approx_nbytes(obj.__dict__)
+    return size
+
+class EPVResultCache:
+    """
+    Thread-safe LRU of EPVOutputs keyed by FrozenEPVInputs content, evicting beyond max_bytes.
+
+    Entries are stored under the frozen value tuple rather than the FrozenEPVInputs object:
+    Streamlit re-executes this module on every rerun, so the class itself is redefined and
+    keys from an earlier run would never compare equal.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[EPVOutputs, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: FrozenEPVInputs) -> Optional[EPVOutputs]:
+        with self._lock:
+            entry = self._entries.get(key._values)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key._values)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: FrozenEPVInputs, outputs: EPVOutputs):
+        entry_bytes = _approx_nbytes(key._values) + _approx_nbytes(outputs)
+        with self._lock:
+            previous = self._entries.pop(key._values, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key._values] = (outputs, entry_bytes)
+            self.nbytes += entry_bytes
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+@st.cache_resource(show_spinner=False)
+def get_epv_result_cache() -> EPVResultCache:
+    """Process-wide result cache; st.cache_resource keeps it alive across Streamlit reruns"""
+    return EPVResultCache()
+
+def compute_unified_epv_cached(inputs: Union[EPVInputs, FrozenEPVInputs], fin_data: Dict = None,
+                               cache: Optional[EPVResultCache] = None) -> EPVOutputs:
+    """compute_unified_epv with LRU memoization on input content (real-data runs bypass the cache)"""
+    if inputs.use_real_data and fin_data:
+        return compute_unified_epv(inputs, fin_data)
+    
+    cache = get_epv_result_cache() if cache is None else cache
+    key = freeze_epv_inputs(inputs)
+    outputs = cache.get(key)
+    if outputs is None:
+        outputs = compute_unified_epv(key)
+        cache.put(key, outputs)
+    # Callers get their own copy so mutating it cannot corrupt the cache
+    result = EPVOutputs.__new__(EPVOutputs)
+    result.__dict__.update(outputs.__dict__)
+    return result
+
+# =============================================================================
+# BACKGROUND SIMULATION JOBS
+# =============================================================================
+
+# Draw distributions for the UI Monte Carlo (same perturbations as the CPP case MC)
+MC_PRICE_FACTOR = (0.97, 1.03)       # one factor per draw, applied to every line
+MC_COGS_FACTOR = (0.95, 1.05)        # independent per line
+MC_SCALAR_FACTORS = {
+    "clinical_labor_pct": (0.98, 1.02),
+    "marketing_pct": (0.98, 1.02),
+    "admin_pct": (0.98, 1.02),
+    "beta": (0.95, 1.05),
+    "size_premium": (0.9, 1.1),
+}
+MC_BAND_PERCENTILES = [5, 25, 50, 75, 95]
+
+# Tornado drivers: label -> packed column (price/volume scale every service line)
+SENSITIVITY_DRIVERS = {
+    "Service pricing": "price",
+    "Patient volume": "volume",
+    "Clinical labor %": "clinical_labor_pct",
+    "Marketing %": "marketing_pct",
+    "Admin %": "admin_pct",
+    "Rent": "rent_annual",
+    "Owner add-backs": "owner_add_back",
+    "D&A": "da_annual",
+    "Beta": "beta",
+    "Risk-free rate": "rf_rate",
+    "Tax rate": "tax_rate",
+}
+
+def _repeat_packed(packed: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    return {name: np.repeat(values, n, axis=0) for name, values in packed.items()}
+
+def draw_epv_factors(rng: np.random.Generator, n_draws: int, n_lines: int) -> Dict[str, np.ndarray]:
+    """Multiplicative perturbation factors per packed column (price is shared by all lines)"""
+    factors = {
+        "price": rng.uniform(*MC_PRICE_FACTOR, (n_draws, 1)),
+        "cogs_pct": rng.uniform(*MC_COGS_FACTOR, (n_draws, n_lines)),
+    }
+    for name, bounds in MC_SCALAR_FACTORS.items():
+        factors[name] = rng.uniform(*bounds, n_draws)
+    return factors
+
+def apply_epv_factors(p: Dict[str, np.ndarray], factors: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Copy of packed arrays with each factor column multiplied in"""
+    p = dict(p)
+    for name, factor in factors.items():
+        p[name] = p[name] * factor
+    return p
+
+def simulate_epv_draws(inputs: Union[EPVInputs, FrozenEPVInputs], n_draws: int,
+                       rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """n_draws perturbed valuations of one case through the vectorized engine"""
+    p = _repeat_packed(pack_epv_inputs([inputs]), n_draws)
+    return compute_unified_epv_arrays(apply_epv_factors(p, draw_epv_factors(rng, n_draws, p["cogs_pct"].shape[1])))
+
+def run_epv_sensitivity(inputs: Union[EPVInputs, FrozenEPVInputs], swing: float = 0.10) -> pd.DataFrame:
+    """One-at-a-time ±swing tornado on enterprise EPV (all drivers in one batch)"""
+    base = pack_epv_inputs([inputs])
+    base_ev = float(compute_unified_epv_arrays(base)["enterprise_epv"][0])
+    p = _repeat_packed(base, 2 * len(SENSITIVITY_DRIVERS))
+    for i, column in enumerate(SENSITIVITY_DRIVERS.values()):
+        p[column] = p[column].astype(float)
+        p[column][2 * i] *= 1 - swing
+        p[column][2 * i + 1] *= 1 + swing
+    ev = compute_unified_epv_arrays(p)["enterprise_epv"]
+    
+    tornado = pd.DataFrame({
+        "driver": list(SENSITIVITY_DRIVERS),
+        "low": ev[0::2] - base_ev,
+        "high": ev[1::2] - base_ev,
+    })
+    tornado["range"] = (tornado["high"] - tornado["low"]).abs()
+    return tornado.sort_values("range", ascending=False).reset_index(drop=True)
+
+class SimulationJob:
+    """Progress and partial results of one background job (read via snapshot())"""
+
+    def __init__(self, kind: str, key: Tuple, total: int):
+        self.kind = kind
+        self.key = key
+        self.total = total
+        self.completed = 0
+        self.result = None
+        self.bands: List[Dict[str, float]] = []
+        self.error: Optional[str] = None
+        self.done = False
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "total": self.total,
+                "completed": self.completed,
+                "progress": self.completed / self.total if self.total else 1.0,
+                "bands": list(self.bands),
+                "result": self.result,
+                "error": self.error,
+                "done": self.done,
+            }
+
+def _cancel_jobs(jobs: "OrderedDict[Tuple, SimulationJob]"):
+    for job in list(jobs.values()):
+        job.cancelled.set()
+
+class SessionJobManager:
+    """
+    Per-session Monte Carlo and sensitivity jobs on a shared worker pool.
+
+    Jobs are keyed by input fingerprint, so resubmitting unchanged inputs returns
+    the running or finished job instead of recomputing. Submitting new inputs
+    cancels the superseded job of the same kind at its next chunk boundary. The
+    executor belongs to the process, not the session; when a session's manager is
+    garbage collected its unfinished jobs are cancelled so they free their worker.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, max_jobs: int = 16):
+        self._executor = executor
+        self._jobs: "OrderedDict[Tuple, SimulationJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+        weakref.finalize(self, _cancel_jobs, self._jobs)
+
+    def _submit(self, key: Tuple, total: int, target, *args) -> SimulationJob:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.cancelled.is_set() and job.error is None:
+                self._jobs.move_to_end(key)
+                return job
+            for other in self._jobs.values():
+                if other.kind == key[0] and not other.done:
+                    other.cancelled.set()
+            job = SimulationJob(key[0], key, total)
+            self._jobs[key] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)[1].cancelled.set()
+        self._executor.submit(target, job, *args)
+        return job
+
+    def submit_monte_carlo(self, inputs: FrozenEPVInputs, n_draws: int, chunk_size: int = 50000,
+                           seed: int = 42) -> SimulationJob:
+        return self._submit(("monte_carlo", inputs.fingerprint, n_draws, seed), n_draws,
+                            self._run_monte_carlo, inputs, chunk_size, seed)
+
+    def submit_sensitivity(self, inputs: FrozenEPVInputs, swing: float = 0.10) -> SimulationJob:
+        return self._submit(("sensitivity", inputs.fingerprint, swing), 1, self._run_sensitivity, inputs, swing)
+
+    @staticmethod
+    def _run_monte_carlo(job: SimulationJob, inputs: FrozenEPVInputs, chunk_size: int, seed: int):
+        rng = np.random.default_rng(seed)
+        enterprise = np.empty(job.total)
+        equity = np.empty(job.total)
+        try:
+            for start in range(0, job.total, chunk_size):
+                if job.cancelled.is_set():
+                    return
+                stop = min(start + chunk_size, job.total)
+                draws = simulate_epv_draws(inputs, stop - start, rng)
+                enterprise[start:stop] = draws["enterprise_epv"]
+                equity[start:stop] = draws["equity_epv"]
+                band = dict(zip([f"p{q}" for q in MC_BAND_PERCENTILES],
+                                np.percentile(enterprise[:stop], MC_BAND_PERCENTILES)))
+                with job._lock:
+                    job.completed = stop
+                    job.bands.append({"draws": stop, **band})
+                    job.result = {"enterprise_epv": enterprise[:stop], "equity_epv": equity[:stop]}
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.done = True
+
+    @staticmethod
+    def _run_sensitivity(job: SimulationJob, inputs: FrozenEPVInputs, swing: float):
+        try:
+            tornado = run_epv_sensitivity(inputs, swing)
+            with job._lock:
+                job.result = tornado
+                job.completed = 1
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.done = True
+
+    def cancel_all(self):
+        """Cancel this session's jobs; the shared executor keeps running"""
+        with self._lock:
+            _cancel_jobs(self._jobs)
+
+# st.fragment graduated from st.experimental_fragment (pinned streamlit 1.33) in 1.37
+st_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+@st.cache_resource(show_spinner=False)
+def get_simulation_executor(max_workers: int = 2) -> ThreadPoolExecutor:
+    """Worker pool shared by every session; st.cache_resource keeps one per process"""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="epv-simulation")
+
+def get_session_job_manager() -> SessionJobManager:
+    """The current Streamlit session's job manager (created on first use)"""
+    if "epv_job_manager" not in st.session_state:
+        st.session_state.epv_job_manager = SessionJobManager(get_simulation_executor())
+    return st.session_state.epv_job_manager
+
+def render_simulation_panel(mc_job: SimulationJob, sensitivity_job: SimulationJob):
+    """Draw progress, percentile bands, histogram and tornado from job snapshots"""
+    mc = mc_job.snapshot()
+    sensitivity = sensitivity_job.snapshot()
+    
+    st.markdown("**Monte Carlo — Enterprise EPV**")
+    if mc["error"]:
+        st.error(f"Monte Carlo failed: {mc['error']}")
+    elif not mc["done"]:
+        st.progress(mc["progress"], text=f"{mc['completed']:,} / {mc['total']:,} draws")
+    
+    if mc["bands"]:
+        bands = pd.DataFrame(mc["bands"])
+        latest = bands.iloc[-1]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("P5", f"${latest['p5']:,.0f}")
+        col2.metric("Median", f"${latest['p50']:,.0f}")
+        col3.metric("P95", f"${latest['p95']:,.0f}")
+        
+        base = alt.Chart(bands).encode(x=alt.X("draws:Q", title="Draws completed"))
+        band_chart = (
+            base.mark_area(opacity=0.2).encode(y=alt.Y("p5:Q", title="Enterprise EPV"), y2="p95:Q") +
+            base.mark_area(opacity=0.35).encode(y="p25:Q", y2="p75:Q") +
+            base.mark_line().encode(y="p50:Q")
+        )
+        
+        bins = chart_histogram(mc["result"]["enterprise_epv"], bins=50)
+        histogram = pd.DataFrame({"bin_start": bins["edges"][:-1], "bin_end": bins["edges"][1:],
+                                  "count": bins["counts"]})
+        histogram_chart = alt.Chart(histogram).mark_bar().encode(
+            x=alt.X("bin_start:Q", title="Enterprise EPV"), x2="bin_end:Q", y=alt.Y("count:Q", title="Draws")
+        )
+        
+        col1, col2 = st.columns(2)
+        col1.altair_chart(band_chart, use_container_width=True)
+        col2.altair_chart(histogram_chart, use_container_width=True)
+    
+    st.markdown("**Sensitivity — Enterprise EPV (±10%)**")
+    if sensitivity["error"]:
+        st.error(f"Sensitivity failed: {sensitivity['error']}")
+    elif sensitivity["result"] is None:
+        st.caption("Computing…")
+    else:
+        tornado = sensitivity["result"].melt(id_vars=["driver", "range"], value_vars=["low", "high"],
+                                             var_name="case", value_name="change")
+        st.altair_chart(
+            alt.Chart(tornado).mark_bar().encode(
+                x=alt.X("change:Q", title="Change in enterprise EPV"),
+                y=alt.Y("driver:N", sort=alt.SortField("range", order="descending"), title=None),
+                color="case:N",
+            ),
+            use_container_width=True,
+        )
+
 # =============================================================================
 # STREAMLIT UI
 # =============================================================================
@@ -650,8 +1448,8 @@ def main():
         startup_intangibles=startup_intangibles,
     )
     
-    # Compute EPV
-    outputs = compute_unified_epv(inputs, fin_data)
+    # Compute EPV (memoized: reruns with unchanged inputs reuse the cached valuation)
+    outputs = compute_unified_epv_cached(inputs, fin_data)
     
     # Display results
     with tab4:
@@ -696,7 +1494,30 @@ def main():
             st.write(f"Franchise Ratio: {outputs.franchise_ratio:.2f}x")
             st.write(f"EV/Revenue: {outputs.ev_to_revenue:.2f}x")
             st.write(f"EV/EBITDA: {outputs.ev_to_ebitda:.2f}x")
-    
+
+        # Monte Carlo and sensitivity run on the session's worker pool; the fragment
+        # polls their snapshots so widget edits never wait on a running simulation
+        st.markdown("---")
+        if use_real_data and fin_data:
+            st.info("Monte Carlo and sensitivity use the service-line model; disable real data to run them.")
+        else:
+            mc_draws = st.select_slider("Monte Carlo draws", options=[1_000, 10_000, 100_000, 1_000_000],
+                                        value=10_000)
+            frozen_inputs = freeze_epv_inputs(inputs)
+            manager = get_session_job_manager()
+            mc_job = manager.submit_monte_carlo(frozen_inputs, mc_draws)
+            sensitivity_job = manager.submit_sensitivity(frozen_inputs)
+
+            polling = not (mc_job.done and sensitivity_job.done)
+
+            @st_fragment(run_every=0.5 if polling else None)
+            def simulation_panel():
+                render_simulation_panel(mc_job, sensitivity_job)
+                if polling and mc_job.done and sensitivity_job.done:
+                    st.rerun()  # one full rerun to stop polling
+
+            simulation_panel()
+
     with tab5:
         st.subheader("Data & Analytics")
         
@@ -710,7 +1531,18 @@ def main():
             if not fin_data.get('income').empty:
                 st.markdown("**Income Statement**")
                 st.dataframe(fin_data['income'].tail(10))
-        
+
+            try:
+                history = historical_epv_panel.historical_epv_for_statements({ticker: fin_data}, inputs)
+            except Exception as e:
+                history = pd.DataFrame()
+                st.warning(f"Historical EPV unavailable for {ticker}: {str(e)}")
+            if not history.empty:
+                st.markdown("**Historical EPV by As-of Year**")
+                st.dataframe(history.droplevel("ticker")[
+                    ["n_years", "normalized_revenue", "margin_mean", "margin_median", "margin_trimmed",
+                     "enterprise_epv", "equity_epv"]], use_container_width=True)
+
         # Working capital analysis
         st.markdown("**Working Capital Analysis**")
         col1, col2, col3 = st.columns(3)
@@ -718,6 +1550,20 @@ def main():
         col2.metric("Inventory", f"${outputs.inv:,.0f}")
         col3.metric("Accounts Payable", f"${outputs.ap:,.0f}")
         st.metric("Net Working Capital Required", f"${outputs.nwc_required:,.0f}")
+        
+        if not (use_real_data and fin_data):
+            st.markdown("**EPV Elasticities (forward-mode gradients)**")
+            _, gradients = compute_unified_epv(inputs, with_gradients=True)
+            elasticities = gradients.elasticity_table()
+            elasticities = elasticities.reindex(
+                elasticities["enterprise_elasticity"].abs().sort_values(ascending=False).index)
+            st.dataframe(elasticities.head(15), use_container_width=True)
+        
+        cache_stats = get_epv_result_cache().stats()
+        st.caption(f"Valuation cache: {cache_stats['entries']:,} entries "
+                   f"({cache_stats['nbytes'] / 1024:,.0f} KB of {cache_stats['max_bytes'] / 1024 ** 2:,.0f} MB), "
+                   f"{cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses "
+                   f"({cache_stats['hit_rate']:.0%} hit rate)")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
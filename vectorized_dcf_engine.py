@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Vectorized DCF Engine
+Single discounted-cash-flow kernel evaluated for many scenarios at once
+
+Inputs are (scenarios × years) growth and EBITDA-margin matrices plus per-scenario
+WACC and terminal-growth arrays. Revenue is compounded with a cumulative product,
+free cash flow is built column-wise and discounting uses one broadcast power, so
+thousands of DCF paths cost roughly the same as one Python loop.
+
+FCF_t = (EBITDA_t - D&A_t) × (1 - tax) + D&A_t - CapEx_t - ΔWC_t
+    D&A_t   = da_pct_ebitda × EBITDA_t
+    CapEx_t = capex_pct_revenue × Revenue_t
+    ΔWC_t   = wc_pct_revenue_change × (Revenue_t - Revenue_t-1)
+            + wc_pct_revenue_growth × Revenue_t × wc_growth_t
+TV = FCF_N × (1 + g) / (WACC - g), discounted N years
+"""
+
+import numpy as np
+from typing import Dict, Optional, Union
+
+ArrayLike = Union[float, np.ndarray]
+
+def _as_scenario_array(value: ArrayLike, n_scenarios: int, name: str) -> np.ndarray:
+    """Broadcast a scalar or (scenarios,) input to a float vector"""
+    array = np.asarray(value, dtype=float)
+    if array.ndim == 0:
+        return np.full(n_scenarios, float(array))
+    if array.shape != (n_scenarios,):
+        raise ValueError(f"{name} must be a scalar or have shape ({n_scenarios},), got {array.shape}")
+    return array
+
+def _as_path_matrix(value: ArrayLike, n_scenarios: int, n_years: int, name: str) -> np.ndarray:
+    """Broadcast a scalar, (years,) or (scenarios × years) input to a float matrix"""
+    array = np.asarray(value, dtype=float)
+    try:
+        return np.broadcast_to(array, (n_scenarios, n_years))
+    except ValueError:
+        raise ValueError(f"{name} must broadcast to ({n_scenarios}, {n_years}), got {array.shape}")
+
+def vectorized_dcf(
+    base_revenue: ArrayLike,
+    growth: np.ndarray,
+    margin: ArrayLike,
+    wacc: ArrayLike,
+    terminal_growth: ArrayLike,
+    tax_rate: ArrayLike = 0.26,
+    da_pct_ebitda: float = 0.0,
+    capex_pct_revenue: float = 0.0,
+    wc_pct_revenue_change: float = 0.0,
+    wc_pct_revenue_growth: float = 0.0,
+    wc_growth: Optional[np.ndarray] = None,
+    wc_from_year: int = 1,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate the DCF for every scenario row at once.
+
+    growth is (scenarios × years) or (years,); margin, wc_growth broadcast the same way;
+    base_revenue, wacc, terminal_growth and tax_rate are scalars or (scenarios,) vectors.
+    wc_from_year is the first forecast year (1-based) that carries a working-capital charge.
+    Scenarios with WACC <= terminal growth are flagged invalid and valued at NaN.
+    """
+    growth = np.atleast_2d(np.asarray(growth, dtype=float))
+    n_scenarios, n_years = growth.shape
+    n_scenarios = max(n_scenarios, np.size(base_revenue), np.size(wacc), np.size(terminal_growth))
+    growth = _as_path_matrix(growth, n_scenarios, n_years, "growth")
+    margin = _as_path_matrix(margin, n_scenarios, n_years, "margin")
+    wc_growth = growth if wc_growth is None else _as_path_matrix(wc_growth, n_scenarios, n_years, "wc_growth")
+
+    base_revenue = _as_scenario_array(base_revenue, n_scenarios, "base_revenue")
+    wacc = _as_scenario_array(wacc, n_scenarios, "wacc")
+    terminal_growth = _as_scenario_array(terminal_growth, n_scenarios, "terminal_growth")
+    tax_rate = _as_scenario_array(tax_rate, n_scenarios, "tax_rate")
+
+    # Operating projections
+    revenue = base_revenue[:, None] * np.cumprod(1 + growth, axis=1)
+    prior_revenue = np.concatenate([base_revenue[:, None], revenue[:, :-1]], axis=1)
+    ebitda = revenue * margin
+    depreciation = ebitda * da_pct_ebitda
+    nopat = (ebitda - depreciation) * (1 - tax_rate[:, None])
+    capex = revenue * capex_pct_revenue
+    wc_change = (wc_pct_revenue_change * (revenue - prior_revenue) +
+                 wc_pct_revenue_growth * revenue * wc_growth)
+    wc_change[:, :max(wc_from_year - 1, 0)] = 0.0
+    fcf = nopat + depreciation - capex - wc_change
+
+    # Discounting
+    valid = wacc > terminal_growth
+    periods = np.arange(1, n_years + 1)
+    discount_factors = (1 + wacc[:, None]) ** -periods
+    pv_fcf = fcf * discount_factors
+    pv_fcf_total = pv_fcf.sum(axis=1)
+
+    spread = np.where(valid, wacc - terminal_growth, np.nan)
+    terminal_value = fcf[:, -1] * (1 + terminal_growth) / spread
+    pv_terminal = terminal_value * discount_factors[:, -1]
+    enterprise_value = pv_fcf_total + pv_terminal
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terminal_value_share = pv_terminal / enterprise_value
+
+    return {
+        "revenue": revenue,
+        "ebitda": ebitda,
+        "fcf": fcf,
+        "discount_factors": discount_factors,
+        "pv_fcf": pv_fcf,
+        "pv_fcf_total": pv_fcf_total,
+        "terminal_value": terminal_value,
+        "pv_terminal": pv_terminal,
+        "enterprise_value": enterprise_value,
+        "terminal_value_share": terminal_value_share,
+        "valid": valid,
+    }
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Viability Boundary Refinement
+Adaptive sampling of max-leverage boundaries in term sensitivity maps
+
+The term sensitivity maps (run_term_sensitivity_analysis, module_4_term_sensitivity)
+test a fixed 5 rate × 4 tenor × 3 IO × 7 leverage grid, so the viable / non-viable
+edge is only known to the nearest 0.25x of leverage. Instead of a uniformly finer
+grid, this samples adaptively:
+
+    1. Coarse pass - every term set (rate, tenor, IO) is evaluated on the coarse
+       leverage ladder in one batch.
+    2. Bracketing - wherever viability flips between neighbouring coarse levels, the
+       pair becomes a bracket; cells without a flip are never touched again.
+    3. Bisection - all brackets are halved in lockstep (one batched call per step)
+       until they are narrower than the target resolution.
+
+The result is the boundary curve (max viable leverage per rate/tenor/IO) to within
+`tolerance`, for about n_coarse + log2(step / tolerance) evaluations per term set
+instead of range / tolerance. Every flip is refined, so a non-monotone response
+still yields all its edges, as long as no two flips fall inside one coarse step.
+
+Viability functions are batched: viable(term_index, leverage) → bool arrays.
+    term_map_viability  - the maps' own calculate_dual_dscr (first-year post-shield DSCR)
+    schedule_viability  - min post-shield DSCR over years 1-3 of the amortizing
+                          schedule (debt_schedule_engine via StructureFeasibilityModel)
+
+Usage:
+    python viability_boundary_refinement.py --tolerance 0.001
+"""
+
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+Viability = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+# =============================================================================
+# ADAPTIVE REFINEMENT
+# =============================================================================
+
+def refine_viability_boundaries(viable: Viability, n_terms: int, coarse_levels: Sequence[float],
+                                tolerance: float = 0.001) -> Dict[str, np.ndarray]:
+    """
+    Max viable leverage per term set to within `tolerance`.
+
+    viable(term_index, leverage) evaluates a batch of (term set, leverage) cells.
+    Returns boundary (n_terms; NaN where no coarse level is viable, the top level where
+    all are), capped (top level viable), every refined flip as arrays
+    (flip_term, flip_viable_side, flip_nonviable_side) and the evaluation count.
+    """
+    levels = np.sort(np.asarray(coarse_levels, dtype=float))
+    terms = np.repeat(np.arange(n_terms), levels.size)
+    coarse = np.asarray(viable(terms, np.tile(levels, n_terms)), dtype=bool).reshape(n_terms, levels.size)
+    evaluations = coarse.size
+
+    term_index, level_index = np.nonzero(coarse[:, :-1] != coarse[:, 1:])
+    lo = levels[level_index].copy()
+    hi = levels[level_index + 1].copy()
+    lo_viable = coarse[term_index, level_index]
+    while lo.size and np.max(hi - lo) > tolerance:
+        mid = (lo + hi) / 2
+        mid_viable = np.asarray(viable(term_index, mid), dtype=bool)
+        evaluations += mid.size
+        move_lo = mid_viable == lo_viable
+        lo = np.where(move_lo, mid, lo)
+        hi = np.where(move_lo, hi, mid)
+
+    viable_side = np.where(lo_viable, lo, hi)
+    nonviable_side = np.where(lo_viable, hi, lo)
+
+    boundary = np.full(n_terms, np.nan)
+    capped = coarse[:, -1]
+    boundary[capped] = levels[-1]
+    falling = lo_viable  # viable → non-viable as leverage rises
+    for t, edge in zip(term_index[falling], viable_side[falling]):
+        if not capped[t]:
+            boundary[t] = edge if np.isnan(boundary[t]) else max(boundary[t], edge)
+
+    return {
+        "boundary": boundary,
+        "capped": capped,
+        "flip_term": term_index,
+        "flip_viable_side": viable_side,
+        "flip_nonviable_side": nonviable_side,
+        "coarse_viable": coarse,
+        "evaluations": int(evaluations),
+        "uniform_evaluations": int(n_terms * (np.floor((levels[-1] - levels[0]) / tolerance + 1e-9) + 1)),
+    }
+
+def term_grid(rates: Sequence[float], tenors: Sequence[float], io_months: Sequence[float]) -> Dict[str, np.ndarray]:
+    """Flattened rate × tenor × IO combinations (term_index order)"""
+    R, T, IO = np.meshgrid(np.asarray(rates, float), np.asarray(tenors, float), np.asarray(io_months, float),
+                           indexing="ij")
+    return {"rate": R.ravel(), "tenor": T.ravel(), "io_months": IO.ravel()}
+
+# =============================================================================
+# VIABILITY FUNCTIONS
+# =============================================================================
+
+def term_map_viability(dual_dscr: Callable, debt_basis_ebitda: float, checks: Sequence[Tuple[float, float]],
+                       terms: Dict[str, np.ndarray]) -> Viability:
+    """
+    Viability under the term maps' convention: for every (ebitda, threshold) check,
+    calculate_dual_dscr(ebitda, leverage × debt_basis_ebitda, rate, tenor, io)['dscr_post']
+    ≥ threshold. Calls the map's own scalar method, so boundaries match term_sensitivity.csv.
+    """
+    def viable(term_index, leverage):
+        result = np.ones(len(term_index), dtype=bool)
+        for k, (t, lev) in enumerate(zip(term_index, leverage)):
+            rate, tenor, io = terms["rate"][t], int(terms["tenor"][t]), int(terms["io_months"][t])
+            result[k] = all(dual_dscr(ebitda, lev * debt_basis_ebitda, rate, tenor, io)["dscr_post"] >= threshold
+                            for ebitda, threshold in checks)
+        return result
+    return viable
+
+def schedule_viability(model, terms: Dict[str, np.ndarray]) -> Viability:
+    """Min post-shield DSCR over the model's DSCR years on the amortizing schedule (batched)"""
+    def viable(term_index, leverage):
+        debt = model.debt_outcomes(leverage, terms["rate"][term_index], terms["tenor"][term_index],
+                                   terms["io_months"][term_index])
+        return (debt["min_dscr_base"] >= model.base_min_dscr) & (debt["min_dscr_low"] >= model.low_min_dscr)
+    return viable
+
+def boundary_records(terms: Dict[str, np.ndarray], refined: Dict[str, np.ndarray], label: str) -> List[Dict]:
+    """One row per term set for CSV / JSON export"""
+    return [{
+        "scenario": label,
+        "rate": float(terms["rate"][t]),
+        "tenor": int(terms["tenor"][t]),
+        "io_months": int(terms["io_months"][t]),
+        "max_leverage": None if np.isnan(refined["boundary"][t]) else float(refined["boundary"][t]),
+        "capped": bool(refined["capped"][t]),
+    } for t in range(len(terms["rate"]))]
+
+def refine_term_map(dual_dscr: Callable, debt_basis_ebitda: float, scenario_checks: Dict[str, Sequence[Tuple[float, float]]],
+                    rates: Sequence[float], tenors: Sequence[float], io_months: Sequence[float],
+                    coarse_levels: Sequence[float], tolerance: float = 0.001) -> Dict[str, Any]:
+    """
+    Boundary curves for a term sensitivity map, one refinement per scenario label.
+    Returns the export records plus evaluation counts against a uniform grid.
+    """
+    terms = term_grid(rates, tenors, io_months)
+    records, evaluations, uniform_evaluations = [], 0, 0
+    for label, checks in scenario_checks.items():
+        viable = term_map_viability(dual_dscr, debt_basis_ebitda, checks, terms)
+        refined = refine_viability_boundaries(viable, len(terms["rate"]), coarse_levels, tolerance)
+        records.extend(boundary_records(terms, refined, label))
+        evaluations += refined["evaluations"]
+        uniform_evaluations += refined["uniform_evaluations"]
+    return {"records": records, "evaluations": evaluations, "uniform_evaluations": uniform_evaluations,
+            "tolerance": tolerance}
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Adaptive refinement of term-map viability boundaries")
+    parser.add_argument('--case', default="out/sapphirederm/sapphirederm_case_data.json", help="Case data JSON")
+    parser.add_argument('--tolerance', type=float, default=0.001, help="Target leverage resolution (x EBITDA)")
+    parser.add_argument('--verify', action='store_true', help="Check against a uniform grid at the tolerance")
+    args = parser.parse_args()
+
+    from structure_frontier_search import StructureFeasibilityModel
+
+    print("🎯 VIABILITY BOUNDARY REFINEMENT")
+    print("=" * 60)
+
+    model = StructureFeasibilityModel.from_case_file(args.case, irr_hurdle=None)
+    terms = term_grid(np.arange(0.08, 0.1201, 0.0025), [7, 8, 9, 10], [0, 12, 24])
+    coarse_levels = np.arange(1.5, 3.25, 0.25)
+    n_terms = len(terms["rate"])
+
+    start = time.perf_counter()
+    refined = refine_viability_boundaries(schedule_viability(model, terms), n_terms, coarse_levels, args.tolerance)
+    elapsed = time.perf_counter() - start
+    print(f"Term sets: {n_terms}  coarse levels: {coarse_levels.size}  tolerance: {args.tolerance}x")
+    print(f"   Evaluations: {refined['evaluations']:,} vs {refined['uniform_evaluations']:,} uniform "
+          f"({refined['evaluations'] / refined['uniform_evaluations']:.1%}) in {elapsed * 1000:.0f} ms")
+
+    print("\nMax leverage (amortizing schedule, base ≥ 1.70x & low ≥ 1.50x), 10y tenor:")
+    for io in (0, 12, 24):
+        selected = (terms["tenor"] == 10) & (terms["io_months"] == io)
+        curve = ", ".join(f"{r:.2%}: {'—' if np.isnan(b) else f'{b:.3f}x'}"
+                          for r, b in zip(terms["rate"][selected][::4], refined["boundary"][selected][::4]))
+        print(f"   IO {io:>2}m  {curve}")
+
+    if args.verify:
+        fine = np.arange(coarse_levels[0], coarse_levels[-1] + 1e-9, args.tolerance)
+        viable = schedule_viability(model, terms)
+        grid = viable(np.repeat(np.arange(n_terms), fine.size), np.tile(fine, n_terms)).reshape(n_terms, fine.size)
+        uniform = np.where(grid.any(axis=1), fine[fine.size - 1 - np.argmax(grid[:, ::-1], axis=1)], np.nan)
+        gap = np.nanmax(np.abs(uniform - refined["boundary"]))
+        same_support = np.array_equal(np.isnan(uniform), np.isnan(refined["boundary"]))
+        print(f"\n🔍 Uniform {fine.size}-level grid: max boundary gap {gap:.4f}x "
+              f"{'✅' if same_support and gap <= args.tolerance + 1e-9 else '❌'}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())